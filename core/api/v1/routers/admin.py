@@ -1,16 +1,19 @@
 import fastapi
+from fastapi import Body
 from fastapi import Depends
 from fastapi import HTTPException
-from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User
-from core.schemas.admin import AdminPermissionSignature
+from core.repository.views import UserView
+from core.schemas.admin import AdminPermissionSignature, PermissionCacheStats
+from core.schemas.permission import PermissionBulkRequest, PermissionBulkResult, PermissionChangeOutcome
+from core.services.domain.permission_cache import permission_cache
 from core.services.interfaces.admin import IAdminService
 from core.services.interfaces.permission import IPermissionService
 from core.services.providers.admin import get_admin_service
 from core.services.providers.permission import get_permission_service
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.fast_json import FastJSONResponse
 
 router = fastapi.APIRouter(prefix="/admin", tags=["admin"])
 
@@ -24,10 +27,10 @@ router = fastapi.APIRouter(prefix="/admin", tags=["admin"])
 
 )
 async def admin_panel(
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         admin_service: IAdminService = Depends(get_admin_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     # Пользователь должен иметь админ-права
     flag = await permission_service.is_user_admin(user_id=user.id)
     if not flag: raise HTTPException(status_code=403, detail="Not allowed")
@@ -36,5 +39,102 @@ async def admin_panel(
         permission_id=-1,
         sign=True
     )
-    result = result.model_dump()
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
+
+
+@router.get(
+    path="/permission-cache",
+    response_model=PermissionCacheStats,
+    status_code=200,
+)
+@async_http_exception_mapper(
+
+)
+async def permission_cache_stats(
+        user: UserView = Depends(get_user),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> FastJSONResponse:
+    # Пользователь должен иметь админ-права
+    flag = await permission_service.is_user_admin(user_id=user.id)
+    if not flag: raise HTTPException(status_code=403, detail="Not allowed")
+
+    result = PermissionCacheStats(**permission_cache.stats())
+    return FastJSONResponse({'body': result})
+
+
+@router.post(
+    path="/permissions/grant",
+    response_model=PermissionBulkResult,
+    status_code=200,
+)
+@async_http_exception_mapper(
+
+)
+async def grant_permissions(
+        params: PermissionBulkRequest = Body(...),
+        user: UserView = Depends(get_user),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> FastJSONResponse:
+    """
+    Выдать пакет разрешений в одной транзакции. Исходы - в порядке params.permissions
+    """
+    # Пользователь должен иметь админ-права
+    flag = await permission_service.is_user_admin(user_id=user.id)
+    if not flag: raise HTTPException(status_code=403, detail="Not allowed")
+
+    rows = [
+        (permission.user_id, permission.resource_type, permission.resource_id, permission.permission_type)
+        for permission in params.permissions
+    ]
+    outcomes: list[PermissionChangeOutcome] = (
+        await permission_service.grant_permissions(
+            rows=rows,
+        )
+    )
+    result = PermissionBulkResult(
+        outcomes=outcomes,
+        number_of_changed=len({
+            row for row, outcome in zip(rows, outcomes)
+            if outcome == PermissionChangeOutcome.GRANTED
+        }),
+    )
+    return FastJSONResponse({'body': result})
+
+
+@router.post(
+    path="/permissions/revoke",
+    response_model=PermissionBulkResult,
+    status_code=200,
+)
+@async_http_exception_mapper(
+
+)
+async def revoke_permissions(
+        params: PermissionBulkRequest = Body(...),
+        user: UserView = Depends(get_user),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> FastJSONResponse:
+    """
+    Отозвать пакет разрешений в одной транзакции. Исходы - в порядке params.permissions
+    """
+    # Пользователь должен иметь админ-права
+    flag = await permission_service.is_user_admin(user_id=user.id)
+    if not flag: raise HTTPException(status_code=403, detail="Not allowed")
+
+    rows = [
+        (permission.user_id, permission.resource_type, permission.resource_id, permission.permission_type)
+        for permission in params.permissions
+    ]
+    outcomes: list[PermissionChangeOutcome] = (
+        await permission_service.revoke_permissions(
+            rows=rows,
+        )
+    )
+    result = PermissionBulkResult(
+        outcomes=outcomes,
+        number_of_changed=len({
+            row for row, outcome in zip(rows, outcomes)
+            if outcome == PermissionChangeOutcome.REVOKED
+        }),
+    )
+    return FastJSONResponse({'body': result})
@@ -2,15 +2,19 @@ from typing import Sequence
 
 import fastapi
 from fastapi import Body
+from fastapi import Query
 from fastapi import Depends
 from fastapi import HTTPException
-from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User
+from core.dependencies.pagination import get_page_params
+from core.dependencies.streaming import is_ndjson_requested
+from core.repository.pagination import PageParams, Page
+from core.repository.views import UserView
 from core.schemas.application import ApplicationRequest, ApplicationShortInfo, ApplicationMainInfo, \
     UserApplicationsInOrganizationRequest, ApplicationCancelByUserRequest, ApplicationActivityStatusType, ApplicationId, \
-    ApplicationLimits
+    ApplicationLimits, ManagerApplicationInfo, ManagerApplicationCounts, ApplicationIds, ApplicationBulkDecisionRequest, \
+    ApplicationBulkDecisionResult, ApplicationRejectByManagerRequest
 from core.services.interfaces.application import IApplicationService
 from core.services.interfaces.permission import IPermissionService
 from core.services.providers.application import get_application_service
@@ -18,6 +22,8 @@ from core.services.providers.permission import get_permission_service
 from core.utilities.exceptions.database import EntityDoesNotExist
 from core.utilities.exceptions.domain import ActiveEntityLimit
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.fast_json import FastJSONResponse
+from core.utilities.responses.ndjson import NDJSONResponse
 from core.utilities.exceptions.permission import PermissionDenied
 
 router = fastapi.APIRouter(prefix="/application", tags=["application"])
@@ -25,8 +31,8 @@ router = fastapi.APIRouter(prefix="/application", tags=["application"])
 
 @router.get("/")
 async def get____(
-        user: User = Depends(get_user),
-) -> JSONResponse:
+        user: UserView = Depends(get_user),
+) -> FastJSONResponse:
     ...
 
 
@@ -44,9 +50,9 @@ async def get____(
 )
 async def send_application_to_vacancy(
         params: ApplicationRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     """
     Пользователь делает отклик на вакансию
     """
@@ -56,9 +62,8 @@ async def send_application_to_vacancy(
             **params.model_dump(),
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.post(
@@ -74,9 +79,9 @@ async def send_application_to_vacancy(
 )
 async def limits_of_user_active_applications_in_organization(
         params: UserApplicationsInOrganizationRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     """
     Узнать текущее и максимальное число активных откликов пользователя в организации
     """
@@ -86,9 +91,8 @@ async def limits_of_user_active_applications_in_organization(
             org_id=params.org_id,
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.post(
@@ -104,21 +108,30 @@ async def limits_of_user_active_applications_in_organization(
 )
 async def user_respond_applications(
         params: UserApplicationsInOrganizationRequest = Body(...),
-        user: User = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
-) -> JSONResponse:
+) -> FastJSONResponse | NDJSONResponse:
     """
     Отклики совершенные пользователем (по умолчанию все. Потом добавить фильтрацию)
     """
-    result: Sequence[ApplicationMainInfo] = (
+    if ndjson:
+        return NDJSONResponse(
+            await application_service.stream_user_applications_main_info_in_organization(
+                user_id=user.id,
+                org_id=params.org_id,
+            )
+        )
+
+    result: Page[ApplicationMainInfo] = (
         await application_service.get_user_applications_main_info_in_organization(
             user_id=user.id,
             org_id=params.org_id,
+            page=page,
         )
     )
-    result = [i.model_dump() for i in result]
-
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result.items, 'next_cursor': result.next_cursor})
 
 
 @router.post(
@@ -131,10 +144,10 @@ async def user_respond_applications(
 )
 async def cancel_user_application_by_yourself(
         request_model: ApplicationCancelByUserRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
         permission_service: IPermissionService = Depends(get_permission_service)
-) -> JSONResponse:
+) -> FastJSONResponse:
     """
     Отклонить отклик (свой. --- т.е. От лица пользователя)
     """
@@ -149,38 +162,159 @@ async def cancel_user_application_by_yourself(
     res = await application_service.cancel_application(
         application_id=request_model.application_id,
     )
-    res = res.model_dump()
-    return JSONResponse({'body': res})
+    return FastJSONResponse({'body': res})
 
 
 @router.get(
     path="/manage",
+    response_model=ManagerApplicationInfo,
+    status_code=200,
 )
 @async_http_exception_mapper(
-
+    mapping={
+        PermissionDenied: (403, None),
+    }
 )
 async def manager_applications(
-        user: User = Depends(get_user),
+        project_id: int | None = Query(None, description="только отклики на вакансии этого проекта"),
+        vacancy_id: int | None = Query(None, description="только отклики на эту вакансию"),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
-) -> JSONResponse:
+) -> FastJSONResponse | NDJSONResponse:
     """
     Отклики на вакансии которыми пользователь может управлять как менеджер
-    (например отправлять офферы)
+    (например отправлять офферы). Только активные, в порядке поступления
+    """
+    if ndjson:
+        return NDJSONResponse(
+            await application_service.stream_manager_applications(
+                manager_id=user.id,
+                project_id=project_id,
+                vacancy_id=vacancy_id,
+            )
+        )
+
+    result: Page[ManagerApplicationInfo] = (
+        await application_service.get_manager_applications(
+            manager_id=user.id,
+            project_id=project_id,
+            vacancy_id=vacancy_id,
+            page=page,
+        )
+    )
+    return FastJSONResponse({'body': result.items, 'next_cursor': result.next_cursor})
+
+
+@router.get(
+    path="/manage/counts",
+    response_model=ManagerApplicationCounts,
+    status_code=200,
+)
+async def manager_applications_counts(
+        project_id: int | None = Query(None, description="только отклики на вакансии этого проекта"),
+        vacancy_id: int | None = Query(None, description="только отклики на эту вакансию"),
+        user: UserView = Depends(get_user),
+        application_service: IApplicationService = Depends(get_application_service),
+) -> FastJSONResponse:
+    """
+    Число входящих откликов менеджера и непросмотренных (новых) среди них
+    """
+    result: ManagerApplicationCounts = (
+        await application_service.get_manager_application_counts(
+            manager_id=user.id,
+            project_id=project_id,
+            vacancy_id=vacancy_id,
+        )
+    )
+    return FastJSONResponse({'body': result})
+
+
+@router.post(
+    path="/manage/viewed",
+    response_model=ApplicationIds,
+    status_code=200,
+)
+async def manager_applications_mark_viewed(
+        params: ApplicationIds = Body(...),
+        user: UserView = Depends(get_user),
+        application_service: IApplicationService = Depends(get_application_service),
+) -> FastJSONResponse:
     """
-    return JSONResponse({'body': 'заглушка'})
+    Отметить входящие отклики просмотренными. Отклики на чужие вакансии и уже просмотренные пропускаются,
+    в ответе - id отмеченных
+    """
+    application_ids = (
+        await application_service.mark_applications_viewed(
+            manager_id=user.id,
+            application_ids=params.application_ids,
+        )
+    )
+    return FastJSONResponse({'body': ApplicationIds(application_ids=application_ids)})
 
 
 @router.post(
     path="/manage/reject",
+    response_model=ApplicationId,
+    status_code=200,
 )
 @async_http_exception_mapper(
-
+    mapping={
+        EntityDoesNotExist: (404, None),
+    }
 )
 async def manager_application_reject(
-        user: User = Depends(get_user),
+        params: ApplicationRejectByManagerRequest = Body(...),
+        user: UserView = Depends(get_user),
         application_service: IApplicationService = Depends(get_application_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     """
     Отклонить отклик / реджектнуть (чужой. --- т.е. От лица менеджера)
     """
-    return JSONResponse({'body': 'заглушка'})
+    # Право на вакансию отклика проверяется в самом UPDATE
+    result: ApplicationId = (
+        await application_service.reject_application(
+            manager_id=user.id,
+            application_id=params.application_id,
+        )
+    )
+    return FastJSONResponse({'body': result})
+
+
+@router.post(
+    path="/manager/bulk",
+    response_model=ApplicationBulkDecisionResult,
+    status_code=200,
+)
+@async_http_exception_mapper(
+    mapping={
+        PermissionDenied: (403, None),
+        EntityDoesNotExist: (404, None),
+    }
+)
+async def manager_applications_bulk_decision(
+        params: ApplicationBulkDecisionRequest = Body(...),
+        user: UserView = Depends(get_user),
+        application_service: IApplicationService = Depends(get_application_service),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> FastJSONResponse:
+    """
+    Массовое решение менеджера по откликам одной транзакцией:
+    принять / отклонить список откликов, отклонить все отклики вакансии кроме одного,
+    закрыть вакансию и отклонить ее отклики
+    """
+    # Для действий над вакансией пользователь должен обладать правами на ее редактирование,
+    # отклики из applicationIds ограничиваются вакансиями пользователя в самом UPDATE
+    if params.vacancy_id is not None:
+        await permission_service.raise_if_not_all([
+            lambda: permission_service.can_user_edit_vacancy(user_id=user.id, vacancy_id=params.vacancy_id),
+        ])
+
+    result: ApplicationBulkDecisionResult = (
+        await application_service.apply_bulk_decision(
+            manager_id=user.id,
+            params=params,
+        )
+    )
+    return FastJSONResponse({'body': result})
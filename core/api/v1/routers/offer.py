@@ -3,13 +3,13 @@ from fastapi import Depends
 from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User
+from core.repository.views import UserView
 
 router = fastapi.APIRouter(prefix="/offer", tags=["offer"])
 
 
 @router.get("/")
 async def get____(
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
 ) -> JSONResponse:
     ...
@@ -1,34 +1,77 @@
+import tempfile
+from functools import partial
 from idlelib.rpc import request_queue
 from typing import Sequence
 
 import fastapi
 from fastapi import Body
 from fastapi import Depends, Request
+from fastapi import File, UploadFile
 from fastapi import Query, HTTPException
-from starlette.responses import JSONResponse, Response
+from starlette.background import BackgroundTask
+from starlette.responses import Response
 
+from core.config.manager import settings
 from core.dependencies.authorization import get_user
-from core.models import User
+from core.dependencies.fields import get_sparse_fields
+from core.dependencies.pagination import get_page_params
+from core.dependencies.streaming import is_ndjson_requested
+from core.repository.pagination import PageParams, Page
+from core.repository.views import UserView
 from core.schemas.organization import OrganizationCreateInRequest, OrganizationDetailInfoResponse, OrganizationInPatch, \
     OrganizationShortInfoResponse, OrganizationInfoForEditResponse, OrganizationJoinRequest, \
     OrganizationId, OrganizationAndUserId, OrganizationMemberId
+from core.schemas.organization_export import OrganizationExportEntity, OrganizationExportFormat, \
+    ORGANIZATION_EXPORT_ROWS
+from core.schemas.organization_import import ImportResult
 from core.schemas.organization_member import OrganizationMemberDetailInfo
 from core.schemas.project import ProjectsInOrganizationShortInfoResponse
 from core.services.interfaces.organization import IOrganizationService
+from core.services.interfaces.organization_export import IOrganizationExportService
+from core.services.interfaces.organization_import import IOrganizationImportService
 from core.services.interfaces.organization_member import IOrganizationMemberService
 from core.services.interfaces.permission import IPermissionService
 from core.services.interfaces.project import IProjectService
 from core.services.providers.organization import get_organization_service
+from core.services.providers.organization_export import get_organization_export_service
+from core.services.providers.organization_import import get_organization_import_service
 from core.services.providers.organization_member import get_organization_member_service
 from core.services.providers.permission import get_permission_service
 from core.services.providers.project import get_project_service
 from core.utilities.exceptions.database import EntityDoesNotExist, EntityAlreadyExists
+from core.utilities.exceptions.domain import InvalidImportFile
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.csv import CSVResponse, encode_csv_rows
+from core.utilities.responses.fast_json import FastJSONResponse
+from core.utilities.responses.ndjson import NDJSONResponse
 from core.utilities.exceptions.permission import PermissionDenied
 from core.utilities.loggers.logger import logger
 
 router = fastapi.APIRouter(prefix="/org", tags=["organization"])
 
+# Файл ошибок импорта держится в памяти до этого размера, дальше - на диске
+IMPORT_ERRORS_MAX_MEMORY = 1024 * 1024
+
+
+def _import_errors_response(
+        result: ImportResult,
+        errors: tempfile.SpooledTemporaryFile,
+) -> CSVResponse:
+    """
+    Ответ импорта: тело - CSV с ошибками по строкам (line, error), итоги - в заголовках X-Import-*
+    """
+    errors.seek(0)
+    return CSVResponse(
+        content=iter(partial(errors.read, 64 * 1024), ""),
+        filename="import_errors.csv",
+        headers={
+            "X-Import-Rows": str(result.number_of_rows),
+            "X-Import-Imported": str(result.number_of_imported),
+            "X-Import-Failed": str(result.number_of_failed),
+        },
+        background=BackgroundTask(errors.close),
+    )
+
 
 @router.post(
     path="/admin/members",
@@ -43,10 +86,12 @@ router = fastapi.APIRouter(prefix="/org", tags=["organization"])
 )
 async def get_organization_members_for_admin(
         params: OrganizationId = Body(...),
-        user: User = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        user: UserView = Depends(get_user),
         org_member_service: IOrganizationMemberService = Depends(get_organization_member_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse | NDJSONResponse:
     org_id = params.org_id
 
     await permission_service.raise_if_not_all([
@@ -57,15 +102,22 @@ async def get_organization_members_for_admin(
     # flag = await permission_service.can_user_edit_organization(user_id=user.id, org_id=org_id)
     # if not flag: raise HTTPException(status_code=403, detail="Permission denied")
 
-    result: Sequence[OrganizationMemberDetailInfo] = (
+    if ndjson:
+        return NDJSONResponse(
+            await org_member_service.stream_organization_members_for_admin(
+                user_id=user.id,
+                org_id=org_id,
+            )
+        )
+
+    result: Page[OrganizationMemberDetailInfo] = (
         await org_member_service.get_organization_members_for_admin(
             user_id=user.id,
             org_id=org_id,
+            page=page,
         )
     )
-    result = [i.model_dump() for i in result]
-
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result.items, 'next_cursor': result.next_cursor})
 
 
 @router.delete(
@@ -79,7 +131,7 @@ async def get_organization_members_for_admin(
 )
 async def delete_organization_member_by_manager(
         params: OrganizationAndUserId = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         org_member_service: IOrganizationMemberService = Depends(get_organization_member_service),
         permission_service: IPermissionService = Depends(get_permission_service),
 ) -> Response:
@@ -102,6 +154,139 @@ async def delete_organization_member_by_manager(
     return Response(status_code=204)
 
 
+@router.post(
+    path="/import/members",
+    response_class=CSVResponse,
+    status_code=200,
+)
+@async_http_exception_mapper(
+    mapping={
+        PermissionDenied: (403, None),
+        InvalidImportFile: (400, None),
+    }
+)
+async def import_organization_members(
+        org_id: int = Query(),
+        file: UploadFile = File(...),
+        user: UserView = Depends(get_user),
+        import_service: IOrganizationImportService = Depends(get_organization_import_service),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> CSVResponse:
+    """
+    Добавить участников организации из CSV (колонка user_id или username).
+    Строки с ошибками возвращаются CSV файлом, итоги - в заголовках X-Import-Rows / Imported / Failed
+    """
+    await permission_service.raise_if_not_all([
+        lambda: permission_service.can_user_edit_organization(user_id=user.id, org_id=org_id),
+    ])
+
+    errors = tempfile.SpooledTemporaryFile(max_size=IMPORT_ERRORS_MAX_MEMORY, mode="w+", newline="", encoding="utf-8")
+    try:
+        result: ImportResult = (
+            await import_service.import_members(
+                org_id=org_id,
+                source=file.file,
+                errors=errors,
+            )
+        )
+    except Exception:
+        errors.close()
+        raise
+    return _import_errors_response(result=result, errors=errors)
+
+
+@router.post(
+    path="/import/vacancies",
+    response_class=CSVResponse,
+    status_code=200,
+)
+@async_http_exception_mapper(
+    mapping={
+        PermissionDenied: (403, None),
+        InvalidImportFile: (400, None),
+    }
+)
+async def import_organization_vacancies(
+        org_id: int = Query(),
+        file: UploadFile = File(...),
+        user: UserView = Depends(get_user),
+        import_service: IOrganizationImportService = Depends(get_organization_import_service),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> CSVResponse:
+    """
+    Создать вакансии в проектах организации из CSV (колонки project_id, name, short_description,
+    activity_status, visibility). Ответ - как у /import/members
+    """
+    await permission_service.raise_if_not_all([
+        lambda: permission_service.can_user_edit_organization(user_id=user.id, org_id=org_id),
+    ])
+
+    errors = tempfile.SpooledTemporaryFile(max_size=IMPORT_ERRORS_MAX_MEMORY, mode="w+", newline="", encoding="utf-8")
+    try:
+        result: ImportResult = (
+            await import_service.import_vacancies(
+                org_id=org_id,
+                user_id=user.id,
+                source=file.file,
+                errors=errors,
+            )
+        )
+    except Exception:
+        errors.close()
+        raise
+    return _import_errors_response(result=result, errors=errors)
+
+
+@router.get(
+    path="/export",
+    response_model=None,
+    response_class=CSVResponse,
+    status_code=200,
+)
+@async_http_exception_mapper(
+    mapping={
+        PermissionDenied: (403, None),
+        EntityDoesNotExist: (404, None),
+    }
+)
+async def export_organization(
+        org_id: int = Query(),
+        entity: OrganizationExportEntity = Query(),
+        export_format: OrganizationExportFormat = Query(OrganizationExportFormat.CSV, alias="format"),
+        user: UserView = Depends(get_user),
+        export_service: IOrganizationExportService = Depends(get_organization_export_service),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> CSVResponse | NDJSONResponse:
+    """
+    Полная выгрузка участников, проектов, вакансий или откликов организации (format=csv|ndjson).
+    Строки читаются серверным курсором и сразу пишутся в ответ, CSV форматируется в пуле потоков
+    """
+    # Права проверяются один раз до начала выгрузки, а не на каждую строку
+    await permission_service.raise_if_not_all([
+        lambda: permission_service.can_user_edit_organization(user_id=user.id, org_id=org_id),
+    ])
+
+    if export_format == OrganizationExportFormat.NDJSON:
+        return NDJSONResponse(
+            await export_service.stream_organization_export_items(
+                org_id=org_id,
+                entity=entity,
+            )
+        )
+
+    return CSVResponse(
+        content=encode_csv_rows(
+            header=list(ORGANIZATION_EXPORT_ROWS[entity].model_fields),
+            rows=await export_service.stream_organization_export_rows(
+                org_id=org_id,
+                entity=entity,
+            ),
+            batch_size=settings.STREAM_YIELD_PER,
+        ),
+        filename=f"organization_{org_id}_{entity.value}.csv",
+    )
+
+
 @router.post(
     path="/join",
     response_model=OrganizationMemberId,
@@ -116,9 +301,9 @@ async def delete_organization_member_by_manager(
 )
 async def join_organization(
         params: OrganizationJoinRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         org_member_service: IOrganizationMemberService = Depends(get_organization_member_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     result: OrganizationMemberId = (
         await org_member_service.join_organization(
             user_id=user.id,
@@ -126,9 +311,8 @@ async def join_organization(
             code=params.code,
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.get(
@@ -140,17 +324,28 @@ async def join_organization(
 
 )
 async def get_all_organizations_short_info(
-        user: User = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        fields: frozenset[str] | None = Depends(get_sparse_fields(OrganizationShortInfoResponse)),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
-) -> JSONResponse:
-    result: Sequence[OrganizationShortInfoResponse] = (
+) -> FastJSONResponse | NDJSONResponse:
+    if ndjson:
+        return NDJSONResponse(
+            await organization_service.stream_all_organizations_with_short_info(
+                user_id=user.id,
+                fields=fields,
+            )
+        )
+
+    result: Page[OrganizationShortInfoResponse] = (
         await organization_service.get_all_organizations_with_short_info(
             user_id=user.id,
+            page=page,
+            fields=fields,
         )
     )
-    result = [i.model_dump() for i in result]
-
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result.items, 'next_cursor': result.next_cursor})
 
 
 @router.get(
@@ -166,10 +361,10 @@ async def get_all_organizations_short_info(
 )
 async def get_organization_info_for_edit_by_id(
         org_id: int = Query(..., ),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     await permission_service.raise_if_not_all([
         lambda: permission_service.can_user_edit_organization(user_id=user.id, org_id=org_id),
     ])
@@ -183,9 +378,8 @@ async def get_organization_info_for_edit_by_id(
             org_id=org_id,
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.get(
@@ -201,10 +395,10 @@ async def get_organization_info_for_edit_by_id(
 )
 async def get_organization_detail_info_by_id(
         org_id: int = Query(..., ),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     # Пользователь должен обладать правами на просмотр организации
     await permission_service.raise_if_not_all([
         lambda: permission_service.can_user_see_organization_detail(user_id=user.id, org_id=org_id),
@@ -220,9 +414,8 @@ async def get_organization_detail_info_by_id(
             org_id=org_id,
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.post(
@@ -237,10 +430,10 @@ async def get_organization_detail_info_by_id(
 )
 async def create_organization(
         params: OrganizationCreateInRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     # Пользователь должен обладать правами на создание организаций
     await permission_service.raise_if_not_all([
         lambda: permission_service.can_user_create_organizations(user_id=user.id),
@@ -255,9 +448,8 @@ async def create_organization(
             **params.model_dump(),
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.patch(
@@ -273,10 +465,10 @@ async def create_organization(
 )
 async def patch_organization(
         params: OrganizationInPatch = Body(..., ),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     # Пользователь должен иметь права на редактирование организации
     await permission_service.raise_if_not_all([
         lambda: permission_service.can_user_edit_organization(user_id=user.id, org_id=params.org_id),
@@ -291,9 +483,8 @@ async def patch_organization(
             **params.model_dump(),
         )
     )
-    result = result.model_dump()
 
-    return JSONResponse({"body": result})
+    return FastJSONResponse({"body": result})
 
 
 @router.get(
@@ -309,10 +500,13 @@ async def patch_organization(
 )
 async def get_organization_projects_short_info(
         org_id: int = Query(),
-        user: User = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        fields: frozenset[str] | None = Depends(get_sparse_fields(ProjectsInOrganizationShortInfoResponse)),
+        user: UserView = Depends(get_user),
         project_service: IProjectService = Depends(get_project_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse | NDJSONResponse:
     # Пользователь должен обладать правами на просмотр организации
     await permission_service.raise_if_not_all([
         lambda: permission_service.can_user_see_organization_detail(user_id=user.id, org_id=org_id),
@@ -321,12 +515,21 @@ async def get_organization_projects_short_info(
     # flag = await permission_service.can_user_see_organization_detail(user_id=user.id, org_id=org_id)
     # if not flag: raise HTTPException(status_code=403, detail="Not allowed")
 
-    result: Sequence[ProjectsInOrganizationShortInfoResponse] = (
+    if ndjson:
+        return NDJSONResponse(
+            await project_service.stream_projects_short_info_in_organization(
+                user_id=user.id,
+                org_id=org_id,
+                fields=fields,
+            )
+        )
+
+    result: Page[ProjectsInOrganizationShortInfoResponse] = (
         await project_service.get_projects_short_info_in_organization(
             user_id=user.id,
             org_id=org_id,
+            page=page,
+            fields=fields,
         )
     )
-    result = [i.model_dump() for i in result]
-
-    return JSONResponse({"body": result})
+    return FastJSONResponse({"body": result.items, "next_cursor": result.next_cursor})
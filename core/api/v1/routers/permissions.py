@@ -1,11 +1,11 @@
 import fastapi
 from fastapi import Depends, HTTPException, Body
 from fastapi import Query
-from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User, Organization, Project
-from core.schemas.permission import PermissionsResponse
+from core.models import Organization, Project
+from core.repository.views import UserView
+from core.schemas.permission import PermissionsResponse, PermissionBatchRequest
 from core.services.interfaces.organization import IOrganizationService
 from core.services.interfaces.permission import IPermissionService
 from core.services.interfaces.project import IProjectService
@@ -13,6 +13,7 @@ from core.services.providers.organization import get_organization_service
 from core.services.providers.permission import get_permission_service
 from core.services.providers.project import get_project_service
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.fast_json import FastJSONResponse
 
 router = fastapi.APIRouter(prefix="/permissions", tags=["permissions"])
 
@@ -29,17 +30,17 @@ ALL_FIELDS = PermissionsResponse.model_fields.keys()
 )
 async def can_user_create_projects_inside_organization(
         org_id: int = Query(),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         organization_service: IOrganizationService = Depends(get_organization_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     org: Organization = (
         await organization_service.get_organization_by_id(
             org_id=org_id,
         )
     )
     if not org:
-        return JSONResponse({'body': False})
+        return FastJSONResponse({'body': False})
 
     flag: bool = (
         await permission_service.can_user_create_projects_inside_organization(
@@ -47,7 +48,7 @@ async def can_user_create_projects_inside_organization(
             user_id=user.id,
         )
     )
-    return JSONResponse({'body': flag})
+    return FastJSONResponse({'body': flag})
 
 
 @router.get(
@@ -60,17 +61,17 @@ async def can_user_create_projects_inside_organization(
 )
 async def can_user_edit_project(
         project_id: int = Query(),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         project_service: IProjectService = Depends(get_project_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     project: Project = (
         await project_service.get_project_by_id(
             project_id=project_id,
         )
     )
     if not project:
-        return JSONResponse({'body': False})
+        return FastJSONResponse({'body': False})
 
     flag: bool = (
         await permission_service.can_user_edit_project(
@@ -78,7 +79,7 @@ async def can_user_edit_project(
             user_id=user.id,
         )
     )
-    return JSONResponse({'body': flag})
+    return FastJSONResponse({'body': flag})
 
 
 @router.post(
@@ -90,9 +91,9 @@ async def can_user_edit_project(
 )
 async def can_user_edit_organization(
         params: dict = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     org_id = params.get("org_id")
     if not org_id:
         raise HTTPException(status_code=400, detail="Missing required parameter 'org_id'")
@@ -103,7 +104,7 @@ async def can_user_edit_organization(
             org_id=org_id,
         )
     )
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
 
 
 @router.get(
@@ -114,12 +115,40 @@ async def can_user_edit_organization(
 
 )
 async def can_user_edit_organization(
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     result: bool = (
         await permission_service.can_user_create_organizations(
             user_id=user.id,
         )
     )
-    return JSONResponse({'body': result})
+    return FastJSONResponse({'body': result})
+
+
+@router.post(
+    path="/batch",
+    response_model=list[bool],
+    status_code=200,
+)
+@async_http_exception_mapper(
+
+)
+async def check_permissions_batch(
+        params: PermissionBatchRequest = Body(...),
+        user: UserView = Depends(get_user),
+        permission_service: IPermissionService = Depends(get_permission_service),
+) -> FastJSONResponse:
+    """
+    Проверить пакет разрешений одним запросом. Ответ - список bool в порядке params.checks
+    """
+    result: list[bool] = (
+        await permission_service.check_many(
+            user_id=user.id,
+            checks=[
+                (check.resource_type, check.resource_id, check.permission_type)
+                for check in params.checks
+            ],
+        )
+    )
+    return FastJSONResponse({'body': result})
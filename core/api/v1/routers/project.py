@@ -1,12 +1,14 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 import fastapi
 from fastapi import Depends, Body
 from fastapi import Query, HTTPException
-from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User
+from core.dependencies.pagination import get_page_params
+from core.dependencies.streaming import is_ndjson_requested
+from core.repository.pagination import PageParams, Page
+from core.repository.views import UserView
 from core.schemas.application import ApplicationShortInfo
 from core.schemas.project import ProjectCreateRequest, ProjectFullInfoResponse, ProjectPatchRequest, \
     ProjectVacanciesFullInfoResponse, CreatedProjectResponse, PatchedProjectResponse
@@ -21,6 +23,8 @@ from core.services.providers.project import get_project_service
 from core.services.providers.vacancy import get_vacancy_service
 from core.utilities.exceptions.database import EntityDoesNotExist
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.fast_json import FastJSONResponse
+from core.utilities.responses.ndjson import NDJSONResponse
 
 router = fastapi.APIRouter(prefix="/project", tags=["project"])
 
@@ -35,10 +39,10 @@ router = fastapi.APIRouter(prefix="/project", tags=["project"])
 )
 async def get_project_full_info(
         project_id: int = Query(..., ),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         project_service: IProjectService = Depends(get_project_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     # Пользователь должен иметь права на просмотр проекта
     flag = await permission_service.can_user_see_project(user_id=user.id, project_id=project_id)
     if not flag: raise HTTPException(status_code=403, detail="Not allowed")
@@ -49,8 +53,7 @@ async def get_project_full_info(
             user_id=user.id,
         )
     )
-    res = res.model_dump()
-    return JSONResponse({'body': res})
+    return FastJSONResponse({'body': res})
 
 
 @router.get(
@@ -65,15 +68,39 @@ async def get_project_full_info(
 )
 async def get_vacancies_info_in_project(
         project_id: int = Query(),
-        user: User = Depends(get_user),
+        page: PageParams = Depends(get_page_params),
+        ndjson: bool = Depends(is_ndjson_requested),
+        user: UserView = Depends(get_user),
         vacancy_service: IVacancyService = Depends(get_vacancy_service),
         vacancy_mapper: VacancyMapper = Depends(get_vacancy_mapper),
         application_service: IApplicationService = Depends(get_application_service)
-) -> JSONResponse:
-    vacancies_with_short_info: Sequence[ProjectVacanciesFullInfoResponse] = (
+) -> FastJSONResponse | NDJSONResponse:
+    if ndjson:
+        vacancies: AsyncIterator[ProjectVacanciesFullInfoResponse] = (
+            await vacancy_service.stream_all_vacancies_in_project_detailed_info(
+                project_id=project_id,
+                user_id=user.id,
+            )
+        )
+        # Отклики загружаются до начала потока: пока поток читает курсор, сессия занята
+        user_active_applications_in_this_project: Sequence[ApplicationShortInfo] = (
+            await application_service.get_all_active_applications_by_user_and_project(
+                user_id=user.id,
+                project_id=project_id,
+            )
+        )
+        return NDJSONResponse(
+            vacancy_mapper.stream_vacancies_full_info_response_by_active_applications(
+                base=vacancies,
+                active_applications=user_active_applications_in_this_project,
+            )
+        )
+
+    vacancies_with_short_info: Page[ProjectVacanciesFullInfoResponse] = (
         await vacancy_service.get_all_vacancies_in_project_detailed_info(
             project_id=project_id,
             user_id=user.id,
+            page=page,
         )
     )
     user_active_applications_in_this_project: Sequence[ApplicationShortInfo] = (
@@ -83,12 +110,11 @@ async def get_vacancies_info_in_project(
         )
     )
     res = vacancy_mapper.update_vacancies_full_info_response_by_active_applications(
-        base=vacancies_with_short_info,
+        base=vacancies_with_short_info.items,
         active_applications=user_active_applications_in_this_project,
     )
-    res = [row.model_dump() for row in res]
 
-    return JSONResponse({'body': res})
+    return FastJSONResponse({'body': res, 'next_cursor': vacancies_with_short_info.next_cursor})
 
 
 @router.post(
@@ -100,18 +126,17 @@ async def get_vacancies_info_in_project(
 
 )
 async def create_project(
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         project_create_schema: ProjectCreateRequest = Body(...),
         project_service: IProjectService = Depends(get_project_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     created_project_schema: CreatedProjectResponse = (
         await project_service.create_project(
             user_id=user.id,
             **project_create_schema.model_dump(),
         )
     )
-    created_project_schema = created_project_schema.model_dump()
-    return JSONResponse({"body": created_project_schema})
+    return FastJSONResponse({"body": created_project_schema})
 
 
 @router.patch(
@@ -123,15 +148,14 @@ async def create_project(
 
 )
 async def patch_project(
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         project_patch_schema: ProjectPatchRequest = Body(...),
         project_service: IProjectService = Depends(get_project_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     patched_project_schema: PatchedProjectResponse = (
         await project_service.patch_project(
             user_id=user.id,
             **project_patch_schema.model_dump(),
         )
     )
-    patched_project_schema = patched_project_schema.model_dump()
-    return JSONResponse({"body": patched_project_schema})
+    return FastJSONResponse({"body": patched_project_schema})
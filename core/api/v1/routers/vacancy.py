@@ -1,10 +1,12 @@
 import fastapi
 from fastapi import Depends, Body
 from fastapi import Query
-from starlette.responses import JSONResponse
 
 from core.dependencies.authorization import get_user
-from core.models import User
+from core.dependencies.fields import get_sparse_fields
+from core.dependencies.unit_of_work import get_unit_of_work
+from core.repository.views import UserView
+from core.repository.unit_of_work import UnitOfWork
 from core.schemas.permission import PermissionsShortResponse
 from core.schemas.vacancy import VacancyCreateRequest, VacancyPatchRequest, VacancyShortInfoResponse, \
     VacancyCreateResponse, VacancyPatchResponse
@@ -14,6 +16,7 @@ from core.services.providers.permission import get_permission_service
 from core.services.providers.vacancy import get_vacancy_service
 from core.utilities.exceptions.database import EntityDoesNotExist
 from core.utilities.exceptions.handlers.http400 import async_http_exception_mapper
+from core.utilities.responses.fast_json import FastJSONResponse
 
 router = fastapi.APIRouter(prefix="/vacancy", tags=["vacancy"])
 
@@ -30,9 +33,10 @@ router = fastapi.APIRouter(prefix="/vacancy", tags=["vacancy"])
 )
 async def get_vacancy_short_info(
         vacancy_id: int = Query(),
-        user: User = Depends(get_user),
+        fields: frozenset[str] | None = Depends(get_sparse_fields(VacancyShortInfoResponse)),
+        user: UserView = Depends(get_user),
         vacancy_service: IVacancyService = Depends(get_vacancy_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     #
     # Настроить проверку прав
     #
@@ -40,10 +44,11 @@ async def get_vacancy_short_info(
     res: VacancyShortInfoResponse = (
         await vacancy_service.get_vacancy_short_info_response(
             vacancy_id=vacancy_id,
-            user_id=user.id)
+            user_id=user.id,
+            fields=fields,
+        )
     )
-    res = res.model_dump()
-    return JSONResponse({"body": res})
+    return FastJSONResponse({"body": res})
 
 
 @router.post(
@@ -58,24 +63,26 @@ async def get_vacancy_short_info(
 )
 async def create_vacancy(
         vacancy_create_schema: VacancyCreateRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         vacancy_service: IVacancyService = Depends(get_vacancy_service),
         permission_service: IPermissionService = Depends(get_permission_service),
-) -> JSONResponse:
-    result: VacancyCreateResponse = (
-        await vacancy_service.create_vacancy(
-            user_id=user.id,
-            **vacancy_create_schema.model_dump(),
+        unit_of_work: UnitOfWork = Depends(get_unit_of_work),
+) -> FastJSONResponse:
+    # Vacancy и право создателя на ее редактирование - одна транзакция
+    async with unit_of_work:
+        result: VacancyCreateResponse = (
+            await vacancy_service.create_vacancy(
+                user_id=user.id,
+                **vacancy_create_schema.model_dump(),
+            )
         )
-    )
-    permission: PermissionsShortResponse = (
-        await permission_service.allow_user_edit_vacancy(
-            user_id=user.id,
-            vacancy_id=result.vacancy_id,
+        permission: PermissionsShortResponse = (
+            await permission_service.allow_user_edit_vacancy(
+                user_id=user.id,
+                vacancy_id=result.vacancy_id,
+            )
         )
-    )
-    result = result.model_dump()
-    return JSONResponse({"body": result})
+    return FastJSONResponse({"body": result})
 
 
 @router.patch(
@@ -90,14 +97,13 @@ async def create_vacancy(
 )
 async def patch_vacancy(
         vacancy_patch_schema: VacancyPatchRequest = Body(...),
-        user: User = Depends(get_user),
+        user: UserView = Depends(get_user),
         vacancy_service: IVacancyService = Depends(get_vacancy_service),
-) -> JSONResponse:
+) -> FastJSONResponse:
     vacancy_patch_response: VacancyPatchResponse = (
         await vacancy_service.patch_vacancy(
             user_id=user.id,
             **vacancy_patch_schema.model_dump(),
         )
     )
-    vacancy_patch_response = vacancy_patch_response.model_dump()
-    return JSONResponse({"body": vacancy_patch_response})
+    return FastJSONResponse({"body": vacancy_patch_response})
@@ -0,0 +1,48 @@
+"""
+Обслуживание денормализованных счетчиков Vacancy, Project, Organization и ApplicationQuota.
+
+    python -m core.cli.counters rebuild   # пересчитать все счетчики
+    python -m core.cli.counters check     # найти расхождения с vacancy / application / organization_member (код выхода 1, если есть)
+"""
+import argparse
+import asyncio
+import sys
+
+from core.database.connection import async_session
+from core.repository.crud.counters import CounterCRUDRepository
+
+
+async def rebuild() -> int:
+    async with async_session() as session:
+        await CounterCRUDRepository(async_session=session).rebuild_all()
+    print("counters rebuilt")
+    return 0
+
+
+async def check(limit: int) -> int:
+    async with async_session() as session:
+        mismatches = await CounterCRUDRepository(async_session=session).find_inconsistencies()
+
+    print(f"mismatched rows: {len(mismatches)}")
+    for table, row_id, columns in mismatches[:limit]:
+        print(f"  {table} {row_id}: " + ", ".join(
+            f"{name} {stored} != {expected}" for name, (stored, expected) in columns.items()
+        ))
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.cli.counters")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="пересчитать счетчики из vacancy, application и organization_member")
+    check_parser = subparsers.add_parser("check", help="сравнить счетчики с ожидаемыми значениями")
+    check_parser.add_argument("--limit", type=int, default=20, help="сколько расхождений вывести")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        return asyncio.run(rebuild())
+    return asyncio.run(check(limit=args.limit))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Обслуживание таблицы effective_permission.
+
+    python -m core.cli.effective_permission rebuild   # перестроить таблицу целиком
+    python -m core.cli.effective_permission check     # найти расхождения с permission (код выхода 1, если есть)
+"""
+import argparse
+import asyncio
+import sys
+
+from core.database.connection import async_session
+from core.repository.crud.effective_permission import EffectivePermissionCRUDRepository
+
+
+async def rebuild() -> int:
+    async with async_session() as session:
+        await EffectivePermissionCRUDRepository(async_session=session).rebuild_all()
+    print("effective_permission rebuilt")
+    return 0
+
+
+async def check(limit: int) -> int:
+    async with async_session() as session:
+        missing, extra = await EffectivePermissionCRUDRepository(async_session=session).find_inconsistencies()
+
+    print(f"missing: {len(missing)}, extra: {len(extra)}")
+    for title, rows in (("missing", missing), ("extra", extra)):
+        for row in rows[:limit]:
+            print(f"  {title}: {row}")
+    return 1 if missing or extra else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.cli.effective_permission")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild", help="перестроить effective_permission из permission")
+    check_parser = subparsers.add_parser("check", help="сравнить effective_permission с ожидаемым состоянием")
+    check_parser.add_argument("--limit", type=int, default=20, help="сколько расхождений вывести")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        return asyncio.run(rebuild())
+    return asyncio.run(check(limit=args.limit))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
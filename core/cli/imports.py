@@ -0,0 +1,75 @@
+"""
+Импорт участников организации и вакансий из CSV (без проверки прав - для администратора сервера).
+
+    python -m core.cli.imports members --org-id 1 students.csv                  # колонка user_id или username
+    python -m core.cli.imports vacancies --org-id 1 --creator-id 2 vacancies.csv
+        # колонки project_id, name, short_description, activity_status, visibility
+
+Строки с ошибками пишутся в --errors (по умолчанию <файл>.errors.csv), код выхода 1, если они есть,
+2 - если файл нельзя разобрать (нет заголовка или обязательных колонок)
+"""
+import argparse
+import asyncio
+import sys
+
+from core.database.connection import async_session
+from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
+from core.repository.crud.project import ProjectCRUDRepository
+from core.repository.crud.user import UserCRUDRepository
+from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.schemas.organization_import import ImportResult
+from core.services.domain.organization_import import OrganizationImportService
+from core.utilities.exceptions.domain import InvalidImportFile
+
+
+async def run_import(args: argparse.Namespace) -> int:
+    errors_path = args.errors or f"{args.path}.errors.csv"
+    async with async_session() as session:
+        import_service = OrganizationImportService(
+            member_repo=OrganizationMemberCRUDRepository(async_session=session),
+            vacancy_repo=VacancyCRUDRepository(async_session=session),
+            project_repo=ProjectCRUDRepository(async_session=session),
+            user_repo=UserCRUDRepository(async_session=session),
+        )
+        with open(args.path, "rb") as source, open(errors_path, "w", newline="", encoding="utf-8") as errors:
+            try:
+                if args.command == "members":
+                    result: ImportResult = await import_service.import_members(
+                        org_id=args.org_id,
+                        source=source,
+                        errors=errors,
+                    )
+                else:
+                    result: ImportResult = await import_service.import_vacancies(
+                        org_id=args.org_id,
+                        user_id=args.creator_id,
+                        source=source,
+                        errors=errors,
+                    )
+            except InvalidImportFile as e:
+                print(f"invalid file: {e}")
+                return 2
+
+    print(f"rows: {result.number_of_rows}, imported: {result.number_of_imported}, failed: {result.number_of_failed}")
+    if result.number_of_failed:
+        print(f"errors: {errors_path}")
+    return 1 if result.number_of_failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.cli.imports")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    members_parser = subparsers.add_parser("members", help="добавить пользователей в организацию")
+    vacancies_parser = subparsers.add_parser("vacancies", help="создать вакансии в проектах организации")
+    vacancies_parser.add_argument("--creator-id", type=int, required=True, help="id создателя вакансий")
+    for command_parser in (members_parser, vacancies_parser):
+        command_parser.add_argument("--org-id", type=int, required=True, help="id организации")
+        command_parser.add_argument("--errors", help="куда записать строки с ошибками")
+        command_parser.add_argument("path", help="CSV файл (UTF-8, первая строка - заголовок)")
+    args = parser.parse_args()
+
+    return asyncio.run(run_import(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
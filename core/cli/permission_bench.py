@@ -0,0 +1,165 @@
+"""
+Нагрузочная проверка параллельных проверок разрешений на пуле соединений из core.database.connection.
+
+    python -m core.cli.permission_bench --user-id 2 --project-id 1 --project-id 2 --requests 50 --checks 4
+
+Одновременно запускаются --requests имитаций запроса. Каждая, как настоящий запрос, держит соединение
+своей сессии и выполняет --checks проверок видимости Project (по кругу из --project-id) сначала через
+raise_if_not_all, затем через raise_if_not_all_concurrently (после прогрева пула). Печатаются задержки, число ошибок
+(в том числе таймаутов пула) и наибольшее число занятых соединений пула.
+Код выхода 1, если в параллельном режиме были ошибки
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database.connection import async_session, engine
+from core.repository.crud.application import ApplicationCRUDRepository
+from core.repository.crud.organization import OrganizationCRUDRepository
+from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
+from core.repository.crud.permission import PermissionCRUDRepository
+from core.repository.crud.project import ProjectCRUDRepository
+from core.repository.crud.user import UserCRUDRepository
+from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.repository.unit_of_work import UnitOfWork
+from core.services.domain.organization import OrganizationService
+from core.services.domain.permission import PermissionService
+from core.services.domain.user import UserService
+from core.services.mappers.organization import OrganizationMapper
+from core.services.mappers.permission import PermissionMapper
+from core.services.mappers.vacancy import VacancyMapper
+from core.utilities.exceptions.permission import PermissionDenied
+
+
+def build_permission_service(session: AsyncSession) -> PermissionService:
+    """
+    PermissionService на сессии session, собранный так же, как провайдеры FastAPI собирают его для запроса
+    """
+    org_repo = OrganizationCRUDRepository(async_session=session)
+    member_repo = OrganizationMemberCRUDRepository(async_session=session)
+    permission_repo = PermissionCRUDRepository(async_session=session)
+    user_repo = UserCRUDRepository(async_session=session)
+    vacancy_repo = VacancyCRUDRepository(async_session=session)
+    project_repo = ProjectCRUDRepository(async_session=session)
+    user_service = UserService(
+        org_repo=org_repo,
+        member_repo=member_repo,
+        project_repo=project_repo,
+        vacancy_repo=vacancy_repo,
+        vacancy_mapper=VacancyMapper(),
+        user_repo=user_repo,
+    )
+    return PermissionService(
+        org_repo=org_repo,
+        member_repo=member_repo,
+        permission_repo=permission_repo,
+        permission_mapper=PermissionMapper(),
+        user_repo=user_repo,
+        vacancy_repo=vacancy_repo,
+        project_repo=project_repo,
+        org_service=OrganizationService(
+            org_repo=org_repo,
+            member_repo=member_repo,
+            permission_repo=permission_repo,
+            user_service=user_service,
+            org_mapper=OrganizationMapper(),
+            unit_of_work=UnitOfWork(async_session=session),
+        ),
+        application_repo=ApplicationCRUDRepository(async_session=session),
+    )
+
+
+async def simulate_request(
+        user_id: int,
+        project_ids: list[int],
+        concurrent: bool,
+) -> float:
+    async with async_session() as session:
+        # Запрос держит свое соединение все время проверок
+        await session.connection()
+        service = build_permission_service(session)
+        started = time.perf_counter()
+        if concurrent:
+            await service.raise_if_not_all_concurrently([
+                lambda s, project_id=project_id: s.can_user_see_project(user_id=user_id, project_id=project_id)
+                for project_id in project_ids
+            ])
+        else:
+            await service.raise_if_not_all([
+                lambda project_id=project_id: service.can_user_see_project(user_id=user_id, project_id=project_id)
+                for project_id in project_ids
+            ])
+        return time.perf_counter() - started
+
+
+async def run_mode(
+        args: argparse.Namespace,
+        concurrent: bool,
+) -> int:
+    project_ids = [args.project_id[i % len(args.project_id)] for i in range(args.checks)]
+    peak = 0
+    finished = asyncio.Event()
+
+    async def sample_pool() -> None:
+        nonlocal peak
+        while not finished.is_set():
+            peak = max(peak, engine.pool.checkedout())
+            await asyncio.sleep(0.001)
+
+    sampler = asyncio.create_task(sample_pool())
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(simulate_request(args.user_id, project_ids, concurrent) for _ in range(args.requests)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    finished.set()
+    await sampler
+
+    latencies = sorted(result for result in results if isinstance(result, float))
+    denied = sum(isinstance(result, PermissionDenied) for result in results)
+    errors = [result for result in results if isinstance(result, BaseException) and not isinstance(result, PermissionDenied)]
+    mode = "concurrent" if concurrent else "sequential"
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{mode}: {len(latencies)} ok, {denied} denied, {len(errors)} errors in {elapsed:.2f} s; "
+              f"checks p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms; peak checked out connections {peak}")
+    else:
+        print(f"{mode}: {denied} denied, {len(errors)} errors in {elapsed:.2f} s; peak checked out connections {peak}")
+    for error in errors[:args.limit]:
+        print(f"  error: {error!r}")
+    return len(errors)
+
+
+async def bench(args: argparse.Namespace) -> int:
+    # Прогрев: в пуле появляются простаивающие соединения, как у работающего сервера
+    await asyncio.gather(*(simulate_request(args.user_id, args.project_id, False)
+                           for _ in range(max(args.requests, engine.pool.size()))),
+                         return_exceptions=True)
+    print(engine.pool.status())
+    await run_mode(args, concurrent=False)
+    number_of_errors = await run_mode(args, concurrent=True)
+    await engine.dispose()
+    return 1 if number_of_errors else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.cli.permission_bench")
+    parser.add_argument("--user-id", type=int, required=True, help="id пользователя, от лица которого проверки")
+    parser.add_argument("--project-id", type=int, action="append", required=True,
+                        help="id проекта для проверки видимости (можно несколько раз)")
+    parser.add_argument("--requests", type=int, default=50, help="сколько запросов выполняется одновременно")
+    parser.add_argument("--checks", type=int, default=4, help="сколько проверок в одном запросе")
+    parser.add_argument("--limit", type=int, default=5, help="сколько ошибок вывести")
+    args = parser.parse_args()
+
+    return asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,5 +6,30 @@ class Settings(BaseSettings):
     HASHING_ALGORITHM_LAYER_2 = 'bcrypt'
     HASHING_SALT = 'ololo'
 
+    # Кэш снимков разрешений между запросами (выключить для отладки: PERMISSION_CACHE_ENABLED=false)
+    PERMISSION_CACHE_ENABLED = True
+    PERMISSION_CACHE_MAX_SIZE = 4096
+    PERMISSION_CACHE_TTL_SECONDS = 60.0
+
+    # Параллельные проверки разрешений (PermissionService.raise_if_not_all_concurrently) берут соединения из пула
+    # сверх сессии запроса: не больше PERMISSION_CHECK_MAX_CONNECTIONS на запрос и не больше
+    # PERMISSION_CHECK_POOL_CONNECTIONS на весь процесс. Второе значение должно оставаться заметно меньше
+    # pool_size + max_overflow движка, иначе проверки отнимают соединения у самих запросов
+    PERMISSION_CHECK_MAX_CONNECTIONS = 2
+    PERMISSION_CHECK_POOL_CONNECTIONS = 4
+
+    # Размер страницы в списочных эндпоинтах (?limit=)
+    PAGINATION_DEFAULT_LIMIT = 50
+    PAGINATION_MAX_LIMIT = 200
+
+    # Сколько строк за раз забирать из серверного курсора при потоковой выдаче (Accept: application/x-ndjson)
+    STREAM_YIELD_PER = 500
+
+    # Максимум элементов в одном массовом запросе (POST /application/manager/bulk, POST /admin/permissions/*)
+    BULK_MAX_ITEMS = 5000
+
+    # Сколько строк CSV импорта проверяется и вставляется за раз (POST /org/import/*, python -m core.cli.imports)
+    IMPORT_BATCH_SIZE = 1000
+
 
 settings = Settings()
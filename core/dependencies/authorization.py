@@ -3,8 +3,8 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
 from core.dependencies.repository import get_repository
-from core.models.user import User
 from core.repository.crud.user import UserCRUDRepository
+from core.repository.views import UserView
 from core.services.domain import auth as auth_service
 from core.utilities.exceptions.database import EntityDoesNotExist
 
@@ -16,7 +16,7 @@ from core.services.security import decode_token
 async def get_user(
         token: str = Depends(oauth2_scheme),
         user_repo: UserCRUDRepository = Depends(get_repository(UserCRUDRepository)),
-) -> User:
+) -> UserView:
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
@@ -27,8 +27,8 @@ async def get_user(
         if username is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
-        user: User = (
-            await auth_service.get_user_by_username(
+        user: UserView = (
+            await auth_service.get_user_by_username_view(
                 username=username,
                 user_repo=user_repo,
             )
@@ -0,0 +1,38 @@
+from typing import Callable
+
+from fastapi import Query, HTTPException
+
+from core.schemas.base import BaseSchemaModel
+
+
+def get_sparse_fields(
+        schema: type[BaseSchemaModel],
+) -> Callable[..., frozenset[str] | None]:
+    """
+    Зависимость для параметра ?fields=a,b,c (sparse fieldset) ответа schema.
+    Поля можно указывать по alias (camelCase) или по имени поля
+    :param schema: класс схемы ответа
+    :return: зависимость, возвращающая имена запрошенных полей схемы или None, если fields не передан
+    """
+    names: dict[str, str] = {}
+    for name, info in schema.model_fields.items():
+        names[name] = name
+        if info.alias:
+            names[info.alias] = name
+
+    def _get_sparse_fields(
+            fields: str | None = Query(None, description=f"Поля {schema.__name__} через запятую"),
+    ) -> frozenset[str] | None:
+        if fields is None:
+            return None
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in names]
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Неизвестные поля: {', '.join(unknown) or '(пусто)'}. "
+                       f"Допустимые: {', '.join(info.alias or name for name, info in schema.model_fields.items())}",
+            )
+        return frozenset(names[field] for field in requested)
+
+    return _get_sparse_fields
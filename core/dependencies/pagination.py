@@ -0,0 +1,17 @@
+from fastapi import Query, HTTPException
+
+from core.config.manager import settings
+from core.repository.pagination import PageParams, decode_cursor
+from core.utilities.exceptions.pagination import InvalidCursor
+
+
+def get_page_params(
+        cursor: str | None = Query(None, description="next_cursor из предыдущего ответа"),
+        limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+) -> PageParams:
+    if cursor is None:
+        return PageParams(limit=limit)
+    try:
+        return PageParams(limit=limit, after=decode_cursor(cursor))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,17 @@
+from fastapi import Header
+
+from core.utilities.responses.ndjson import NDJSON_MEDIA_TYPE
+
+
+def is_ndjson_requested(
+        accept: str | None = Header(None),
+) -> bool:
+    """
+    Клиент просит потоковый ответ (Accept: application/x-ndjson) вместо {'body': [...]}
+    """
+    if not accept:
+        return False
+    return any(
+        media_range.split(";", 1)[0].strip() == NDJSON_MEDIA_TYPE
+        for media_range in accept.split(",")
+    )
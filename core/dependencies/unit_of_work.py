@@ -0,0 +1,11 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.dependencies.session import get_async_session
+from core.repository.unit_of_work import UnitOfWork
+
+
+def get_unit_of_work(
+        async_session: AsyncSession = Depends(get_async_session),
+) -> UnitOfWork:
+    return UnitOfWork(async_session=async_session)
@@ -1,4 +1,6 @@
 from .application import Application
+from .application_quota import ApplicationQuota
+from .effective_permission import EffectivePermission
 from .offer import Offer
 from .organization import Organization
 from .organizationMember import OrganizationMember
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.sql import functions as sqlalchemy_functions
@@ -43,3 +43,24 @@ class Application(Base):
         nullable=False,
         server_default=sqlalchemy_functions.now()
     )
+
+    # когда отклик впервые просмотрел менеджер вакансии; None - новый (непросмотренный) отклик
+    viewed_at: Mapped[datetime.datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        # keyset пагинация списков (см. core.repository.pagination)
+        Index("ix_application_user_id_created_at_id", "user_id", "created_at", "id"),
+        # входящие отклики менеджера с фильтром по вакансии / проекту, счетчики активных откликов вакансии
+        Index("ix_application_vacancy_id_activity_status_created_at_id",
+              "vacancy_id", "activity_status", "created_at", "id"),
+        # входящие отклики менеджера без фильтра: обход активных откликов в порядке keyset
+        # с проверкой права на вакансию, до заполнения страницы
+        Index("ix_application_activity_status_created_at_id", "activity_status", "created_at", "id"),
+        # непросмотренные отклики (счетчик новых во входящих менеджера) - обычно малая часть таблицы
+        Index("ix_application_unviewed_vacancy_id_activity_status", "vacancy_id", "activity_status",
+              postgresql_where=text("viewed_at IS NULL"),
+              sqlite_where=text("viewed_at IS NULL")),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from core.database.connection import Base
+
+
+class ApplicationQuota(Base):
+    """
+    Денормализованный счетчик активных Application пользователя в Organization (для лимита откликов).
+    Поддерживается ApplicationCRUDRepository / CounterCRUDRepository в той же транзакции,
+    что и изменение Application
+    """
+    __tablename__ = "application_quota"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id"),
+        primary_key=True,
+    )
+
+    organization_id: Mapped[int] = mapped_column(
+        ForeignKey("organization.id"),
+        primary_key=True,
+    )
+
+    number_of_active_applications: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
@@ -0,0 +1,44 @@
+from sqlalchemy import Enum
+from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+
+from core.database.connection import Base
+from core.models.permissions import PermissionType, ResourceType
+
+
+class EffectivePermission(Base):
+    """
+    Материализованные разрешения: выданные Permission, развернутые вниз по дереву
+    organization -> project -> vacancy. Поддерживается EffectivePermissionCRUDRepository
+    """
+    __tablename__ = "effective_permission"
+
+    id: Mapped[int] = mapped_column(
+        primary_key=True,
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id"),
+        nullable=False
+    )
+
+    resource_type: Mapped[ResourceType] = mapped_column(
+        Enum(ResourceType)
+    )
+
+    resource_id: Mapped[int] = mapped_column(
+        nullable=True
+    )
+
+    permission_type: Mapped[PermissionType] = mapped_column(
+        Enum(PermissionType)
+    )
+
+    __table_args__ = (
+        # Индекс уникального ключа обслуживает любую проверку can_edit_* одним поиском
+        UniqueConstraint(
+            "user_id", "resource_type", "resource_id", "permission_type",
+            name="_effective_permission_uc",
+        ),
+    )
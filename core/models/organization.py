@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
@@ -31,9 +31,12 @@ class Organization(Base):
         nullable=True
     )
 
+    # до 4096 символов и нужно только в детальной информации: по умолчанию не загружается,
+    # см. with_long_description в get_*_by_id
     long_description: Mapped[str] = mapped_column(
         String(length=4096),
-        nullable=True
+        nullable=True,
+        deferred=True,
     )
 
     creator_id: Mapped[int] = mapped_column(
@@ -64,6 +67,20 @@ class Organization(Base):
         nullable=False,
         default=OrganizationVisibilityType.CLOSED.value
     )
+
+    # Денормализованный счетчик OrganizationMember. Поддерживается CounterCRUDRepository
+    # в той же транзакции, что и вступление / удаление участника
+    number_of_members: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    __table_args__ = (
+        # keyset пагинация списков (см. core.repository.pagination)
+        Index("ix_organization_created_at_id", "created_at", "id"),
+    )
+
     # ------------------------------------------------------------------------------------------------------------------
     # Для удобной работы со связями
     creator: Mapped["User"] = relationship("User")
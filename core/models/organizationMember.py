@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.sql import functions as sqlalchemy_functions
@@ -34,4 +34,6 @@ class OrganizationMember(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'organization_id', name='_user_org_uc'),
+        # keyset пагинация списков (см. core.repository.pagination)
+        Index("ix_organization_member_organization_id_created_at_id", "organization_id", "created_at", "id"),
     )
@@ -1,7 +1,7 @@
 import enum
 
 from sqlalchemy import Enum
-from sqlalchemy import ForeignKey, Index
+from sqlalchemy import ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
@@ -24,6 +24,14 @@ class PermissionType(enum.Enum):
     ADMIN = "ADMIN"
     CREATE_ORGANIZATION = "CREATE_ORGANIZATION"
 
+
+# Разрешения, которые ADMIN получает автоматически
+ADMIN_IMPLIED_PERMISSIONS = frozenset({
+    PermissionType.EDIT_ORGANIZATION,
+    PermissionType.CREATE_ORGANIZATION,
+})
+
+
 class ResourceType(enum.Enum):
     ORGANIZATION = "ORGANIZATION"
     PROJECT = "PROJECT"
@@ -55,5 +63,9 @@ class Permission(Base):
     )
 
     __table_args__ = (
-        Index("ix_permission_scope", "user_id", "resource_type", "resource_id"),
+        # Ключ для INSERT ... ON CONFLICT; его индекс заменяет прежний ix_permission_scope (тот же префикс)
+        UniqueConstraint(
+            "user_id", "resource_type", "resource_id", "permission_type",
+            name="_permission_uc",
+        ),
     )
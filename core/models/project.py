@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
@@ -40,9 +40,12 @@ class Project(Base):
         nullable=True
     )
 
+    # до 4096 символов и нужно только в детальной информации: по умолчанию не загружается,
+    # см. with_long_description в get_*_by_id
     long_description: Mapped[str] = mapped_column(
         String(length=4096),
-        nullable=True
+        nullable=True,
+        deferred=True,
     )
 
     activity_status = Column(
@@ -63,6 +66,34 @@ class Project(Base):
         server_default=sqlalchemy_functions.now()
     )
 
+    # Денормализованные счетчики карточки проекта. Поддерживаются CounterCRUDRepository
+    # в той же транзакции, что и изменение Vacancy / Application
+    # Vacancy со статусом ACTIVE
+    open_vacancies: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    # Принятые (ACCEPTED) Application на вакансии проекта
+    team_current_size: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    # Все Vacancy проекта: одна вакансия - одно место в команде
+    team_full_size: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    __table_args__ = (
+        # keyset пагинация списков (см. core.repository.pagination)
+        Index("ix_project_organization_id_created_at_id", "organization_id", "created_at", "id"),
+    )
+
     # ------------------------------------------------------------------------------------------------------------------
     # Для удобной работы со связями
     creator: Mapped["User"] = relationship("User")
@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
@@ -58,6 +58,19 @@ class Vacancy(Base):
         server_default=sqlalchemy_functions.now()
     )
 
+    # Денормализованный счетчик: Application со статусом ACTIVE.
+    # Поддерживается CounterCRUDRepository в той же транзакции, что и изменение Application
+    number_of_active_applications: Mapped[int] = mapped_column(
+        nullable=False,
+        default=0,
+        server_default="0",
+    )
+
+    __table_args__ = (
+        # keyset пагинация списков (см. core.repository.pagination)
+        Index("ix_vacancy_project_id_created_at_id", "project_id", "created_at", "id"),
+    )
+
     # ------------------------------------------------------------------------------------------------------------------
     # Для удобной работы со связями
     creator: Mapped["User"] = relationship("User")
@@ -1,17 +1,58 @@
-from typing import Sequence, Tuple
+from typing import Sequence, Tuple, AsyncIterator, Any
 
-from sqlalchemy import select, update, Row
+from sqlalchemy import select, update, Row, Select, ColumnElement, insert, literal, exists, and_, func
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import functions as sqlalchemy_functions
 
 from core.dependencies.repository import get_repository
-from core.models import Project
+from core.models import Project, Organization, User
 from core.models.application import Application
-from core.models.permissions import Permission, PermissionType, ResourceType
+from core.models.application_quota import ApplicationQuota
 from core.models.vacancy import Vacancy
 from core.repository.crud.base import BaseCRUDRepository
-from core.schemas.application import ApplicationActivityStatusType, ApplicationMainInfo
+from core.repository.crud.counters import CounterCRUDRepository
+from core.repository.pagination import PageParams, Page, paginate, build_page
+from core.repository.policies import visibility
+from core.schemas.application import ApplicationActivityStatusType, ApplicationMainInfo, ManagerApplicationInfo, \
+    ManagerApplicationCounts
 from core.utilities.loggers.log_decorator import log_calls
 
 
+def _application_main_info_fields(row: Row[Tuple[Application, Vacancy, Project]]) -> dict[str, Any]:
+    """
+    Поля ApplicationMainInfo из строки запроса
+    """
+    application, vacancy, project = row
+    return {
+        "application_id": application.id,
+        "description": application.description,
+        "vacancy_id": vacancy.id,
+        "vacancy_name": vacancy.name,
+        "project_id": project.id,
+        "project_name": project.name,
+        "activity_status": application.activity_status,
+        "created_at": application.created_at.isoformat(),
+    }
+
+
+def _manager_application_fields(row: Row) -> dict[str, Any]:
+    """
+    Поля ManagerApplicationInfo из строки запроса входящих откликов менеджера
+    """
+    return {
+        "application_id": row.application_id,
+        "description": row.description,
+        "user_id": row.user_id,
+        "user_name": row.username,
+        "vacancy_id": row.vacancy_id,
+        "vacancy_name": row.vacancy_name,
+        "project_id": row.project_id,
+        "project_name": row.project_name,
+        "created_at": row.created_at.isoformat(),
+        "is_viewed": row.viewed_at is not None,
+    }
+
+
 class ApplicationCRUDRepository(BaseCRUDRepository):
 
     @log_calls
@@ -29,10 +70,120 @@ class ApplicationCRUDRepository(BaseCRUDRepository):
             activity_status=activity_status,
         )
         self.async_session.add(instance=new_application)
-        await self.async_session.commit()
+        counter_repo = CounterCRUDRepository(async_session=self.async_session)
+        await counter_repo.refresh_for_vacancies(vacancy_ids=[vacancy_id])
+        await counter_repo.refresh_application_quotas(user_ids=[user_id])
+        await self._commit()
         await self.async_session.refresh(instance=new_application)
         return new_application
 
+    @log_calls
+    async def create_active_application_within_quota(
+            self,
+            user_id: int,
+            vacancy_id: int,
+            description: str,
+            max_active_applications: int,
+    ) -> Application | None:
+        """
+        Создает активный Application, если у пользователя меньше max_active_applications активных откликов
+        в Organization вакансии и нет активного отклика на эту вакансию.
+        Лимит проверяется атомарно: INSERT ... ON CONFLICT DO UPDATE SET n = n + 1 WHERE n < max по строке
+        ApplicationQuota (user_id, organization_id) блокирует ее, поэтому параллельные отклики пользователя
+        в одной Organization выполняются по очереди и не превышают лимит.
+        Если метод вернул None, часть изменений могла быть выполнена - вызывать внутри UnitOfWork,
+        чтобы транзакция откатилась
+        :param user_id: id объекта User
+        :param vacancy_id: id объекта Vacancy
+        :param description: текст отклика
+        :param max_active_applications: максимальное число активных Application пользователя в Organization
+        :return: созданный объект Application или None, если Vacancy не существует, лимит исчерпан
+            или активный отклик на Vacancy уже есть
+        """
+        quota_insert = self.dialect_insert(
+            ApplicationQuota
+        ).from_select(
+            ["user_id", "organization_id", "number_of_active_applications"],
+            select(
+                literal(user_id),
+                Project.organization_id,
+                literal(1),
+            ).join(
+                Vacancy, Vacancy.project_id == Project.id,
+            ).where(
+                Vacancy.id == vacancy_id,
+            ),
+        )
+        number_of_active_applications: int | None = await self.async_session.scalar(
+            quota_insert.on_conflict_do_update(
+                index_elements=["user_id", "organization_id"],
+                set_={"number_of_active_applications": ApplicationQuota.number_of_active_applications + 1},
+                where=ApplicationQuota.number_of_active_applications < max_active_applications,
+            ).returning(
+                ApplicationQuota.number_of_active_applications
+            )
+        )
+        if number_of_active_applications is None:
+            return None
+
+        new_application: Application | None = await self.async_session.scalar(
+            insert(
+                Application
+            ).from_select(
+                ["user_id", "vacancy_id", "description", "activity_status"],
+                select(
+                    literal(user_id),
+                    literal(vacancy_id),
+                    literal(description, Application.description.type),
+                    literal(ApplicationActivityStatusType.ACTIVE.value),
+                ).where(
+                    ~exists().where(
+                        Application.user_id == user_id,
+                        Application.vacancy_id == vacancy_id,
+                        Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+                    ),
+                ),
+            ).returning(
+                Application
+            )
+        )
+        if new_application is None:
+            return None
+
+        await CounterCRUDRepository(
+            async_session=self.async_session
+        ).add_active_applications(vacancy_ids=[vacancy_id])
+        await self._commit()
+        return new_application
+
+    @log_calls
+    async def get_number_of_active_applications_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+    ) -> int | None:
+        """
+        Число активных Application пользователя в Organization - одна строка ApplicationQuota по первичному ключу
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :return: число активных Application или None, если Organization не существует
+        """
+        result = await self.async_session.execute(
+            select(
+                func.coalesce(ApplicationQuota.number_of_active_applications, 0),
+            ).select_from(
+                Organization
+            ).outerjoin(
+                ApplicationQuota, and_(
+                    ApplicationQuota.organization_id == Organization.id,
+                    ApplicationQuota.user_id == user_id,
+                ),
+            ).where(
+                Organization.id == org_id,
+            )
+        )
+        return result.scalar_one_or_none()
+
     @log_calls
     async def patch_application(
             self,
@@ -40,25 +191,115 @@ class ApplicationCRUDRepository(BaseCRUDRepository):
             description: str,
             activity_status: str,
     ) -> Application | None:
-        await self.async_session.execute(
+        application: Application | None = (
+            await self.update_returning(
+                model=Application,
+                where=Application.id == application_id,
+                values=dict(
+                    description=description,
+                    activity_status=activity_status,
+                ),
+            )
+        )
+        if application is not None:
+            counter_repo = CounterCRUDRepository(async_session=self.async_session)
+            await counter_repo.refresh_for_vacancies(vacancy_ids=[application.vacancy_id])
+            await counter_repo.refresh_application_quotas(user_ids=[application.user_id])
+        await self._commit()
+        return application
+
+    @log_calls
+    async def change_application_status(
+            self,
+            application_id: int,
+            activity_status: str,
+    ) -> Application | None:
+        """
+        Поменять статус Application одним UPDATE ... RETURNING, без предварительного чтения
+        :param application_id: id объекта Application
+        :param activity_status: новый статус (str, Enum)
+        :return: обновленный объект Application или None
+        """
+        application: Application | None = (
+            await self.update_returning(
+                model=Application,
+                where=Application.id == application_id,
+                values=dict(
+                    activity_status=activity_status,
+                ),
+            )
+        )
+        if application is not None:
+            counter_repo = CounterCRUDRepository(async_session=self.async_session)
+            await counter_repo.refresh_for_vacancies(vacancy_ids=[application.vacancy_id])
+            await counter_repo.refresh_application_quotas(user_ids=[application.user_id])
+        await self._commit()
+        return application
+
+    @log_calls
+    async def change_active_applications_status(
+            self,
+            activity_status: str,
+            application_ids: Sequence[int] | None = None,
+            vacancy_id: int | None = None,
+            except_application_id: int | None = None,
+            manager_id: int | None = None,
+    ) -> Sequence[int]:
+        """
+        Массово поменять статус активных Application одним UPDATE ... RETURNING и пересчитать
+        счетчики затронутых Vacancy / Project и лимиты откликов пользователей.
+        Условия складываются через AND; нужно указать application_ids или vacancy_id
+        :param activity_status: новый статус (str, Enum)
+        :param application_ids: только эти Application
+        :param vacancy_id: только Application на эту Vacancy
+        :param except_application_id: кроме этого Application (он должен быть активным откликом на ту же Vacancy)
+        :param manager_id: только Application на Vacancy, которые этот User может редактировать
+        :return: id измененных Application
+        """
+        if application_ids is None and vacancy_id is None:
+            raise ValueError("application_ids or vacancy_id is required")
+
+        where = [Application.activity_status == ApplicationActivityStatusType.ACTIVE.value]
+        if application_ids is not None:
+            where.append(Application.id.in_(application_ids))
+        if vacancy_id is not None:
+            where.append(Application.vacancy_id == vacancy_id)
+        if except_application_id is not None:
+            # Оставляемый Application должен быть активным откликом на ту же Vacancy - иначе не меняется ничего
+            kept = aliased(Application)
+            where.append(Application.id != except_application_id)
+            where.append(
+                exists().where(
+                    kept.id == except_application_id,
+                    kept.vacancy_id == Application.vacancy_id,
+                    kept.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+                )
+            )
+        if manager_id is not None:
+            where.append(Application.vacancy_id.in_(visibility.editable_vacancy_ids(user_id=manager_id)))
+
+        result = await self.async_session.execute(
             update(
                 Application
             ).where(
-                Application.id == application_id,
+                *where,
             ).values(
-                description=description,
                 activity_status=activity_status,
+            ).returning(
+                Application.id,
+                Application.vacancy_id,
+                Application.user_id,
+            ).execution_options(
+                synchronize_session=False,
             )
         )
-        await self.async_session.commit()
-        application = await self.async_session.execute(
-            select(
-                Application
-            ).where(
-                Application.id == application_id,
-            )
-        )
-        return application.scalar_one_or_none()
+        rows = result.all()
+        if rows:
+            counter_repo = CounterCRUDRepository(async_session=self.async_session)
+            await counter_repo.refresh_for_vacancies(vacancy_ids={row.vacancy_id for row in rows})
+            await counter_repo.refresh_application_quotas(user_ids={row.user_id for row in rows})
+        await self._commit()
+        return [row.id for row in rows]
 
     @log_calls
     async def get_application_by_id(
@@ -78,9 +319,58 @@ class ApplicationCRUDRepository(BaseCRUDRepository):
     async def get_user_applications_main_info_in_organization(
             self,
             user_id: int,
+            org_id: int,
             activity_status: str | None = None,
-    ) -> Sequence[ApplicationMainInfo]:
+            page: PageParams | None = None,
+    ) -> Page[ApplicationMainInfo]:
+        """
+        Отклики пользователя на вакансии Organization
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :param activity_status: фильтр по статусу (str, Enum) или None - все
+        :param page: параметры страницы (keyset по Application.created_at, id)
+        :return: страница ApplicationMainInfo
+        """
+        rows = await self.async_session.execute(
+            paginate(self._user_applications_main_info_query(user_id=user_id, org_id=org_id,
+                                                             activity_status=activity_status),
+                     Application.created_at, Application.id, page)
+        )
+        result: Page[ApplicationMainInfo] = build_page(
+            rows=rows.all(),
+            page=page,
+            key=lambda row: (row[0].created_at, row[0].id),
+            item=_application_main_info_fields,
+        ).map_all(ApplicationMainInfo.validate_many)
+        return result
 
+    @log_calls
+    def stream_user_applications_main_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            activity_status: str | None = None,
+    ) -> AsyncIterator[ApplicationMainInfo]:
+        """
+        То же, что get_user_applications_main_info_in_organization, но все строки потоком через серверный курсор
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :param activity_status: фильтр по статусу (str, Enum) или None - все
+        :return: асинхронный итератор ApplicationMainInfo
+        """
+        return self.stream(
+            stmt=paginate(self._user_applications_main_info_query(user_id=user_id, org_id=org_id,
+                                                                  activity_status=activity_status),
+                          Application.created_at, Application.id, None),
+            item=lambda row: ApplicationMainInfo.model_validate(_application_main_info_fields(row)),
+        )
+
+    @staticmethod
+    def _user_applications_main_info_query(
+            user_id: int,
+            org_id: int,
+            activity_status: str | None,
+    ) -> Select:
         stmt = (
             select(
                 Application,
@@ -92,40 +382,13 @@ class ApplicationCRUDRepository(BaseCRUDRepository):
                 Project, Project.id == Vacancy.project_id,
             ).where(
                 Application.user_id == user_id,
-                Application.activity_status == activity_status,
+                Project.organization_id == org_id,
             )
         )
 
         if activity_status is not None:
             stmt = stmt.where(Application.activity_status == activity_status)
-
-        rows = await self.async_session.execute(
-            stmt
-        )
-        tuples: Sequence[
-            Row[
-                Tuple[
-                    Application,
-                    Vacancy,
-                    Project,
-                ]
-            ]
-        ] = rows.all()
-
-        result: Sequence[ApplicationMainInfo] = [
-            ApplicationMainInfo(
-                application_id=application.id,
-                description=application.description,
-                vacancy_id=vacancy.id,
-                vacancy_name=vacancy.name,
-                project_id=project.id,
-                project_name=project.name,
-                activity_status=ApplicationActivityStatusType(application.activity_status),
-                created_at=application.created_at.isoformat(),
-            ) for application, vacancy, project in tuples
-        ]
-        return result
-
+        return stmt
 
     @log_calls
     async def get_active_application_by_user_and_vacancy(
@@ -197,29 +460,177 @@ class ApplicationCRUDRepository(BaseCRUDRepository):
         return application.scalars().all()
 
     @log_calls
-    async def get_active_application_by_manager(
+    async def get_manager_applications(
             self,
-            user_id: int,
-    ) -> Sequence[Application]:
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+            page: PageParams | None = None,
+    ) -> Page[ManagerApplicationInfo]:
+        """
+        Входящие отклики менеджера: активные Application на все Vacancy, которые он может редактировать
+        (EDIT_VACANCY в effective_permission, в том числе унаследованное от Project / Organization)
+        :param manager_id: id объекта User (менеджера)
+        :param project_id: фильтр по Project или None
+        :param vacancy_id: фильтр по Vacancy или None
+        :param page: параметры страницы (keyset по Application.created_at, id)
+        :return: страница ManagerApplicationInfo
+        """
+        rows = await self.async_session.execute(
+            paginate(self._manager_applications_query(manager_id=manager_id, project_id=project_id,
+                                                      vacancy_id=vacancy_id),
+                     Application.created_at, Application.id, page)
+        )
+        result: Page[ManagerApplicationInfo] = build_page(
+            rows=rows.all(),
+            page=page,
+            key=lambda row: (row.created_at, row.application_id),
+            item=_manager_application_fields,
+        ).map_all(ManagerApplicationInfo.validate_many)
+        return result
+
+    @log_calls
+    def stream_manager_applications(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> AsyncIterator[ManagerApplicationInfo]:
+        """
+        То же, что get_manager_applications, но все строки потоком через серверный курсор
+        :param manager_id: id объекта User (менеджера)
+        :param project_id: фильтр по Project или None
+        :param vacancy_id: фильтр по Vacancy или None
+        :return: асинхронный итератор ManagerApplicationInfo
+        """
+        return self.stream(
+            stmt=paginate(self._manager_applications_query(manager_id=manager_id, project_id=project_id,
+                                                           vacancy_id=vacancy_id),
+                          Application.created_at, Application.id, None),
+            item=lambda row: ManagerApplicationInfo.model_validate(_manager_application_fields(row)),
+        )
+
+    @staticmethod
+    def _manager_vacancies_where(
+            manager_id: int,
+            project_id: int | None,
+            vacancy_id: int | None,
+    ) -> list[ColumnElement[bool]]:
+        where = [
+            visibility.can_edit_vacancy(user_id=manager_id),
+        ]
+        if project_id is not None:
+            where.append(Vacancy.project_id == project_id)
+        if vacancy_id is not None:
+            where.append(Vacancy.id == vacancy_id)
+        return where
+
+    @classmethod
+    def _manager_applications_query(
+            cls,
+            manager_id: int,
+            project_id: int | None,
+            vacancy_id: int | None,
+    ) -> Select:
+        return select(
+            Application.id.label("application_id"),
+            Application.description,
+            Application.user_id,
+            User.username,
+            Application.vacancy_id,
+            Vacancy.name.label("vacancy_name"),
+            Vacancy.project_id,
+            Project.name.label("project_name"),
+            Application.created_at,
+            Application.viewed_at,
+        ).join(
+            Vacancy, Vacancy.id == Application.vacancy_id,
+        ).join(
+            Project, Project.id == Vacancy.project_id,
+        ).join(
+            User, User.id == Application.user_id,
+        ).where(
+            Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+            *cls._manager_vacancies_where(manager_id=manager_id, project_id=project_id, vacancy_id=vacancy_id),
+        )
+
+    @log_calls
+    async def get_manager_application_counts(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> ManagerApplicationCounts:
         """
-        Получить все активные отклики доступные для просмотра менеджеру
+        Число входящих откликов менеджера и непросмотренных среди них (с теми же фильтрами, что get_manager_applications).
+        Активные берутся из счетчика Vacancy.number_of_active_applications, непросмотренные считаются
+        по частичному индексу ix_application_unviewed_vacancy_id_activity_status
+        :param manager_id: id объекта User (менеджера)
+        :param project_id: фильтр по Project или None
+        :param vacancy_id: фильтр по Vacancy или None
+        :return: ManagerApplicationCounts
         """
-        res = await self.async_session.execute(
+        vacancies_where = [Vacancy.id.in_(visibility.editable_vacancy_ids(user_id=manager_id))]
+        if project_id is not None:
+            vacancies_where.append(Vacancy.project_id == project_id)
+        if vacancy_id is not None:
+            vacancies_where.append(Vacancy.id == vacancy_id)
+
+        result = await self.async_session.execute(
             select(
-                Application,
-            ).join(
-                Vacancy, Vacancy.id == Application.vacancy_id,
-            ).join(
-                Permission, Permission.resource_id == Vacancy.id,
+                select(
+                    func.coalesce(func.sum(Vacancy.number_of_active_applications), 0)
+                ).where(
+                    *vacancies_where,
+                ).scalar_subquery(),
+                select(
+                    func.count(Application.id)
+                ).join(
+                    Vacancy, Vacancy.id == Application.vacancy_id,
+                ).where(
+                    Application.viewed_at.is_(None),
+                    Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+                    *vacancies_where,
+                ).scalar_subquery(),
             )
-            .where(
-                Application.user_id == user_id,
-                Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
-                Permission.resource_type == ResourceType.VACANCY,
-                Permission.permission_type == PermissionType.EDIT_VACANCY,
+        )
+        number_of_active, number_of_unviewed = result.one()
+        return ManagerApplicationCounts(
+            number_of_active=number_of_active,
+            number_of_unviewed=number_of_unviewed,
+        )
+
+    @log_calls
+    async def mark_applications_viewed(
+            self,
+            manager_id: int,
+            application_ids: Sequence[int],
+    ) -> Sequence[int]:
+        """
+        Отметить отклики просмотренными одним UPDATE. Затрагиваются только еще не просмотренные
+        Application на Vacancy, которые менеджер может редактировать
+        :param manager_id: id объекта User (менеджера)
+        :param application_ids: id объектов Application
+        :return: id отмеченных Application
+        """
+        result = await self.async_session.execute(
+            update(
+                Application
+            ).where(
+                Application.id.in_(application_ids),
+                Application.viewed_at.is_(None),
+                Application.vacancy_id.in_(visibility.editable_vacancy_ids(user_id=manager_id)),
+            ).values(
+                viewed_at=sqlalchemy_functions.now(),
+            ).returning(
+                Application.id
+            ).execution_options(
+                synchronize_session=False,
             )
         )
-        return res.scalars().all()
+        res = result.scalars().all()
+        await self._commit()
+        return res
 
 
 application_repo = get_repository(
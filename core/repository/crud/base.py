@@ -1,5 +1,90 @@
+from typing import Type, TypeVar, Any, AsyncIterator, Callable
+
+from sqlalchemy import update, select, ColumnElement, Select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession as SQLAlchemyAsyncSession
 
+from core.config.manager import settings
+from core.repository.unit_of_work import UnitOfWork
+
+M = TypeVar("M")
+T = TypeVar("T")
+
+# INSERT с поддержкой ON CONFLICT есть только в диалектных конструкциях
+_DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
 class BaseCRUDRepository:
     def __init__(self, async_session: SQLAlchemyAsyncSession):
         self.async_session = async_session
+
+    async def _commit(self) -> None:
+        """
+        Зафиксировать изменения: commit, а внутри UnitOfWork - только flush
+        (commit сделает UnitOfWork при выходе из блока)
+        """
+        if UnitOfWork.is_active(self.async_session):
+            await self.async_session.flush()
+        else:
+            await self.async_session.commit()
+
+    def dialect_insert(self, model: Type):
+        """
+        INSERT для диалекта текущей сессии с методами on_conflict_do_nothing / on_conflict_do_update
+        :param model: ORM модель
+        :return: postgresql.Insert или sqlite.Insert
+        """
+        dialect_name = self.async_session.get_bind().dialect.name
+        insert = _DIALECT_INSERTS.get(dialect_name)
+        if insert is None:
+            raise NotImplementedError(f"ON CONFLICT is not supported for dialect `{dialect_name}`")
+        return insert(model)
+
+    async def update_returning(
+            self,
+            model: Type[M],
+            where: ColumnElement[bool],
+            values: dict[str, Any],
+    ) -> M | None:
+        """
+        UPDATE ... RETURNING одной строки без commit. Для диалектов без RETURNING - UPDATE и затем SELECT
+        :param model: ORM модель
+        :param where: условие, выбирающее не более одной строки
+        :param values: новые значения полей
+        :return: обновленный объект или None, если строка не найдена
+        """
+        stmt = update(model).where(where).values(**values)
+        if self.async_session.get_bind().dialect.update_returning:
+            return await self.async_session.scalar(
+                stmt.returning(model)
+            )
+
+        await self.async_session.execute(
+            stmt.execution_options(synchronize_session="fetch")
+        )
+        return await self.async_session.scalar(
+            select(model).where(where)
+        )
+
+    async def stream(
+            self,
+            stmt: Select,
+            item: Callable[[Any], T],
+    ) -> AsyncIterator[T]:
+        """
+        Выполнить запрос через серверный курсор и отдавать строки по одной, не загружая весь результат в память
+        (строки забираются из БД пачками по settings.STREAM_YIELD_PER)
+        :param stmt: запрос
+        :param item: преобразование строки в элемент результата
+        :return: асинхронный итератор элементов
+        """
+        result = await self.async_session.stream(
+            stmt.execution_options(yield_per=settings.STREAM_YIELD_PER)
+        )
+        # по пачкам, а не по строке: каждое обращение к результату - переключение в greenlet драйвера
+        async for partition in result.partitions():
+            for row in partition:
+                yield item(row)
@@ -0,0 +1,401 @@
+from typing import Iterable, Sequence, Type
+
+from sqlalchemy import select, update, func, or_, and_, inspect, ColumnElement, Select
+
+from core.dependencies.repository import get_repository
+from core.models import Application, ApplicationQuota, Project, Vacancy, Organization, OrganizationMember
+from core.repository.crud.base import BaseCRUDRepository
+from core.schemas.application import ApplicationActivityStatusType
+from core.schemas.vacancy import VacancyActivityStatusType
+from core.utilities.loggers.log_decorator import log_calls
+
+
+def _vacancy_counters() -> dict[str, ColumnElement]:
+    """
+    Ожидаемые значения счетчиков Vacancy: коррелированные подзапросы по строке vacancy
+    """
+    return {
+        "number_of_active_applications": select(
+            func.count(Application.id)
+        ).where(
+            Application.vacancy_id == Vacancy.id,
+            Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+        ).scalar_subquery(),
+    }
+
+
+def _project_counters() -> dict[str, ColumnElement]:
+    """
+    Ожидаемые значения счетчиков Project: коррелированные подзапросы по строке project
+    """
+    return {
+        "open_vacancies": select(
+            func.count(Vacancy.id)
+        ).where(
+            Vacancy.project_id == Project.id,
+            Vacancy.activity_status == VacancyActivityStatusType.ACTIVE.value,
+        ).scalar_subquery(),
+        "team_current_size": select(
+            func.count(Application.id)
+        ).join(
+            Vacancy, Vacancy.id == Application.vacancy_id,
+        ).where(
+            Vacancy.project_id == Project.id,
+            Application.activity_status == ApplicationActivityStatusType.ACCEPTED.value,
+        ).scalar_subquery(),
+        "team_full_size": select(
+            func.count(Vacancy.id)
+        ).where(
+            Vacancy.project_id == Project.id,
+        ).scalar_subquery(),
+    }
+
+
+def _organization_counters() -> dict[str, ColumnElement]:
+    """
+    Ожидаемые значения счетчиков Organization: коррелированные подзапросы по строке organization
+    """
+    return {
+        "number_of_members": select(
+            func.count(OrganizationMember.id)
+        ).where(
+            OrganizationMember.organization_id == Organization.id,
+        ).scalar_subquery(),
+    }
+
+
+def _application_quota_counters() -> dict[str, ColumnElement]:
+    """
+    Ожидаемые значения счетчиков ApplicationQuota: коррелированные подзапросы по строке application_quota
+    """
+    return {
+        "number_of_active_applications": select(
+            func.count(Application.id)
+        ).join(
+            Vacancy, Vacancy.id == Application.vacancy_id,
+        ).join(
+            Project, Project.id == Vacancy.project_id,
+        ).where(
+            Application.user_id == ApplicationQuota.user_id,
+            Project.organization_id == ApplicationQuota.organization_id,
+            Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+        ).scalar_subquery(),
+    }
+
+
+def _all_counters() -> tuple[tuple[Type[Vacancy | Project | Organization | ApplicationQuota],
+                                   dict[str, ColumnElement]], ...]:
+    return (
+        (Vacancy, _vacancy_counters()),
+        (Project, _project_counters()),
+        (Organization, _organization_counters()),
+        (ApplicationQuota, _application_quota_counters()),
+    )
+
+
+def _active_application_pairs() -> Select:
+    """
+    Пары (user_id, organization_id), у которых есть активные Application
+    """
+    return select(
+        Application.user_id,
+        Project.organization_id,
+    ).join(
+        Vacancy, Vacancy.id == Application.vacancy_id,
+    ).join(
+        Project, Project.id == Vacancy.project_id,
+    ).where(
+        Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+    ).group_by(
+        Application.user_id,
+        Project.organization_id,
+    )
+
+
+class CounterCRUDRepository(BaseCRUDRepository):
+    """
+    Поддержка денормализованных счетчиков Vacancy.number_of_active_applications,
+    Project.open_vacancies / team_current_size / team_full_size, Organization.number_of_members
+    и ApplicationQuota.number_of_active_applications.
+    Методы refresh_* и add_* не делают commit: они вызываются из других репозиториев
+    в той же сессии, чтобы изменение и пересчет попали в одну транзакцию
+    """
+
+    @log_calls
+    async def refresh_for_vacancies(
+            self,
+            vacancy_ids: Iterable[int],
+            project_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        Пересчитать счетчики Vacancy и их Project (после изменения Vacancy или Application).
+        Строки сначала блокируются (SELECT ... FOR UPDATE, по возрастанию id), поэтому пересчет
+        видит строки параллельной транзакции, закоммиченные до получения блокировки
+        :param vacancy_ids: id объектов Vacancy
+        :param project_ids: id дополнительных Project (например, прежнего Project перенесенной Vacancy)
+        """
+        await self.async_session.flush()
+
+        vacancy_ids = sorted(set(vacancy_ids))
+        project_ids = set(project_ids)
+        if vacancy_ids:
+            project_ids.update(await self._lock(Vacancy, Vacancy.project_id, vacancy_ids))
+            await self.async_session.execute(
+                update(
+                    Vacancy
+                ).where(
+                    Vacancy.id.in_(vacancy_ids),
+                ).values(
+                    **_vacancy_counters()
+                ).execution_options(
+                    synchronize_session=False,
+                )
+            )
+
+        project_ids = sorted(project_ids)
+        if project_ids:
+            await self._lock(Project, Project.id, project_ids)
+            await self.async_session.execute(
+                update(
+                    Project
+                ).where(
+                    Project.id.in_(project_ids),
+                ).values(
+                    **_project_counters()
+                ).execution_options(
+                    synchronize_session=False,
+                )
+            )
+
+    @log_calls
+    async def refresh_application_quotas(
+            self,
+            user_ids: Iterable[int] = (),
+            vacancy_ids: Iterable[int] = (),
+    ) -> None:
+        """
+        Пересчитать ApplicationQuota пользователей (после смены статуса или удаления Application,
+        переноса Vacancy в Project другой Organization). Недостающие строки создаются,
+        затем строки блокируются и пересчитываются, как в refresh_for_vacancies
+        :param user_ids: id объектов User
+        :param vacancy_ids: id объектов Vacancy - пересчитать пользователей с активными Application на них
+        """
+        await self.async_session.flush()
+
+        user_ids = set(user_ids)
+        vacancy_ids = list(vacancy_ids)
+        if vacancy_ids:
+            user_ids.update((await self.async_session.scalars(
+                select(
+                    Application.user_id
+                ).where(
+                    Application.vacancy_id.in_(vacancy_ids),
+                    Application.activity_status == ApplicationActivityStatusType.ACTIVE.value,
+                )
+            )).all())
+        user_ids = sorted(user_ids)
+        if not user_ids:
+            return
+
+        await self._insert_missing_quotas(user_ids=user_ids)
+        await self.async_session.execute(
+            select(
+                ApplicationQuota.user_id
+            ).where(
+                ApplicationQuota.user_id.in_(user_ids),
+            ).order_by(
+                ApplicationQuota.user_id,
+                ApplicationQuota.organization_id,
+            ).with_for_update()
+        )
+        await self.async_session.execute(
+            update(
+                ApplicationQuota
+            ).where(
+                ApplicationQuota.user_id.in_(user_ids),
+            ).values(
+                **_application_quota_counters()
+            ).execution_options(
+                synchronize_session=False,
+            )
+        )
+
+    async def _insert_missing_quotas(
+            self,
+            user_ids: Sequence[int] | None = None,
+    ) -> None:
+        """
+        Создать строки ApplicationQuota для пар (user_id, organization_id) с активными Application, у которых их нет
+        """
+        pairs = _active_application_pairs()
+        if user_ids is not None:
+            pairs = pairs.where(Application.user_id.in_(user_ids))
+        await self.async_session.execute(
+            self.dialect_insert(
+                ApplicationQuota
+            ).from_select(
+                ["user_id", "organization_id"], pairs,
+            ).on_conflict_do_nothing(
+                index_elements=["user_id", "organization_id"],
+            )
+        )
+
+    @log_calls
+    async def add_organization_members(
+            self,
+            org_ids: Iterable[int],
+            delta: int = 1,
+    ) -> None:
+        """
+        Изменить Organization.number_of_members на delta для каждого вхождения org_id.
+        В отличие от счетчиков Vacancy / Project, здесь нет переходов между состояниями: вызывающий
+        точно знает число вставленных (ON CONFLICT DO NOTHING RETURNING) или удаленных (DELETE RETURNING)
+        строк, поэтому достаточно атомарного UPDATE ... SET n = n + delta без пересчета по всем участникам
+        :param org_ids: id объектов Organization (повторяющиеся id учитываются несколько раз)
+        :param delta: изменение счетчика на одно вхождение (1 - вступление, -1 - удаление)
+        """
+        await self._add(Organization.number_of_members, org_ids, delta)
+
+    @log_calls
+    async def add_active_applications(
+            self,
+            vacancy_ids: Iterable[int],
+            delta: int = 1,
+    ) -> None:
+        """
+        Изменить Vacancy.number_of_active_applications на delta для каждого вхождения vacancy_id.
+        Для вставки новой активной Application: счетчики Project от нее не зависят, пересчет не нужен
+        :param vacancy_ids: id объектов Vacancy (повторяющиеся id учитываются несколько раз)
+        :param delta: изменение счетчика на одно вхождение
+        """
+        await self._add(Vacancy.number_of_active_applications, vacancy_ids, delta)
+
+    async def _add(
+            self,
+            column: ColumnElement[int],
+            ids: Iterable[int],
+            delta: int,
+    ) -> None:
+        model = column.class_
+        changes: dict[int, int] = {}
+        for row_id in ids:
+            changes[row_id] = changes.get(row_id, 0) + delta
+
+        # по возрастанию id - тот же порядок блокировок, что и в refresh_for_vacancies
+        for row_id, change in sorted(changes.items()):
+            if not change:
+                continue
+            await self.async_session.execute(
+                update(
+                    model
+                ).where(
+                    model.id == row_id,
+                ).values(
+                    {column: column + change},
+                ).execution_options(
+                    synchronize_session=False,
+                )
+            )
+
+    async def _lock(
+            self,
+            model: Type[Vacancy | Project],
+            column: ColumnElement,
+            ids: Sequence[int],
+    ) -> Sequence:
+        result = await self.async_session.execute(
+            select(
+                column
+            ).where(
+                model.id.in_(ids),
+            ).order_by(
+                model.id
+            ).with_for_update()
+        )
+        return result.scalars().all()
+
+    @log_calls
+    async def rebuild_all(
+            self,
+    ) -> None:
+        """
+        Пересчитать все счетчики Vacancy, Project, Organization и ApplicationQuota по таблицам vacancy,
+        application и organization_member
+        """
+        await self._insert_missing_quotas()
+        for model, counters in _all_counters():
+            await self.async_session.execute(
+                update(model).values(**counters).execution_options(synchronize_session=False)
+            )
+        await self._commit()
+
+    @log_calls
+    async def find_inconsistencies(
+            self,
+    ) -> list[tuple[str, int | tuple[int, ...], dict[str, tuple[int | None, int]]]]:
+        """
+        Сравнить счетчики с ожидаемыми значениями
+        :return: список (таблица, первичный ключ, {колонка: (сохраненное значение, ожидаемое значение)}).
+            Отсутствующая строка application_quota возвращается с сохраненным значением None
+        """
+        res = []
+        for model, counters in _all_counters():
+            primary_key = inspect(model).primary_key
+            columns = [getattr(model, name) for name in counters]
+            result = await self.async_session.execute(
+                select(
+                    *primary_key,
+                    *columns,
+                    *counters.values(),
+                ).where(
+                    or_(*(column != expected for column, expected in zip(columns, counters.values()))),
+                ).order_by(
+                    *primary_key
+                )
+            )
+            for row in result.all():
+                key, stored, expected = (
+                    row[:len(primary_key)],
+                    row[len(primary_key):len(primary_key) + len(columns)],
+                    row[len(primary_key) + len(columns):],
+                )
+                res.append((
+                    model.__tablename__,
+                    key[0] if len(key) == 1 else tuple(key),
+                    {
+                        name: (s, e)
+                        for name, s, e in zip(counters, stored, expected)
+                        if s != e
+                    },
+                ))
+
+        pairs = _active_application_pairs().add_columns(
+            func.count(Application.id).label("number_of_active_applications"),
+        ).subquery()
+        missing = await self.async_session.execute(
+            select(
+                pairs
+            ).outerjoin(
+                ApplicationQuota, and_(
+                    ApplicationQuota.user_id == pairs.c.user_id,
+                    ApplicationQuota.organization_id == pairs.c.organization_id,
+                ),
+            ).where(
+                ApplicationQuota.user_id.is_(None),
+            ).order_by(
+                pairs.c.user_id,
+                pairs.c.organization_id,
+            )
+        )
+        for user_id, org_id, expected in missing.all():
+            res.append((
+                ApplicationQuota.__tablename__,
+                (user_id, org_id),
+                {"number_of_active_applications": (None, expected)},
+            ))
+        return res
+
+
+counter_repo = get_repository(
+    repo_type=CounterCRUDRepository
+)
@@ -0,0 +1,252 @@
+from typing import Sequence, Callable, Any
+
+from sqlalchemy import select, delete, insert, union, and_, or_, cast, literal, except_, ColumnElement, Select
+
+from core.dependencies.repository import get_repository
+from core.models import Project, Vacancy, EffectivePermission
+from core.models.permissions import Permission, PermissionType, ResourceType
+from core.repository.crud.base import BaseCRUDRepository
+from core.services.domain.permission_cache import permission_cache
+from core.utilities.loggers.log_decorator import log_calls
+
+_COLUMNS = ("user_id", "resource_type", "resource_id", "permission_type")
+
+
+def _resource_type(resource_type: ResourceType) -> ColumnElement:
+    return cast(literal(resource_type, EffectivePermission.resource_type.type), EffectivePermission.resource_type.type)
+
+
+def _permission_type(permission_type: PermissionType) -> ColumnElement:
+    return cast(literal(permission_type, EffectivePermission.permission_type.type), EffectivePermission.permission_type.type)
+
+
+def _expected_effective_permissions() -> Select:
+    """
+    Какой должна быть таблица effective_permission: прямые Permission плюс наследование
+    EDIT_ORGANIZATION -> EDIT_PROJECT (проекты организации) -> EDIT_VACANCY (вакансии проектов)
+    """
+    direct = select(
+        Permission.user_id,
+        Permission.resource_type,
+        Permission.resource_id,
+        Permission.permission_type,
+    )
+    organization_to_project = select(
+        Permission.user_id,
+        _resource_type(ResourceType.PROJECT),
+        Project.id,
+        _permission_type(PermissionType.EDIT_PROJECT),
+    ).join(
+        Project, Project.organization_id == Permission.resource_id,
+    ).where(
+        Permission.resource_type == ResourceType.ORGANIZATION.value,
+        Permission.permission_type == PermissionType.EDIT_ORGANIZATION.value,
+    )
+    organization_to_vacancy = select(
+        Permission.user_id,
+        _resource_type(ResourceType.VACANCY),
+        Vacancy.id,
+        _permission_type(PermissionType.EDIT_VACANCY),
+    ).join(
+        Project, Project.organization_id == Permission.resource_id,
+    ).join(
+        Vacancy, Vacancy.project_id == Project.id,
+    ).where(
+        Permission.resource_type == ResourceType.ORGANIZATION.value,
+        Permission.permission_type == PermissionType.EDIT_ORGANIZATION.value,
+    )
+    project_to_vacancy = select(
+        Permission.user_id,
+        _resource_type(ResourceType.VACANCY),
+        Vacancy.id,
+        _permission_type(PermissionType.EDIT_VACANCY),
+    ).join(
+        Vacancy, Vacancy.project_id == Permission.resource_id,
+    ).where(
+        Permission.resource_type == ResourceType.PROJECT.value,
+        Permission.permission_type == PermissionType.EDIT_PROJECT.value,
+    )
+    # UNION (а не UNION ALL) убирает дубли, когда право выдано и напрямую, и через родителя
+    return union(direct, organization_to_project, organization_to_vacancy, project_to_vacancy)
+
+
+class EffectivePermissionCRUDRepository(BaseCRUDRepository):
+    """
+    Поддержка материализованной таблицы effective_permission.
+    Методы rebuild_for_* не делают commit: они вызываются из других репозиториев
+    в той же сессии, чтобы изменение и пересчет попали в одну транзакцию
+    """
+
+    @log_calls
+    async def _rebuild(
+            self,
+            scope: Callable[[Any], ColumnElement],
+    ) -> None:
+        """
+        Пересчитать строки effective_permission, попадающие в scope
+        :param scope: функция, строящая условие по колонкам user_id, resource_type, resource_id, permission_type
+            (получает модель EffectivePermission или колонки подзапроса)
+        """
+        await self.async_session.flush()
+
+        deleted = await self.async_session.execute(
+            delete(
+                EffectivePermission
+            ).where(
+                scope(EffectivePermission)
+            ).returning(
+                EffectivePermission.user_id
+            )
+        )
+        affected_user_ids = set(deleted.scalars().all())
+
+        expected = _expected_effective_permissions().subquery("expected")
+        inserted = await self.async_session.execute(
+            insert(
+                EffectivePermission
+            ).from_select(
+                list(_COLUMNS),
+                select(
+                    *(expected.c[name] for name in _COLUMNS)
+                ).where(
+                    scope(expected.c)
+                ),
+            ).returning(
+                EffectivePermission.user_id
+            )
+        )
+        affected_user_ids.update(inserted.scalars().all())
+
+        for user_id in affected_user_ids:
+            permission_cache.invalidate_on_commit(async_session=self.async_session, user_id=user_id)
+
+    @log_calls
+    async def rebuild_for_user(
+            self,
+            user_id: int,
+    ) -> None:
+        """
+        Пересчитать effective_permission пользователя (после выдачи или отзыва Permission)
+        :param user_id: id объекта User
+        """
+        await self._rebuild(
+            scope=lambda c: c.user_id == user_id,
+        )
+
+    @log_calls
+    async def rebuild_for_users(
+            self,
+            user_ids: Sequence[int],
+    ) -> None:
+        """
+        Пересчитать effective_permission нескольких пользователей одним DELETE и одним INSERT ... SELECT
+        (после массовой выдачи или отзыва Permission)
+        :param user_ids: id объектов User
+        """
+        if not user_ids:
+            return
+        ids = sorted(set(user_ids))
+        await self._rebuild(
+            scope=lambda c: c.user_id.in_(ids),
+        )
+
+    @log_calls
+    async def rebuild_for_project(
+            self,
+            project_id: int,
+    ) -> None:
+        """
+        Пересчитать effective_permission Project и его Vacancy (после создания или переноса Project)
+        :param project_id: id объекта Project
+        """
+        project_vacancy_ids = select(Vacancy.id).where(Vacancy.project_id == project_id)
+        await self._rebuild(
+            scope=lambda c: or_(
+                and_(
+                    c.resource_type == ResourceType.PROJECT.value,
+                    c.resource_id == project_id,
+                ),
+                and_(
+                    c.resource_type == ResourceType.VACANCY.value,
+                    c.resource_id.in_(project_vacancy_ids),
+                ),
+            ),
+        )
+
+    @log_calls
+    async def rebuild_for_vacancy(
+            self,
+            vacancy_id: int,
+    ) -> None:
+        """
+        Пересчитать effective_permission Vacancy (после создания или переноса Vacancy)
+        :param vacancy_id: id объекта Vacancy
+        """
+        await self._rebuild(
+            scope=lambda c: and_(
+                c.resource_type == ResourceType.VACANCY.value,
+                c.resource_id == vacancy_id,
+            ),
+        )
+
+    @log_calls
+    async def rebuild_for_vacancies(
+            self,
+            vacancy_ids: Select,
+    ) -> None:
+        """
+        Пересчитать effective_permission нескольких Vacancy (после массового создания Vacancy)
+        :param vacancy_ids: запрос id объектов Vacancy (id вставленных COPY строк заранее неизвестны)
+        """
+        await self._rebuild(
+            scope=lambda c: and_(
+                c.resource_type == ResourceType.VACANCY.value,
+                c.resource_id.in_(vacancy_ids),
+            ),
+        )
+
+    @log_calls
+    async def rebuild_all(
+            self,
+    ) -> None:
+        """
+        Полностью перестроить таблицу effective_permission из permission и иерархии ресурсов
+        """
+        await self.async_session.execute(
+            delete(EffectivePermission)
+        )
+        expected = _expected_effective_permissions().subquery("expected")
+        await self.async_session.execute(
+            insert(
+                EffectivePermission
+            ).from_select(
+                list(_COLUMNS),
+                select(*(expected.c[name] for name in _COLUMNS)),
+            )
+        )
+        await self._commit()
+        permission_cache.clear()
+
+    @log_calls
+    async def find_inconsistencies(
+            self,
+    ) -> tuple[Sequence[tuple], Sequence[tuple]]:
+        """
+        Сравнить effective_permission с ожидаемым состоянием
+        :return: (отсутствующие строки, лишние строки) - кортежи (user_id, resource_type, resource_id, permission_type)
+        """
+        actual = select(*(getattr(EffectivePermission, name) for name in _COLUMNS))
+        expected = _expected_effective_permissions().subquery("expected")
+        expected_rows = select(*(expected.c[name] for name in _COLUMNS))
+
+        missing = await self.async_session.execute(except_(expected_rows, actual))
+        extra = await self.async_session.execute(except_(actual, expected_rows))
+        return (
+            [tuple(row) for row in missing.all()],
+            [tuple(row) for row in extra.all()],
+        )
+
+
+effective_permission_repo = get_repository(
+    repo_type=EffectivePermissionCRUDRepository
+)
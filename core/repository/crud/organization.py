@@ -1,12 +1,21 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, delete, Row, Select
+from sqlalchemy.orm import undefer
 
 from core.dependencies.repository import get_repository
 from core.models import OrganizationMember, Permission, Application, Vacancy, Project
 from core.models.organization import Organization
 from core.models.permissions import ResourceType
 from core.repository.crud.base import BaseCRUDRepository
+from core.repository.crud.counters import CounterCRUDRepository
+from core.repository.crud.effective_permission import EffectivePermissionCRUDRepository
+from core.repository.pagination import PageParams, Page, paginate, build_page
+from core.repository.policies import visibility
+from core.repository.projection import schema_columns, schema_row_fields
+from core.repository.views import OrganizationShortView
+from core.schemas.base import BaseSchemaModel
+from core.schemas.organization import OrganizationShortInfoResponse, OrganizationDetailInfoResponse
 from core.utilities.loggers.log_decorator import log_calls
 
 
@@ -33,46 +42,35 @@ class OrganizationCRUDRepository(BaseCRUDRepository):
         :param visibility: тип видимости (str, Enum)
         :return: обновленные объект Organization или None
         """
-        await self.async_session.execute(
-            update(
-                Organization
-            )
-            .where(
-                Organization.id == org_id,
-            )
-            .values(
-                name=name,
-                short_description=short_description,
-                long_description=long_description,
-                visibility=visibility,
-                activity_status=activity_status,
-                join_policy=join_policy,
-            )
-            .execution_options(
-                synchronize_session="fetch"
+        org: Organization | None = (
+            await self.update_returning(
+                model=Organization,
+                where=Organization.id == org_id,
+                values=dict(
+                    name=name,
+                    short_description=short_description,
+                    long_description=long_description,
+                    visibility=visibility,
+                    activity_status=activity_status,
+                    join_policy=join_policy,
+                ),
             )
         )
-        await self.async_session.commit()
-
-        result = await self.async_session.execute(
-            select(
-                Organization
-            ).where(
-                Organization.id == org_id,
-            )
-        )
-        return result.scalar_one_or_none()
+        await self._commit()
+        return org
 
     @log_calls
     async def delete_user_from_organization(
             self,
             member: OrganizationMember,
     ) -> None:
-        await self.async_session.execute(
+        deleted_members = await self.async_session.execute(
             delete(
                 OrganizationMember
             ).where(
                 OrganizationMember.id == member.id,
+            ).returning(
+                OrganizationMember.organization_id
             )
         )
         await self.async_session.execute(
@@ -84,14 +82,23 @@ class OrganizationCRUDRepository(BaseCRUDRepository):
                 Permission.resource_id == member.organization_id,
             )
         )
-        await self.async_session.execute(
+        deleted_applications = await self.async_session.execute(
             delete(
                 Application
             ).where(
                 Application.user_id == member.user_id,
+            ).returning(
+                Application.vacancy_id
             )
         )
-        await self.async_session.commit()
+        counter_repo = CounterCRUDRepository(async_session=self.async_session)
+        await counter_repo.add_organization_members(org_ids=deleted_members.scalars().all(), delta=-1)
+        await counter_repo.refresh_for_vacancies(vacancy_ids=deleted_applications.scalars().all())
+        await counter_repo.refresh_application_quotas(user_ids=[member.user_id])
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_user(user_id=member.user_id)
+        await self._commit()
 
     @log_calls
     async def get_all_organizations(
@@ -109,25 +116,222 @@ class OrganizationCRUDRepository(BaseCRUDRepository):
         orgs = result.scalars().all()
         return orgs
 
+    @log_calls
+    async def get_all_organizations_visible_to_user(
+            self,
+            user_id: int,
+            page: PageParams | None = None,
+    ) -> Page[Row[tuple[Organization, bool]]]:
+        """
+        Получить объекты Organization, которые User видит в общем списке (visibility.organization_listed),
+        вместе с признаком членства. Невидимые строки отфильтровываются в БД
+        :param user_id: id объекта User
+        :param page: параметры страницы (keyset по created_at, id)
+        :return: страница строк (Organization, is_user_member)
+        """
+        result = await self.async_session.execute(
+            paginate(self._organizations_visible_to_user_query(user_id=user_id),
+                     Organization.created_at, Organization.id, page)
+        )
+        return build_page(
+            rows=result.all(),
+            page=page,
+            key=lambda row: (row[0].created_at, row[0].id),
+            item=lambda row: row,
+        )
+
+    @log_calls
+    def stream_organizations_visible_to_user(
+            self,
+            user_id: int,
+    ) -> AsyncIterator[Row[tuple[Organization, bool]]]:
+        """
+        То же, что get_all_organizations_visible_to_user, но все строки потоком через серверный курсор
+        :param user_id: id объекта User
+        :return: асинхронный итератор строк (Organization, is_user_member)
+        """
+        return self.stream(
+            stmt=paginate(self._organizations_visible_to_user_query(user_id=user_id),
+                          Organization.created_at, Organization.id, None),
+            item=lambda row: row,
+        )
+
+    @staticmethod
+    def _organizations_visible_to_user_query(
+            user_id: int,
+    ) -> Select:
+        return select(
+            Organization,
+            visibility.is_organization_member(user_id=user_id).label("is_user_member"),
+        ).where(
+            visibility.organization_listed(user_id=user_id),
+        )
+
+    @log_calls
+    async def get_all_organizations_visible_to_user_view(
+            self,
+            user_id: int,
+            page: PageParams | None = None,
+    ) -> Page[OrganizationShortView]:
+        """
+        То же, что get_all_organizations_visible_to_user, но только колонки общего списка
+        без гидрации ORM-объектов
+        :param user_id: id объекта User
+        :param page: параметры страницы (keyset по created_at, id)
+        :return: страница OrganizationShortView
+        """
+        result = await self.async_session.execute(
+            paginate(self._organizations_visible_to_user_view_query(user_id=user_id),
+                     Organization.created_at, Organization.id, page)
+        )
+        return build_page(
+            rows=result.all(),
+            page=page,
+            key=lambda row: (row.created_at, row.id),
+            item=lambda row: OrganizationShortView(*row),
+        )
+
+    @log_calls
+    def stream_organizations_visible_to_user_view(
+            self,
+            user_id: int,
+    ) -> AsyncIterator[OrganizationShortView]:
+        """
+        То же, что get_all_organizations_visible_to_user_view, но все строки потоком через серверный курсор
+        :param user_id: id объекта User
+        :return: асинхронный итератор OrganizationShortView
+        """
+        return self.stream(
+            stmt=paginate(self._organizations_visible_to_user_view_query(user_id=user_id),
+                          Organization.created_at, Organization.id, None),
+            item=lambda row: OrganizationShortView(*row),
+        )
+
+    @staticmethod
+    def _organizations_visible_to_user_view_query(
+            user_id: int,
+    ) -> Select:
+        return select(
+            *schema_columns(OrganizationShortInfoResponse, Organization, prefix="org_"),
+            Organization.created_at,
+            visibility.is_organization_member(user_id=user_id).label("is_user_member"),
+        ).where(
+            visibility.organization_listed(user_id=user_id),
+        )
+
+    @log_calls
+    async def get_organizations_visible_to_user_sparse(
+            self,
+            user_id: int,
+            fields: frozenset[str],
+            page: PageParams | None = None,
+    ) -> Page[BaseSchemaModel]:
+        """
+        Общий список организаций только с полями fields (?fields=): в SELECT попадают только нужные колонки,
+        подзапрос членства - только если запрошен is_user_member
+        :param user_id: id объекта User
+        :param fields: имена полей OrganizationShortInfoResponse
+        :param page: параметры страницы (keyset по created_at, id)
+        :return: страница объектов OrganizationShortInfoResponse.sparse(fields)
+        """
+        schema = OrganizationShortInfoResponse.sparse(fields)
+        query = self._organizations_visible_to_user_sparse_query(user_id=user_id, schema=schema)
+        result = await self.async_session.execute(
+            paginate(query, Organization.created_at, Organization.id, page)
+        )
+        return build_page(
+            rows=result.all(),
+            page=page,
+            key=lambda row: (row.keyset_created_at, row.keyset_id),
+            item=schema_row_fields(schema, query.selected_columns.keys(), prefix="org_"),
+        ).map_all(schema.validate_many)
+
+    @log_calls
+    def stream_organizations_visible_to_user_sparse(
+            self,
+            user_id: int,
+            fields: frozenset[str],
+    ) -> AsyncIterator[BaseSchemaModel]:
+        """
+        То же, что get_organizations_visible_to_user_sparse, но все строки потоком через серверный курсор
+        :param user_id: id объекта User
+        :param fields: имена полей OrganizationShortInfoResponse
+        :return: асинхронный итератор объектов OrganizationShortInfoResponse.sparse(fields)
+        """
+        schema = OrganizationShortInfoResponse.sparse(fields)
+        query = self._organizations_visible_to_user_sparse_query(user_id=user_id, schema=schema)
+        to_fields = schema_row_fields(schema, query.selected_columns.keys(), prefix="org_")
+        return self.stream(
+            stmt=paginate(query, Organization.created_at, Organization.id, None),
+            item=lambda row: schema.model_validate(to_fields(row)),
+        )
+
+    @staticmethod
+    def _organizations_visible_to_user_sparse_query(
+            user_id: int,
+            schema: type[BaseSchemaModel],
+    ) -> Select:
+        columns = [
+            *schema_columns(schema, Organization, prefix="org_"),
+            Organization.created_at.label("keyset_created_at"),
+            Organization.id.label("keyset_id"),
+        ]
+        if "is_user_member" in schema.model_fields:
+            columns.append(visibility.is_organization_member(user_id=user_id).label("is_user_member"))
+        return select(
+            *columns
+        ).where(
+            visibility.organization_listed(user_id=user_id),
+        )
+
     @log_calls
     async def get_organization_by_id(
             self,
             org_id: int,
+            with_long_description: bool = False,
     ) -> Organization | None:
         """
         Поиск объекта Organization по его id
         :param org_id: id объекта Organization
+        :param with_long_description: загрузить отложенную колонку long_description
         :return: объект Organization с указанным id или None
         """
-        result = await self.async_session.execute(
+        stmt = (
             select(
                 Organization
             ).where(
                 Organization.id == org_id,
             )
         )
+        if with_long_description:
+            stmt = stmt.options(undefer(Organization.long_description))
+        result = await self.async_session.execute(stmt)
         return result.scalar_one_or_none()
 
+    @log_calls
+    async def get_organization_detail_info_by_id(
+            self,
+            org_id: int,
+    ) -> OrganizationDetailInfoResponse | None:
+        """
+        Детальная информация об Organization одним запросом: колонки OrganizationDetailInfoResponse,
+        включая long_description и счетчик number_of_members
+        :param org_id: id объекта Organization
+        :return: OrganizationDetailInfoResponse или None, если Organization не существует
+        """
+        stmt = (
+            select(
+                *schema_columns(OrganizationDetailInfoResponse, Organization, "org_")
+            ).where(
+                Organization.id == org_id,
+            )
+        )
+        row = (await self.async_session.execute(stmt)).one_or_none()
+        if row is None:
+            return None
+        fields = schema_row_fields(OrganizationDetailInfoResponse, stmt.selected_columns.keys(), "org_")
+        return OrganizationDetailInfoResponse.model_validate(fields(row))
+
     @log_calls
     async def get_organization_by_vacancy_id(
             self,
@@ -172,7 +376,7 @@ class OrganizationCRUDRepository(BaseCRUDRepository):
             )
         )
         self.async_session.add(instance=new_organization)
-        await self.async_session.commit()
+        await self._commit()
         await self.async_session.refresh(instance=new_organization)
         return new_organization
 
@@ -193,7 +397,7 @@ class OrganizationCRUDRepository(BaseCRUDRepository):
                 Organization.id == org_id,
             )
         )
-        await self.async_session.commit()
+        await self._commit()
         return
 
 
@@ -1,29 +1,55 @@
-from typing import Sequence, Tuple
+from typing import Sequence, Tuple, AsyncIterator, Any
 
-from sqlalchemy import select, Row, delete
+from sqlalchemy import select, Row, delete, Select
 
 from core.dependencies.repository import get_repository
-from core.models import User, Organization
+from core.models import User
 from core.models.organizationMember import OrganizationMember
 from core.repository.crud.base import BaseCRUDRepository
+from core.repository.crud.counters import CounterCRUDRepository
+from core.repository.pagination import PageParams, Page, paginate, build_page
+from core.services.domain.permission_cache import permission_cache
 from core.schemas.organization_member import OrganizationMemberDetailInfo
 from core.utilities.loggers.log_decorator import log_calls
 
 
+def _member_detail_info_fields(row: Row[Tuple[OrganizationMember, User]]) -> dict[str, Any]:
+    """
+    Поля OrganizationMemberDetailInfo из строки запроса
+    """
+    org_member, user = row
+    return {
+        "user_id": user.id,
+        "org_id": org_member.organization_id,
+        "user_name": user.username,
+        "joined_at": org_member.created_at.isoformat(),
+    }
+
+
 class OrganizationMemberCRUDRepository(BaseCRUDRepository):
     @log_calls
     async def delete_member_by_id(
             self,
             member_id: int,
     ) -> None:
-        await self.async_session.execute(
+        result = await self.async_session.execute(
             delete(
                 OrganizationMember
             ).where(
                 OrganizationMember.id == member_id,
+            ).returning(
+                OrganizationMember.user_id,
+                OrganizationMember.organization_id,
             )
         )
-        await self.async_session.commit()
+        deleted = result.one_or_none()
+        if deleted is not None:
+            user_id, org_id = deleted
+            await CounterCRUDRepository(
+                async_session=self.async_session
+            ).add_organization_members(org_ids=[org_id], delta=-1)
+            permission_cache.invalidate_on_commit(async_session=self.async_session, user_id=user_id)
+        await self._commit()
 
 
     @log_calls
@@ -103,66 +129,132 @@ class OrganizationMemberCRUDRepository(BaseCRUDRepository):
     async def get_organization_members_detail_info_by_org_id(
             self,
             org_id: int,
-    ) -> Sequence[OrganizationMemberDetailInfo]:
-
+            page: PageParams | None = None,
+    ) -> Page[OrganizationMemberDetailInfo]:
+        """
+        Участники Organization с информацией о пользователях
+        :param org_id: id объекта Organization
+        :param page: параметры страницы (keyset по OrganizationMember.created_at, id)
+        :return: страница OrganizationMemberDetailInfo
+        """
         rows = await self.async_session.execute(
-            select(
-                OrganizationMember,
-                User,
-                Organization,
-            ).where(
-                OrganizationMember.organization_id == org_id,
-            ).join(
-                User, User.id == OrganizationMember.user_id
-            ).join(
-                Organization, Organization.id == OrganizationMember.organization_id
-            )
-        )
-        tuples: Sequence[
-            Row[
-                Tuple[
-                    OrganizationMember,
-                    User,
-                    Organization,
-                ]
-            ]
-        ] = rows.all()
-
-        result: Sequence[OrganizationMemberDetailInfo] = (
-            [
-                OrganizationMemberDetailInfo(
-                    user_id=user.id,
-                    org_id=org.id,
-                    user_name=user.username,
-                    joined_at=org_member.created_at.isoformat(),
-                ) for org_member, user, org in tuples
-            ]
+            paginate(self._members_detail_info_query(org_id=org_id),
+                     OrganizationMember.created_at, OrganizationMember.id, page)
         )
+        result: Page[OrganizationMemberDetailInfo] = build_page(
+            rows=rows.all(),
+            page=page,
+            key=lambda row: (row[0].created_at, row[0].id),
+            item=_member_detail_info_fields,
+        ).map_all(OrganizationMemberDetailInfo.validate_many)
         return result
 
+    @log_calls
+    def stream_organization_members_detail_info_by_org_id(
+            self,
+            org_id: int,
+    ) -> AsyncIterator[OrganizationMemberDetailInfo]:
+        """
+        То же, что get_organization_members_detail_info_by_org_id, но все строки потоком через серверный курсор
+        :param org_id: id объекта Organization
+        :return: асинхронный итератор OrganizationMemberDetailInfo
+        """
+        return self.stream(
+            stmt=paginate(self._members_detail_info_query(org_id=org_id),
+                          OrganizationMember.created_at, OrganizationMember.id, None),
+            item=lambda row: OrganizationMemberDetailInfo.model_validate(_member_detail_info_fields(row)),
+        )
+
+    @staticmethod
+    def _members_detail_info_query(
+            org_id: int,
+    ) -> Select:
+        return select(
+            OrganizationMember,
+            User,
+        ).where(
+            OrganizationMember.organization_id == org_id,
+        ).join(
+            User, User.id == OrganizationMember.user_id
+        )
+
     @log_calls
     async def create_organization_member(
             self,
             user_id: int,
             org_id: int,
-    ) -> OrganizationMember:
+    ) -> OrganizationMember | None:
         """
         Создает новый объект OrganizationMember с ключами на объекты User и Organization
+        одним INSERT ... ON CONFLICT DO NOTHING RETURNING (ключ _user_org_uc)
         :param user_id: id объекта User
         :param org_id: id объекта Organization
-        :return: возвращает созданный объект OrganizationMember
+        :return: возвращает созданный объект OrganizationMember или None, если User уже состоит в Organization
         """
-        new_org_member: OrganizationMember = (
-            OrganizationMember(
-                user_id=user_id,
-                organization_id=org_id,
+        new_org_member: OrganizationMember | None = (
+            await self.async_session.scalar(
+                self.dialect_insert(
+                    OrganizationMember
+                ).values(
+                    user_id=user_id,
+                    organization_id=org_id,
+                ).on_conflict_do_nothing(
+                    index_elements=["user_id", "organization_id"],
+                ).returning(
+                    OrganizationMember
+                )
             )
         )
-        self.async_session.add(instance=new_org_member)
-        await self.async_session.commit()
-        await self.async_session.refresh(instance=new_org_member)
+        if new_org_member is None:
+            return None
+
+        await CounterCRUDRepository(
+            async_session=self.async_session
+        ).add_organization_members(org_ids=[org_id])
+        permission_cache.invalidate_on_commit(async_session=self.async_session, user_id=user_id)
+        await self._commit()
         return new_org_member
 
+    @log_calls
+    async def create_organization_members(
+            self,
+            org_id: int,
+            user_ids: Sequence[int],
+    ) -> set[int]:
+        """
+        Добавить пакет User в Organization одним многострочным INSERT ... ON CONFLICT DO NOTHING RETURNING
+        (ключ _user_org_uc). COPY здесь не подходит: уже состоящих в Organization нужно пропустить
+        :param org_id: id объекта Organization
+        :param user_ids: id объектов User
+        :return: id User, которые действительно вступили (без уже состоявших)
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return set()
+
+        # Список параметров (а не .values([...])): SQLAlchemy собирает многострочные INSERT сам (insertmanyvalues),
+        # и скомпилированный запрос кэшируется
+        result = await self.async_session.execute(
+            self.dialect_insert(
+                OrganizationMember
+            ).on_conflict_do_nothing(
+                index_elements=["user_id", "organization_id"],
+            ).returning(
+                OrganizationMember.user_id
+            ),
+            [dict(user_id=user_id, organization_id=org_id) for user_id in user_ids],
+        )
+        joined_user_ids: set[int] = set(result.scalars().all())
+
+        if joined_user_ids:
+            await CounterCRUDRepository(
+                async_session=self.async_session
+            ).add_organization_members(org_ids=[org_id] * len(joined_user_ids))
+            for user_id in joined_user_ids:
+                permission_cache.invalidate_on_commit(async_session=self.async_session, user_id=user_id)
+        await self._commit()
+        return joined_user_ids
+
     @log_calls
     async def get_all_user_organization_memberships(
             self,
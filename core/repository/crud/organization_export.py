@@ -0,0 +1,120 @@
+from typing import AsyncIterator, Callable
+
+from sqlalchemy import select, Select, Row
+
+from core.dependencies.repository import get_repository
+from core.models import Application, OrganizationMember, Project, User, Vacancy
+from core.repository.crud.base import BaseCRUDRepository
+from core.schemas.organization_export import OrganizationExportEntity
+from core.utilities.loggers.log_decorator import log_calls
+
+
+def _members_query(org_id: int) -> Select:
+    return select(
+        OrganizationMember.user_id,
+        User.username,
+        OrganizationMember.created_at.label("joined_at"),
+    ).join(
+        User, User.id == OrganizationMember.user_id
+    ).where(
+        OrganizationMember.organization_id == org_id,
+    ).order_by(
+        OrganizationMember.created_at, OrganizationMember.id,
+    )
+
+
+def _projects_query(org_id: int) -> Select:
+    return select(
+        Project.id.label("project_id"),
+        Project.name,
+        Project.short_description,
+        Project.activity_status,
+        Project.visibility,
+        Project.creator_id,
+        Project.created_at,
+        Project.open_vacancies,
+        Project.team_current_size,
+        Project.team_full_size,
+    ).where(
+        Project.organization_id == org_id,
+    ).order_by(
+        Project.created_at, Project.id,
+    )
+
+
+def _vacancies_query(org_id: int) -> Select:
+    return select(
+        Vacancy.id.label("vacancy_id"),
+        Vacancy.project_id,
+        Vacancy.name,
+        Vacancy.short_description,
+        Vacancy.activity_status,
+        Vacancy.visibility,
+        Vacancy.creator_id,
+        Vacancy.created_at,
+        Vacancy.number_of_active_applications,
+    ).join(
+        Project, Project.id == Vacancy.project_id
+    ).where(
+        Project.organization_id == org_id,
+    ).order_by(
+        Vacancy.project_id, Vacancy.created_at, Vacancy.id,
+    )
+
+
+def _applications_query(org_id: int) -> Select:
+    return select(
+        Application.id.label("application_id"),
+        Application.vacancy_id,
+        Vacancy.project_id,
+        Application.user_id,
+        User.username,
+        Application.description,
+        Application.activity_status,
+        Application.created_at,
+        Application.viewed_at,
+    ).join(
+        Vacancy, Vacancy.id == Application.vacancy_id
+    ).join(
+        Project, Project.id == Vacancy.project_id
+    ).join(
+        User, User.id == Application.user_id
+    ).where(
+        Project.organization_id == org_id,
+    ).order_by(
+        Application.vacancy_id, Application.created_at, Application.id,
+    )
+
+
+_EXPORT_QUERIES: dict[OrganizationExportEntity, Callable[[int], Select]] = {
+    OrganizationExportEntity.MEMBERS: _members_query,
+    OrganizationExportEntity.PROJECTS: _projects_query,
+    OrganizationExportEntity.VACANCIES: _vacancies_query,
+    OrganizationExportEntity.APPLICATIONS: _applications_query,
+}
+
+
+class OrganizationExportCRUDRepository(BaseCRUDRepository):
+
+    @log_calls
+    def stream_organization_export(
+            self,
+            org_id: int,
+            entity: OrganizationExportEntity,
+    ) -> AsyncIterator[Row]:
+        """
+        Все строки выгрузки entity организации через серверный курсор (пачками по settings.STREAM_YIELD_PER).
+        Читаются только колонки строки выгрузки, без гидрации ORM-объектов
+        :param org_id: id объекта Organization
+        :param entity: что выгружать
+        :return: асинхронный итератор строк; колонки - поля ORGANIZATION_EXPORT_ROWS[entity] в том же порядке
+        """
+        return self.stream(
+            stmt=_EXPORT_QUERIES[entity](org_id),
+            item=lambda row: row,
+        )
+
+
+organization_export_repo = get_repository(
+    repo_type=OrganizationExportCRUDRepository
+)
@@ -1,10 +1,50 @@
-from sqlalchemy import select
+from typing import Sequence
+
+from sqlalchemy import select, exists, or_, and_, values, column, cast, Integer, delete, CTE
 
 from core.dependencies.repository import get_repository
-from core.models.permissions import Permission, PermissionType, ResourceType
+from core.models import Project, Organization, Vacancy, User, EffectivePermission
+from core.models.permissions import Permission, PermissionType, ResourceType, ADMIN_IMPLIED_PERMISSIONS
 from core.repository.crud.base import BaseCRUDRepository
+from core.repository.crud.effective_permission import EffectivePermissionCRUDRepository
+from core.repository.policies import visibility
+from core.repository.views import EffectivePermissionView
+from core.schemas.permission import PermissionChangeOutcome
 from core.utilities.loggers.log_decorator import log_calls
 
+PermissionKey = tuple[int, ResourceType, int, PermissionType]
+
+_KEY_COLUMNS = (Permission.user_id, Permission.resource_type, Permission.resource_id, Permission.permission_type)
+
+
+def _permission_keys(
+        rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+) -> list[PermissionKey]:
+    keys: list[PermissionKey] = []
+    for user_id, resource_type, resource_id, permission_type in rows:
+        resource_type = ResourceType(resource_type)
+        # Разрешения DOMAIN хранятся с resource_id = user_id (см. visibility.is_admin)
+        if resource_type == ResourceType.DOMAIN and resource_id is None:
+            resource_id = user_id
+        keys.append((user_id, resource_type, resource_id, PermissionType(permission_type)))
+    return keys
+
+
+def _requested_permissions(keys: Sequence[PermissionKey]) -> CTE:
+    """
+    WITH requested(position, user_id, resource_type, resource_id, permission_type) AS (VALUES ...)
+    """
+    return values(
+        column("position", Integer),
+        column("user_id", Integer),
+        column("resource_type", Permission.resource_type.type),
+        column("resource_id", Integer),
+        column("permission_type", Permission.permission_type.type),
+        name="requested",
+    ).data([
+        (position, *key) for position, key in enumerate(keys)
+    ]).cte()
+
 
 class PermissionCRUDRepository(BaseCRUDRepository):
 
@@ -36,6 +76,171 @@ class PermissionCRUDRepository(BaseCRUDRepository):
         )
         return permission.scalar_one_or_none()
 
+    @log_calls
+    async def get_user_permissions(
+            self,
+            user_id: int,
+    ) -> Sequence[Permission]:
+        """
+        Получить все Permission пользователя одним запросом
+        :param user_id: id объекта User
+        :return: последовательность объектов Permission
+        """
+        result = await self.async_session.execute(
+            select(
+                Permission
+            ).where(
+                Permission.user_id == user_id,
+            )
+        )
+        return result.scalars().all()
+
+    @log_calls
+    async def get_user_effective_permissions(
+            self,
+            user_id: int,
+    ) -> Sequence[EffectivePermission]:
+        """
+        Получить все EffectivePermission пользователя одним запросом:
+        прямые Permission и права, унаследованные по иерархии Organization -> Project -> Vacancy
+        :param user_id: id объекта User
+        :return: последовательность объектов EffectivePermission
+        """
+        result = await self.async_session.execute(
+            select(
+                EffectivePermission
+            ).where(
+                EffectivePermission.user_id == user_id,
+            )
+        )
+        return result.scalars().all()
+
+    @log_calls
+    async def get_user_effective_permissions_view(
+            self,
+            user_id: int,
+    ) -> list[EffectivePermissionView]:
+        """
+        То же, что get_user_effective_permissions, но только нужные PermissionSnapshot колонки
+        без гидрации ORM-объектов
+        :param user_id: id объекта User
+        :return: список EffectivePermissionView
+        """
+        result = await self.async_session.execute(
+            select(
+                EffectivePermission.resource_type,
+                EffectivePermission.resource_id,
+                EffectivePermission.permission_type,
+            ).where(
+                EffectivePermission.user_id == user_id,
+            )
+        )
+        return [EffectivePermissionView(*row) for row in result.all()]
+
+    @log_calls
+    async def check_many(
+            self,
+            user_id: int,
+            checks: Sequence[tuple[ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[bool]:
+        """
+        Проверить пакет разрешений одним SQL запросом: список VALUES соединяется с таблицей effective_permission
+        (права, унаследованные от Organization и Project, уже развернуты).
+        ADMIN дополнительно получает разрешения из ADMIN_IMPLIED_PERMISSIONS
+        :param user_id: id объекта User
+        :param checks: последовательность (resource_type, resource_id, permission_type)
+        :return: список bool в порядке checks
+        """
+        if not checks:
+            return []
+
+        requested = values(
+            column("position", Integer),
+            column("resource_type", EffectivePermission.resource_type.type),
+            column("resource_id", Integer),
+            column("permission_type", EffectivePermission.permission_type.type),
+            name="requested",
+        ).data([
+            (position, ResourceType(resource_type), resource_id, PermissionType(permission_type))
+            for position, (resource_type, resource_id, permission_type) in enumerate(checks)
+        ]).cte()  # WITH requested(...) AS (VALUES ...) понимают и PostgreSQL, и SQLite
+        # Параметры внутри VALUES приходят в PostgreSQL как text - приводим к enum-типам колонок
+        requested_resource_type = cast(requested.c.resource_type, EffectivePermission.resource_type.type)
+        requested_permission_type = cast(requested.c.permission_type, EffectivePermission.permission_type.type)
+
+        is_granted = exists().where(
+            EffectivePermission.user_id == user_id,
+            EffectivePermission.resource_type == requested_resource_type,
+            EffectivePermission.resource_id == requested.c.resource_id,
+            EffectivePermission.permission_type == requested_permission_type,
+        )
+        is_admin = visibility.is_admin(user_id=user_id)
+        result = await self.async_session.execute(
+            select(
+                requested.c.position,
+                or_(
+                    is_granted,
+                    and_(
+                        requested_permission_type.in_(ADMIN_IMPLIED_PERMISSIONS),
+                        is_admin,
+                    ),
+                ),
+            )
+        )
+        res: list[bool] = [False] * len(checks)
+        for position, allowed in result.all():
+            res[position] = bool(allowed)
+        return res
+
+    @log_calls
+    async def is_project_visible_to_user(
+            self,
+            user_id: int,
+            project_id: int,
+    ) -> bool:
+        """
+        Может ли User видеть Project. Одно решение - один SQL запрос,
+        правило - visibility.project_visible (то же, что фильтрует списки Project)
+        :param user_id: id объекта User
+        :param project_id: id объекта Project
+        :return: True если Project виден пользователю
+        """
+        is_visible_project = exists().where(
+            Project.id == project_id,
+            Organization.id == Project.organization_id,
+            visibility.project_visible(user_id=user_id),
+        )
+        result = await self.async_session.execute(
+            select(
+                or_(visibility.is_admin(user_id=user_id), is_visible_project)
+            )
+        )
+        return bool(result.scalar())
+
+    @log_calls
+    async def is_organization_visible_to_user(
+            self,
+            user_id: int,
+            org_id: int,
+    ) -> bool:
+        """
+        Может ли User видеть подробную информацию об Organization. Одно решение - один SQL запрос,
+        правило - visibility.organization_detail_visible
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :return: True если Organization видна пользователю
+        """
+        is_visible_organization = exists().where(
+            Organization.id == org_id,
+            visibility.organization_detail_visible(user_id=user_id),
+        )
+        result = await self.async_session.execute(
+            select(
+                or_(visibility.is_admin(user_id=user_id), is_visible_organization)
+            )
+        )
+        return bool(result.scalar())
+
     @log_calls
     async def create_permission(
             self,
@@ -45,7 +250,8 @@ class PermissionCRUDRepository(BaseCRUDRepository):
             permission_type: str,
     ) -> Permission | None:
         """
-        Создать Permission с указанными параметрами
+        Создать Permission с указанными параметрами одним INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Если такой Permission уже есть (ключ _permission_uc), возвращается существующий
         :param user_id: id объекта User
         :param resource_type: тип ресурса (str, Enum)
         :param permission_type: тип разрешения (str, Enum)
@@ -53,25 +259,34 @@ class PermissionCRUDRepository(BaseCRUDRepository):
         :return: созданный или существующий Permission
         """
         permission: Permission | None = (
-            await self.search_exist_permission(
+            await self.async_session.scalar(
+                self.dialect_insert(
+                    Permission
+                ).values(
+                    user_id=user_id,
+                    resource_type=ResourceType(resource_type),
+                    resource_id=resource_id,
+                    permission_type=PermissionType(permission_type),
+                ).on_conflict_do_nothing(
+                    index_elements=["user_id", "resource_type", "resource_id", "permission_type"],
+                ).returning(
+                    Permission
+                )
+            )
+        )
+        if permission is None:
+            # Permission уже был выдан - пересчитывать нечего
+            return await self.search_exist_permission(
                 user_id=user_id,
                 resource_type=resource_type,
                 resource_id=resource_id,
                 permission_type=permission_type,
             )
-        )
-        if permission:
-            return permission
 
-        permission = Permission(
-            user_id=user_id,
-            resource_type=ResourceType(resource_type),
-            resource_id=resource_id,
-            permission_type=PermissionType(permission_type),
-        )
-        self.async_session.add(instance=permission)
-        await self.async_session.commit()
-        await self.async_session.refresh(instance=permission)
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_user(user_id=user_id)
+        await self._commit()
         return permission
 
     @log_calls
@@ -118,6 +333,146 @@ class PermissionCRUDRepository(BaseCRUDRepository):
         )
         return permission
 
+    @log_calls
+    async def grant_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        """
+        Выдать пакет Permission в одной транзакции: один SELECT по VALUES проверяет пользователей, ресурсы
+        и уже выданные права, затем один многострочный INSERT ... ON CONFLICT DO NOTHING RETURNING
+        и один пересчет effective_permission затронутых пользователей
+        :param rows: последовательность (user_id, resource_type, resource_id, permission_type)
+        :return: PermissionChangeOutcome для каждой строки в порядке rows
+        """
+        keys: list[PermissionKey] = _permission_keys(rows)
+        if not keys:
+            return []
+        unique_keys: list[PermissionKey] = list(dict.fromkeys(keys))
+
+        requested = _requested_permissions(unique_keys)
+        # Параметры внутри VALUES приходят в PostgreSQL как text - приводим к enum-типам колонок
+        requested_resource_type = cast(requested.c.resource_type, Permission.resource_type.type)
+        requested_permission_type = cast(requested.c.permission_type, Permission.permission_type.type)
+
+        user_exists = exists().where(User.id == requested.c.user_id)
+        resource_exists = or_(
+            and_(
+                requested_resource_type == ResourceType.ORGANIZATION,
+                exists().where(Organization.id == requested.c.resource_id),
+            ),
+            and_(
+                requested_resource_type == ResourceType.PROJECT,
+                exists().where(Project.id == requested.c.resource_id),
+            ),
+            and_(
+                requested_resource_type == ResourceType.VACANCY,
+                exists().where(Vacancy.id == requested.c.resource_id),
+            ),
+            and_(
+                requested_resource_type == ResourceType.DOMAIN,
+                requested.c.resource_id == requested.c.user_id,
+            ),
+        )
+        is_granted = exists().where(
+            Permission.user_id == requested.c.user_id,
+            Permission.resource_type == requested_resource_type,
+            Permission.resource_id == requested.c.resource_id,
+            Permission.permission_type == requested_permission_type,
+        )
+        result = await self.async_session.execute(
+            select(
+                requested.c.position,
+                user_exists,
+                resource_exists,
+                is_granted,
+            )
+        )
+
+        outcomes: dict[PermissionKey, PermissionChangeOutcome] = {}
+        to_insert: list[PermissionKey] = []
+        for position, user_found, resource_found, granted in result.all():
+            key = unique_keys[position]
+            if not user_found:
+                outcomes[key] = PermissionChangeOutcome.USER_NOT_FOUND
+            elif not resource_found:
+                outcomes[key] = PermissionChangeOutcome.RESOURCE_NOT_FOUND
+            elif granted:
+                outcomes[key] = PermissionChangeOutcome.ALREADY_GRANTED
+            else:
+                # Если право выдали параллельно, ON CONFLICT его пропустит - исход останется ALREADY_GRANTED
+                outcomes[key] = PermissionChangeOutcome.ALREADY_GRANTED
+                to_insert.append(key)
+
+        if to_insert:
+            inserted = await self.async_session.execute(
+                self.dialect_insert(
+                    Permission
+                ).values([
+                    dict(user_id=user_id, resource_type=resource_type, resource_id=resource_id,
+                         permission_type=permission_type)
+                    for user_id, resource_type, resource_id, permission_type in to_insert
+                ]).on_conflict_do_nothing(
+                    index_elements=["user_id", "resource_type", "resource_id", "permission_type"],
+                ).returning(
+                    *_KEY_COLUMNS
+                )
+            )
+            granted_keys: set[PermissionKey] = {tuple(row) for row in inserted.all()}
+            for key in granted_keys:
+                outcomes[key] = PermissionChangeOutcome.GRANTED
+
+            await EffectivePermissionCRUDRepository(
+                async_session=self.async_session
+            ).rebuild_for_users(user_ids=[user_id for user_id, *_ in granted_keys])
+            await self._commit()
+
+        return [outcomes[key] for key in keys]
+
+    @log_calls
+    async def revoke_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        """
+        Отозвать пакет Permission в одной транзакции: один DELETE ... WHERE EXISTS (VALUES ...) RETURNING
+        (SQLite не поддерживает DELETE ... USING) и один пересчет effective_permission затронутых пользователей
+        :param rows: последовательность (user_id, resource_type, resource_id, permission_type)
+        :return: PermissionChangeOutcome для каждой строки в порядке rows
+        """
+        keys: list[PermissionKey] = _permission_keys(rows)
+        if not keys:
+            return []
+
+        requested = _requested_permissions(list(dict.fromkeys(keys)))
+        is_requested = exists().where(
+            Permission.user_id == requested.c.user_id,
+            Permission.resource_type == cast(requested.c.resource_type, Permission.resource_type.type),
+            Permission.resource_id == requested.c.resource_id,
+            Permission.permission_type == cast(requested.c.permission_type, Permission.permission_type.type),
+        )
+        deleted = await self.async_session.execute(
+            delete(
+                Permission
+            ).where(
+                is_requested
+            ).returning(
+                *_KEY_COLUMNS
+            )
+        )
+        revoked_keys: set[PermissionKey] = {tuple(row) for row in deleted.all()}
+
+        if revoked_keys:
+            await EffectivePermissionCRUDRepository(
+                async_session=self.async_session
+            ).rebuild_for_users(user_ids=[user_id for user_id, *_ in revoked_keys])
+            await self._commit()
+
+        return [
+            PermissionChangeOutcome.REVOKED if key in revoked_keys else PermissionChangeOutcome.NOT_GRANTED
+            for key in keys
+        ]
+
 
 permission_repo = get_repository(
     repo_type=PermissionCRUDRepository
@@ -1,56 +1,126 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator, Any, Callable, Iterable
 
-from sqlalchemy import select, update, func
+from sqlalchemy import select, Row, Select
+from sqlalchemy.orm import undefer
 
 from core.dependencies.repository import get_repository
-from core.models import Project, Vacancy
+from core.models import Project, Organization, Vacancy
 from core.models.user import User
 from core.repository.crud.base import BaseCRUDRepository
-from core.schemas.project import ProjectsInOrganizationShortInfoResponse, ProjectManagerInfo, ProjectVisibilityType
-from core.schemas.vacancy import VacancyActivityStatusType
+from core.repository.crud.counters import CounterCRUDRepository
+from core.repository.crud.effective_permission import EffectivePermissionCRUDRepository
+from core.repository.pagination import PageParams, Page, paginate, build_page
+from core.repository.policies import visibility
+from core.repository.projection import schema_columns, schema_row_fields
+from core.schemas.base import BaseSchemaModel
+from core.schemas.project import ProjectsInOrganizationShortInfoResponse, ProjectVisibilityType
 from core.utilities.loggers.log_decorator import log_calls
 
 
+def _project_short_info_fields(
+        schema: type[BaseSchemaModel],
+        keys: Iterable[str],
+) -> Callable[[Row], dict[str, Any]]:
+    """
+    Функция, собирающая поля schema (ProjectsInOrganizationShortInfoResponse или ее sparse вариант)
+    из строки запроса _projects_short_info_query
+    """
+    to_fields = schema_row_fields(schema, keys, prefix="project_")
+    if "project_manager" not in schema.model_fields:
+        return to_fields
+
+    def fields(row: Row) -> dict[str, Any]:
+        res = to_fields(row)
+        res["project_manager"] = {
+            "user_id": row.creator_id,
+            "avatar": "",
+            "name": row.creator_username,
+        }
+        return res
+
+    return fields
+
+
 class ProjectCRUDRepository(BaseCRUDRepository):
 
     async def get_projects_short_info_in_organization(
         self,
-        user_id: int, # затем будет фильтрация по видимости для пользователя
+        user_id: int,
         org_id: int,
-    ) -> Sequence[ProjectsInOrganizationShortInfoResponse]:
-
+        page: PageParams | None = None,
+        fields: frozenset[str] | None = None,
+    ) -> Page[ProjectsInOrganizationShortInfoResponse]:
+        """
+        Краткая информация о Project в Organization, видимых пользователю (visibility.project_visible).
+        Невидимые Project отфильтровываются в БД
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :param page: параметры страницы (keyset по created_at, id)
+        :param fields: только эти поля схемы (?fields=), None - все поля
+        :return: страница ProjectsInOrganizationShortInfoResponse (или ее sparse варианта)
+        """
+        schema = ProjectsInOrganizationShortInfoResponse.sparse(fields)
+        query = self._projects_short_info_query(user_id=user_id, org_id=org_id, schema=schema)
         result = await self.async_session.execute(
+            paginate(query, Project.created_at, Project.id, page)
+        )
+        res = build_page(
+            rows=result.all(),
+            page=page,
+            key=lambda row: (row.keyset_created_at, row.keyset_id),
+            item=_project_short_info_fields(schema, query.selected_columns.keys()),
+        )
+        return res.map_all(schema.validate_many)
+
+    @log_calls
+    def stream_projects_short_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> AsyncIterator[ProjectsInOrganizationShortInfoResponse]:
+        """
+        То же, что get_projects_short_info_in_organization, но все строки потоком через серверный курсор
+        :param user_id: id объекта User
+        :param org_id: id объекта Organization
+        :param fields: только эти поля схемы (?fields=), None - все поля
+        :return: асинхронный итератор ProjectsInOrganizationShortInfoResponse (или ее sparse варианта)
+        """
+        schema = ProjectsInOrganizationShortInfoResponse.sparse(fields)
+        query = self._projects_short_info_query(user_id=user_id, org_id=org_id, schema=schema)
+        to_fields = _project_short_info_fields(schema, query.selected_columns.keys())
+        return self.stream(
+            stmt=paginate(query, Project.created_at, Project.id, None),
+            item=lambda row: schema.model_validate(to_fields(row)),
+        )
+
+    @staticmethod
+    def _projects_short_info_query(
+            user_id: int,
+            org_id: int,
+            schema: type[BaseSchemaModel],
+    ) -> Select:
+        # только колонки ответа: без гидрации Project/User (без long_description и User.hashed_password).
+        # Счетчики карточки - денормализованные колонки Project (см. CounterCRUDRepository),
+        # User присоединяется, только если запрошен project_manager
+        query = (
             select(
-                Project,
-                User,
-                func.count(Vacancy.id).filter(
-                    (Vacancy.activity_status == VacancyActivityStatusType.ACTIVE.value)
-                    & (Vacancy.project_id == Project.id)
-                ).label("open_vacancies")
+                *schema_columns(schema, Project, prefix="project_"),
+                Project.created_at.label("keyset_created_at"),
+                Project.id.label("keyset_id"),
             )
-            .join(User, User.id == Project.creator_id)
-            .outerjoin(Vacancy, Vacancy.project_id == Project.id)
-            .where(Project.organization_id == org_id)
-            .group_by(Project.id, User.id)
-        )
-        rows = result.all()
-        res = [
-            ProjectsInOrganizationShortInfoResponse(
-                project_id=project.id,
-                project_name=project.name,
-                project_short_description=project.short_description,
-                project_manager=ProjectManagerInfo(
-                    user_id=user.id,
-                    avatar="",
-                    name=user.username,
-                ),
-                project_open_vacancies=open_vacancies,
-                project_team_current_size=0,
-                project_team_full_size=0,
+            .join(Organization, Organization.id == Project.organization_id)
+            .where(
+                Project.organization_id == org_id,
+                visibility.project_visible(user_id=user_id),
             )
-            for project, user, open_vacancies in rows
-        ]
-        return res
+        )
+        if "project_manager" in schema.model_fields:
+            query = query.add_columns(
+                User.id.label("creator_id"),
+                User.username.label("creator_username"),
+            ).join(User, User.id == Project.creator_id)
+        return query
 
     @log_calls
     async def is_project_open(
@@ -106,23 +176,53 @@ class ProjectCRUDRepository(BaseCRUDRepository):
         projects = result.scalars().all()
         return projects
 
+    @log_calls
+    async def get_project_ids_in_organization(
+            self,
+            org_id: int,
+            project_ids: Iterable[int],
+    ) -> set[int]:
+        """
+        Какие из project_ids принадлежат Organization (проверка пакета строк импорта одним запросом)
+        :param org_id: id объекта Organization
+        :param project_ids: id объектов Project
+        :return: множество id Project организации
+        """
+        project_ids = set(project_ids)
+        if not project_ids:
+            return set()
+        result = await self.async_session.execute(
+            select(
+                Project.id
+            ).where(
+                Project.organization_id == org_id,
+                Project.id.in_(project_ids),
+            )
+        )
+        return set(result.scalars().all())
+
     @log_calls
     async def get_project_by_id(
             self,
             project_id: int,
+            with_long_description: bool = False,
     ) -> Project | None:
         """
         Получить Project по его id
         :param project_id: id искомого объекта Project
+        :param with_long_description: загрузить отложенную колонку long_description
         :return: объект Project или None
         """
-        result = await self.async_session.execute(
+        stmt = (
             select(
                 Project
             ).where(
                 Project.id == project_id,
             )
         )
+        if with_long_description:
+            stmt = stmt.options(undefer(Project.long_description))
+        result = await self.async_session.execute(stmt)
         project = result.scalars().one_or_none()
         return project
 
@@ -169,32 +269,48 @@ class ProjectCRUDRepository(BaseCRUDRepository):
         :param activity_status: тип активности (str, Enum)
         :return: обновленный объект Project или None
         """
-        await self.async_session.execute(
-            update(
-                Project
+        previous_org_id: int | None = await self.async_session.scalar(
+            select(
+                Project.organization_id
             ).where(
-                Project.id == project_id
-            ).values(
-                organization_id=org_id,
-                name=name,
-                short_description=short_description,
-                long_description=long_description,
-                visibility=visibility,
-                activity_status=activity_status
-            ).execution_options(
-                synchronize_session="fetch"
+                Project.id == project_id,
             )
         )
-        await self.async_session.commit()
-
-        result = await self.async_session.execute(
-            select(
-                Project
-            ).where(
-                Project.id == project_id
+        project: Project | None = (
+            await self.update_returning(
+                model=Project,
+                where=Project.id == project_id,
+                values=dict(
+                    organization_id=org_id,
+                    name=name,
+                    short_description=short_description,
+                    long_description=long_description,
+                    visibility=visibility,
+                    activity_status=activity_status,
+                ),
             )
         )
-        return result.scalar_one_or_none()
+        if project is None:
+            return None
+
+        # Project мог переехать в другую Organization - права, унаследованные от нее, меняются,
+        # как и лимиты откликов пользователей на Vacancy этого Project
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_project(project_id=project_id)
+        if previous_org_id != org_id:
+            vacancy_ids: Sequence[int] = (await self.async_session.scalars(
+                select(
+                    Vacancy.id
+                ).where(
+                    Vacancy.project_id == project_id,
+                )
+            )).all()
+            await CounterCRUDRepository(
+                async_session=self.async_session
+            ).refresh_application_quotas(vacancy_ids=vacancy_ids)
+        await self._commit()
+        return project
 
     @log_calls
     async def create_project(
@@ -228,7 +344,11 @@ class ProjectCRUDRepository(BaseCRUDRepository):
             visibility=visibility
         )
         self.async_session.add(instance=new_project)
-        await self.async_session.commit()
+        await self.async_session.flush()
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_project(project_id=new_project.id)
+        await self._commit()
         await self.async_session.refresh(instance=new_project)
         return new_project
 
@@ -1,10 +1,11 @@
 import typing
 
-from sqlalchemy import select
+from sqlalchemy import select, or_
 
 from core.dependencies.repository import get_repository
 from core.models.user import User
 from core.repository.crud.base import BaseCRUDRepository
+from core.repository.views import UserView
 from core.schemas.user import UserCreate
 from core.services.security import hash_password, verify_password, create_access_token
 from core.utilities.exceptions.auth import TokenException
@@ -18,25 +19,23 @@ class UserCRUDRepository(BaseCRUDRepository):
             self,
             data: UserCreate
     ) -> User:
-        user_exists = (
+        user: User | None = (
             await self.async_session.scalar(
-                select(
+                self.dialect_insert(
+                    User
+                ).values(
+                    username=data.username,
+                    hashed_password=hash_password(data.password),
+                ).on_conflict_do_nothing(
+                    index_elements=["username"],
+                ).returning(
                     User
-                ).where(
-                    User.username == data.username,
                 )
             )
         )
-        if user_exists:
+        if user is None:
             raise EntityAlreadyExists("Account with id `{id}` already exist!")
-
-        user = User(
-            username=data.username,
-            hashed_password=hash_password(data.password)
-        )
-        self.async_session.add(user)
-        await self.async_session.commit()
-        await self.async_session.refresh(user)
+        await self._commit()
 
         return user
 
@@ -77,6 +76,27 @@ class UserCRUDRepository(BaseCRUDRepository):
         user = res.scalar_one_or_none()
         return user
 
+    @log_calls
+    async def get_user_by_username_view(
+            self,
+            username: str,
+    ) -> UserView | None:
+        """
+        То же, что get_user_by_username, но без гидрации ORM-объекта и без hashed_password
+        :param username: имя пользователя
+        :return: UserView или None
+        """
+        res = await self.async_session.execute(
+            select(
+                User.id,
+                User.username,
+            ).where(
+                User.username == username,
+            )
+        )
+        row = res.one_or_none()
+        return UserView(*row) if row is not None else None
+
     @log_calls
     async def get_user_by_id(
             self,
@@ -97,6 +117,33 @@ class UserCRUDRepository(BaseCRUDRepository):
         res = await self.async_session.execute(stmt)
         return res.scalars().one_or_none()
 
+    @log_calls
+    async def get_users_by_ids_or_usernames(
+            self,
+            user_ids: typing.Collection[int],
+            usernames: typing.Collection[str],
+    ) -> list[UserView]:
+        """
+        Найти существующих User по id и по username одним запросом (проверка пакета строк импорта)
+        :param user_ids: id объектов User
+        :param usernames: имена пользователей
+        :return: список UserView найденных пользователей
+        """
+        if not user_ids and not usernames:
+            return []
+        res = await self.async_session.execute(
+            select(
+                User.id,
+                User.username,
+            ).where(
+                or_(
+                    User.id.in_(user_ids),
+                    User.username.in_(usernames),
+                )
+            )
+        )
+        return [UserView(*row) for row in res.all()]
+
     # Debug!!!!
     @log_calls
     async def get_all_users(
@@ -1,18 +1,51 @@
-from typing import Sequence, Tuple
+from typing import Sequence, Tuple, AsyncIterator, Any, Mapping
 
-from sqlalchemy import select, update, Row, and_
+from sqlalchemy import select, Row, and_, Select, insert, func
 
 from core.dependencies.repository import get_repository
-from core.models import Project
-from core.models.permissions import Permission, PermissionType, ResourceType
+from core.models import Project, EffectivePermission
+from core.models.permissions import PermissionType, ResourceType
 from core.models.user import User
 from core.models.vacancy import Vacancy
 from core.repository.crud.base import BaseCRUDRepository
-from core.schemas.project import ProjectManagerInfo, ProjectOfVacancyInfo, ProjectVacanciesFullInfoResponse
-from core.schemas.vacancy import VacancyActivityStatusType, VacancyVisibilityType
+from core.repository.crud.counters import CounterCRUDRepository
+from core.repository.crud.effective_permission import EffectivePermissionCRUDRepository
+from core.repository.pagination import PageParams, Page, paginate, build_page
+from core.repository.projection import schema_columns, schema_row_fields
+from core.schemas.project import ProjectVacanciesFullInfoResponse
+from core.schemas.vacancy import VacancyShortInfoResponse
 from core.utilities.loggers.log_decorator import log_calls
 
 
+def _vacancy_full_info_fields(row: Row[Tuple[Vacancy, Project, User, int | None]]) -> dict[str, Any]:
+    """
+    Поля ProjectVacanciesFullInfoResponse из строки запроса
+    """
+    vacancy, project, manager, permission_for_edit_vacancy = row
+    return {
+        "vacancy_id": vacancy.id,
+        "manager": {
+            "user_id": manager.id,
+            "avatar": '',
+            "name": manager.username,
+        },
+        "project": {
+            "id": project.id,
+            "name": project.name,
+        },
+        "name": vacancy.name,
+        "short_description": vacancy.short_description,
+        "number_of_active_offers": 0,
+        "number_of_active_applications": vacancy.number_of_active_applications,
+        "created_at": vacancy.created_at.isoformat(),
+        "activity_status": vacancy.activity_status,
+        "visibility": vacancy.visibility,
+        "can_user_edit": (
+            not permission_for_edit_vacancy is None
+        ),
+    }
+
+
 class VacancyCRUDRepository(BaseCRUDRepository):
     @log_calls
     async def get_all_vacancies_in_project(
@@ -39,13 +72,56 @@ class VacancyCRUDRepository(BaseCRUDRepository):
             self,
             project_id: int,
             user_id: int,
-    ) -> Sequence[ProjectVacanciesFullInfoResponse]:
-        stmt = (
+            page: PageParams | None = None,
+    ) -> Page[ProjectVacanciesFullInfoResponse]:
+        """
+        Vacancy в Project с флагом can_user_edit (право берется из effective_permission)
+        :param project_id: id объекта Project
+        :param user_id: id объекта User
+        :param page: параметры страницы (keyset по Vacancy.created_at, id)
+        :return: страница ProjectVacanciesFullInfoResponse
+        """
+        rows = await self.async_session.execute(
+            paginate(self._vacancies_detailed_info_query(project_id=project_id, user_id=user_id),
+                     Vacancy.created_at, Vacancy.id, page)
+        )
+        result: Page[ProjectVacanciesFullInfoResponse] = build_page(
+            rows=rows.all(),
+            page=page,
+            key=lambda row: (row[0].created_at, row[0].id),
+            item=_vacancy_full_info_fields,
+        ).map_all(ProjectVacanciesFullInfoResponse.validate_many)
+        return result
+
+    @log_calls
+    def stream_all_vacancies_in_project_detailed_info(
+            self,
+            project_id: int,
+            user_id: int,
+    ) -> AsyncIterator[ProjectVacanciesFullInfoResponse]:
+        """
+        То же, что get_all_vacancies_in_project_detailed_info, но все строки потоком через серверный курсор
+        :param project_id: id объекта Project
+        :param user_id: id объекта User
+        :return: асинхронный итератор ProjectVacanciesFullInfoResponse
+        """
+        return self.stream(
+            stmt=paginate(self._vacancies_detailed_info_query(project_id=project_id, user_id=user_id),
+                          Vacancy.created_at, Vacancy.id, None),
+            item=lambda row: ProjectVacanciesFullInfoResponse.model_validate(_vacancy_full_info_fields(row)),
+        )
+
+    @staticmethod
+    def _vacancies_detailed_info_query(
+            project_id: int,
+            user_id: int,
+    ) -> Select:
+        return (
             select(
                 Vacancy,
                 Project,
                 User,
-                Permission.id.label("permission_id_for_edit_vacancy"),
+                EffectivePermission.id.label("permission_id_for_edit_vacancy"),
             )
             .join(
                 Project,
@@ -55,12 +131,12 @@ class VacancyCRUDRepository(BaseCRUDRepository):
                   User.id == Vacancy.creator_id,
                   )
             .outerjoin(
-                Permission,
+                EffectivePermission,
                 and_(
-                    Permission.user_id == user_id,
-                    Permission.resource_type == ResourceType.VACANCY.value,
-                    Permission.resource_id == Vacancy.id,
-                    Permission.permission_type == PermissionType.EDIT_VACANCY.value,
+                    EffectivePermission.user_id == user_id,
+                    EffectivePermission.resource_type == ResourceType.VACANCY.value,
+                    EffectivePermission.resource_id == Vacancy.id,
+                    EffectivePermission.permission_type == PermissionType.EDIT_VACANCY.value,
                 )
             )
             .where(
@@ -68,46 +144,6 @@ class VacancyCRUDRepository(BaseCRUDRepository):
             )
         )
 
-        rows = await self.async_session.execute(stmt)
-        tuples: Sequence[
-            Row[
-                Tuple[
-                    Vacancy,
-                    Project,
-                    User,
-                    int | None
-                ]
-            ]
-        ] = rows.all()
-
-        result: Sequence[ProjectVacanciesFullInfoResponse] = \
-            [
-                ProjectVacanciesFullInfoResponse(
-                    vacancy_id=vacancy.id,
-                    manager=ProjectManagerInfo(
-                        user_id=manager.id,
-                        avatar='',
-                        name=manager.username,
-                    ),
-                    project=ProjectOfVacancyInfo(
-                        id=project.id,
-                        name=project.name,
-                    ),
-                    name=vacancy.name,
-                    short_description=vacancy.short_description,
-                    number_of_active_offers=0,
-                    number_of_active_applications=0,
-                    created_at=vacancy.created_at.isoformat(),
-                    activity_status=VacancyActivityStatusType(vacancy.activity_status),
-                    visibility=VacancyVisibilityType(vacancy.visibility),
-                    can_user_edit=(
-                        not permission_for_edit_vacancy is None
-                    ),
-                ) for vacancy, project, manager, permission_for_edit_vacancy in tuples
-            ]
-
-        return result
-
     @log_calls
     async def get_vacancy_by_id(
             self,
@@ -128,6 +164,29 @@ class VacancyCRUDRepository(BaseCRUDRepository):
         vacancy = result.scalars().one_or_none()
         return vacancy
 
+    @log_calls
+    async def get_vacancy_short_info_by_id(
+            self,
+            vacancy_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> VacancyShortInfoResponse | None:
+        """
+        Краткая информация о Vacancy: читаются только колонки, нужные VacancyShortInfoResponse
+        :param vacancy_id: id объекта Vacancy
+        :param fields: только эти поля схемы (?fields=), None - все поля
+        :return: VacancyShortInfoResponse (или ее sparse вариант) или None
+        """
+        schema = VacancyShortInfoResponse.sparse(fields)
+        query = select(
+            *schema_columns(schema, Vacancy, prefix="vacancy_")
+        ).where(
+            Vacancy.id == vacancy_id
+        )
+        row = (await self.async_session.execute(query)).one_or_none()
+        if row is None:
+            return None
+        return schema.model_validate(schema_row_fields(schema, query.selected_columns.keys(), prefix="vacancy_")(row))
+
     @log_calls
     async def patch_vacancy_by_id(
             self,
@@ -138,26 +197,68 @@ class VacancyCRUDRepository(BaseCRUDRepository):
             visibility: str,
             activity_status: str
     ) -> Vacancy | None:
-        stmt = (
-            update(Vacancy)
-            .where(Vacancy.id == vacancy_id)
-            .values(
-                project_id=project_id,
-                name=name,
-                short_description=short_description,
-                visibility=visibility,
-                activity_status=activity_status
+        previous_project_id: int | None = await self.async_session.scalar(
+            select(
+                Vacancy.project_id
+            ).where(
+                Vacancy.id == vacancy_id,
+            )
+        )
+        vacancy: Vacancy | None = (
+            await self.update_returning(
+                model=Vacancy,
+                where=Vacancy.id == vacancy_id,
+                values=dict(
+                    project_id=project_id,
+                    name=name,
+                    short_description=short_description,
+                    visibility=visibility,
+                    activity_status=activity_status,
+                ),
             )
-            .execution_options(synchronize_session="fetch")
         )
+        if vacancy is None:
+            return None
 
-        await self.async_session.execute(stmt)
-        await self.async_session.commit()
+        # Vacancy мог переехать в другой Project - права, унаследованные от него, и счетчики обоих Project меняются,
+        # а при переезде в другую Organization - и лимиты откликов пользователей на Vacancy
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_vacancy(vacancy_id=vacancy_id)
+        counter_repo = CounterCRUDRepository(async_session=self.async_session)
+        await counter_repo.refresh_for_vacancies(vacancy_ids=[vacancy_id], project_ids=[previous_project_id])
+        if previous_project_id != project_id:
+            await counter_repo.refresh_application_quotas(vacancy_ids=[vacancy_id])
+        await self._commit()
+        return vacancy
 
-        result = await self.async_session.execute(
-            select(Vacancy).where(Vacancy.id == vacancy_id)
+    @log_calls
+    async def change_vacancy_status(
+            self,
+            vacancy_id: int,
+            activity_status: str,
+    ) -> Vacancy | None:
+        """
+        Поменять статус Vacancy одним UPDATE ... RETURNING (и пересчитать счетчики ее Project)
+        :param vacancy_id: id объекта Vacancy
+        :param activity_status: новый статус (str, Enum)
+        :return: обновленный объект Vacancy или None
+        """
+        vacancy: Vacancy | None = (
+            await self.update_returning(
+                model=Vacancy,
+                where=Vacancy.id == vacancy_id,
+                values=dict(
+                    activity_status=activity_status,
+                ),
+            )
         )
-        return result.scalar_one_or_none()
+        if vacancy is not None:
+            await CounterCRUDRepository(
+                async_session=self.async_session
+            ).refresh_for_vacancies(vacancy_ids=[vacancy_id])
+        await self._commit()
+        return vacancy
 
     @log_calls
     async def create_vacancy(
@@ -179,10 +280,78 @@ class VacancyCRUDRepository(BaseCRUDRepository):
         )
 
         self.async_session.add(instance=new_vacancy)
-        await self.async_session.commit()
+        await self.async_session.flush()
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_vacancy(vacancy_id=new_vacancy.id)
+        await CounterCRUDRepository(
+            async_session=self.async_session
+        ).refresh_for_vacancies(vacancy_ids=[new_vacancy.id])
+        await self._commit()
         await self.async_session.refresh(instance=new_vacancy)
 
         return new_vacancy
 
 
+    @log_calls
+    async def create_vacancies(
+            self,
+            user_id: int,
+            vacancies: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """
+        Создать пакет Vacancy: COPY в PostgreSQL, executemany в остальных диалектах.
+        COPY не возвращает id, поэтому новые Vacancy находятся как Vacancy пакетных Project с id больше
+        максимального id до вставки (последовательность выдает им большие id)
+        :param user_id: id объекта User - создателя Vacancy
+        :param vacancies: словари с ключами project_id, name, short_description, activity_status, visibility
+        """
+        if not vacancies:
+            return
+        columns = ("creator_id", "project_id", "name", "short_description", "activity_status", "visibility")
+        records = [
+            (user_id, vacancy["project_id"], vacancy["name"], vacancy["short_description"],
+             vacancy["activity_status"], vacancy["visibility"])
+            for vacancy in vacancies
+        ]
+        project_ids = sorted({vacancy["project_id"] for vacancy in vacancies})
+
+        # Project блокируются до вставки в том же порядке, что и в CounterCRUDRepository.refresh_for_vacancies.
+        # Заодно этот запрос открывает транзакцию драйвера, в которой затем выполняется COPY
+        await self.async_session.execute(
+            select(
+                Project.id
+            ).where(
+                Project.id.in_(project_ids),
+            ).order_by(
+                Project.id
+            ).with_for_update()
+        )
+        last_vacancy_id: int = await self.async_session.scalar(select(func.coalesce(func.max(Vacancy.id), 0)))
+
+        if self.async_session.get_bind().dialect.name == "postgresql":
+            connection = await self.async_session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                Vacancy.__tablename__,
+                records=records,
+                columns=columns,
+            )
+        else:
+            await self.async_session.execute(
+                insert(Vacancy),
+                [dict(zip(columns, record)) for record in records],
+            )
+
+        await EffectivePermissionCRUDRepository(
+            async_session=self.async_session
+        ).rebuild_for_vacancies(
+            vacancy_ids=select(Vacancy.id).where(Vacancy.project_id.in_(project_ids), Vacancy.id > last_vacancy_id),
+        )
+        await CounterCRUDRepository(
+            async_session=self.async_session
+        ).refresh_for_vacancies(vacancy_ids=(), project_ids=project_ids)
+        await self._commit()
+
+
 vacancy_repo = get_repository(repo_type=VacancyCRUDRepository)
@@ -0,0 +1,146 @@
+"""
+Keyset пагинация по (created_at, id).
+
+Страница - один запрос вида
+    WHERE (created_at, id) > (:cursor_created_at, :cursor_id) ORDER BY created_at, id LIMIT :limit + 1
+который при индексе (..., created_at, id) выполняется одним range scan, независимо от номера страницы.
+Лишняя (limit + 1)-я строка говорит о том, что есть следующая страница
+
+В SQLite created_at хранится строкой, а server_default пишет ее без микросекунд ('YYYY-MM-DD HH:MM:SS'),
+тогда как параметр курсора биндится с ними ('...:SS.000000'). Строки сравнивались бы как текст и
+строки с той же секундой, что и у курсора, терялись бы, поэтому там created_at сравнивается и
+сортируется через julianday (см. _keyset_timestamp). В PostgreSQL выражение - сама колонка
+"""
+import base64
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Generic, TypeVar, Callable, Sequence, Any
+
+from sqlalchemy import Select, tuple_, ColumnElement, DateTime, literal
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from core.utilities.exceptions.pagination import InvalidCursor
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(frozen=True, slots=True)
+class PageParams:
+    """
+    Параметры запрошенной страницы
+    limit - размер страницы, after - ключ (created_at, id) последней строки предыдущей страницы
+    """
+    limit: int
+    after: tuple[datetime.datetime, int] | None = None
+
+
+@dataclass(slots=True)
+class Page(Generic[T]):
+    """
+    Страница результатов. next_cursor - None, если страница последняя
+    """
+    items: list[T]
+    next_cursor: str | None = None
+
+    def map(self, func: Callable[[T], R]) -> "Page[R]":
+        return Page(items=[func(item) for item in self.items], next_cursor=self.next_cursor)
+
+    def map_all(self, func: Callable[[list[T]], list[R]]) -> "Page[R]":
+        """
+        Преобразовать все элементы страницы одним вызовом (например, BaseSchemaModel.validate_many)
+        """
+        return Page(items=func(self.items), next_cursor=self.next_cursor)
+
+
+class _keyset_timestamp(FunctionElement):
+    """
+    created_at в keyset условии и сортировке: в PostgreSQL - как есть, в SQLite - julianday(created_at),
+    чтобы значения с микросекундами и без сравнивались как моменты времени, а не как строки
+    """
+    inherit_cache = True
+    type = DateTime()
+
+
+@compiles(_keyset_timestamp)
+def _compile_keyset_timestamp(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(_keyset_timestamp, "sqlite")
+def _compile_keyset_timestamp_sqlite(element, compiler, **kw):
+    return f"julianday({compiler.process(element.clauses, **kw)})"
+
+
+def encode_cursor(
+        created_at: datetime.datetime,
+        id_: int,
+) -> str:
+    raw = json.dumps([created_at.isoformat(), id_], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+        cursor: str,
+) -> tuple[datetime.datetime, int]:
+    """
+    :param cursor: значение next_cursor из предыдущего ответа
+    :return: ключ (created_at, id)
+    :raises InvalidCursor: курсор не удалось разобрать
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id_ = json.loads(raw)
+        return datetime.datetime.fromisoformat(created_at), int(id_)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def paginate(
+        stmt: Select,
+        created_at: ColumnElement,
+        id_: ColumnElement,
+        page: PageParams | None,
+) -> Select:
+    """
+    Добавить к запросу условие keyset, сортировку и LIMIT
+    :param stmt: исходный запрос
+    :param created_at: колонка created_at сущности, по которой идет пагинация
+    :param id_: колонка id той же сущности
+    :param page: параметры страницы; None - все строки (для внутренних вызовов)
+    :return: запрос одной страницы (с одной лишней строкой)
+    """
+    if page is None:
+        return stmt.order_by(created_at, id_)
+    timestamp = _keyset_timestamp(created_at)
+    if page.after is not None:
+        after_created_at, after_id = page.after
+        stmt = stmt.where(
+            tuple_(timestamp, id_) > tuple_(_keyset_timestamp(literal(after_created_at, type_=created_at.type)), after_id)
+        )
+    return stmt.order_by(timestamp, id_).limit(page.limit + 1)
+
+
+def build_page(
+        rows: Sequence[Any],
+        page: PageParams | None,
+        key: Callable[[Any], tuple[datetime.datetime, int]],
+        item: Callable[[Any], T],
+) -> Page[T]:
+    """
+    Собрать Page из строк, полученных запросом paginate
+    :param rows: строки результата
+    :param page: параметры страницы
+    :param key: ключ (created_at, id) строки
+    :param item: преобразование строки в элемент страницы
+    :return: Page с next_cursor, если строк больше limit
+    """
+    if page is None:
+        return Page(items=[item(row) for row in rows])
+
+    has_next = len(rows) > page.limit
+    rows = rows[:page.limit]
+    next_cursor = encode_cursor(*key(rows[-1])) if has_next else None
+    return Page(items=[item(row) for row in rows], next_cursor=next_cursor)
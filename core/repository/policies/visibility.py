@@ -0,0 +1,157 @@
+"""
+Правила видимости Organization и Project (и права на Vacancy) в виде SQL условий.
+
+Условия коррелированы с колонками Organization / Project / Vacancy внешнего запроса, поэтому одно и то же
+определение используется и для фильтрации списков (WHERE), и для проверки одной сущности
+(EXISTS с Organization.id == org_id). Права берутся из effective_permission, т.е. с учетом наследования
+"""
+from sqlalchemy import exists, or_, and_, select, ColumnElement, Select
+
+from core.models import Organization, Project, Vacancy, OrganizationMember, EffectivePermission
+from core.models.permissions import PermissionType, ResourceType
+from core.schemas.organization import OrganizationVisibilityType, OrganizationJoinPolicyType
+from core.schemas.project import ProjectVisibilityType
+
+
+def is_admin(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User - ADMIN
+    """
+    return exists().where(
+        EffectivePermission.user_id == user_id,
+        EffectivePermission.resource_type == ResourceType.DOMAIN.value,
+        EffectivePermission.resource_id == user_id,
+        EffectivePermission.permission_type == PermissionType.ADMIN.value,
+    )
+
+
+def is_organization_member(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User состоит в Organization внешнего запроса
+    """
+    return exists().where(
+        OrganizationMember.user_id == user_id,
+        OrganizationMember.organization_id == Organization.id,
+    )
+
+
+def can_edit_organization(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User может редактировать Organization внешнего запроса
+    """
+    return exists().where(
+        EffectivePermission.user_id == user_id,
+        EffectivePermission.resource_type == ResourceType.ORGANIZATION.value,
+        EffectivePermission.resource_id == Organization.id,
+        EffectivePermission.permission_type == PermissionType.EDIT_ORGANIZATION.value,
+    )
+
+
+def can_edit_project(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User может редактировать Project внешнего запроса (в том числе по праву на Organization)
+    """
+    return exists().where(
+        EffectivePermission.user_id == user_id,
+        EffectivePermission.resource_type == ResourceType.PROJECT.value,
+        EffectivePermission.resource_id == Project.id,
+        EffectivePermission.permission_type == PermissionType.EDIT_PROJECT.value,
+    )
+
+
+def can_edit_vacancy(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User может редактировать Vacancy внешнего запроса (в том числе по праву на Project или Organization)
+    """
+    return exists().where(
+        EffectivePermission.user_id == user_id,
+        EffectivePermission.resource_type == ResourceType.VACANCY.value,
+        EffectivePermission.resource_id == Vacancy.id,
+        EffectivePermission.permission_type == PermissionType.EDIT_VACANCY.value,
+    )
+
+
+def editable_vacancy_ids(
+        user_id: int,
+) -> Select:
+    """
+    id Vacancy, которые User может редактировать - для Vacancy.id.in_(...), когда строки выбираются
+    по правам пользователя (диапазон уникального индекса effective_permission), а не права проверяются для строк
+    """
+    return select(
+        EffectivePermission.resource_id
+    ).where(
+        EffectivePermission.user_id == user_id,
+        EffectivePermission.resource_type == ResourceType.VACANCY.value,
+        EffectivePermission.permission_type == PermissionType.EDIT_VACANCY.value,
+    )
+
+
+def _is_organization_insider(
+        user_id: int,
+) -> ColumnElement[bool]:
+    return or_(
+        is_admin(user_id=user_id),
+        is_organization_member(user_id=user_id),
+        can_edit_organization(user_id=user_id),
+    )
+
+
+def organization_listed(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    Organization попадает в общий список: она открыта для просмотра,
+    либо User - ADMIN, участник или может ее редактировать
+    """
+    return or_(
+        Organization.visibility == OrganizationVisibilityType.OPEN.value,
+        _is_organization_insider(user_id=user_id),
+    )
+
+
+def organization_detail_visible(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User может видеть подробную информацию об Organization: она открыта и для просмотра, и для вступления,
+    либо User - ADMIN, участник или может ее редактировать
+    """
+    return or_(
+        and_(
+            Organization.join_policy == OrganizationJoinPolicyType.OPEN.value,
+            Organization.visibility == OrganizationVisibilityType.OPEN.value,
+        ),
+        _is_organization_insider(user_id=user_id),
+    )
+
+
+def project_visible(
+        user_id: int,
+) -> ColumnElement[bool]:
+    """
+    User может видеть Project: ADMIN, или может редактировать Project,
+    или Project открыт и Organization открыта (либо User в ней состоит).
+    Внешний запрос должен содержать Organization этого Project
+    """
+    return or_(
+        is_admin(user_id=user_id),
+        can_edit_project(user_id=user_id),
+        and_(
+            Project.visibility == ProjectVisibilityType.OPEN.value,
+            or_(
+                Organization.visibility == OrganizationVisibilityType.OPEN.value,
+                is_organization_member(user_id=user_id),
+            ),
+        ),
+    )
@@ -0,0 +1,51 @@
+import functools
+from typing import Any, Callable, Iterable
+
+from pydantic import BaseModel
+from sqlalchemy import inspect, Row
+from sqlalchemy.orm import InstrumentedAttribute
+
+from core.database.connection import Base
+
+
+@functools.cache
+def schema_columns(
+        schema: type[BaseModel],
+        model: type[Base],
+        prefix: str = "",
+) -> tuple[InstrumentedAttribute, ...]:
+    """
+    Колонки model, которые нужны для ответа schema - чтобы списки не читали лишнего
+    (например, long_description). Поле схемы `name` или `<prefix>name` соответствует колонке `name`,
+    поля без такой колонки (вложенные, вычисляемые) пропускаются
+    :param schema: класс схемы ответа
+    :param model: ORM модель
+    :param prefix: префикс полей схемы (org_, project_, vacancy_)
+    :return: колонки model в порядке полей schema
+    """
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    names = (field.removeprefix(prefix) for field in schema.model_fields)
+    return tuple(getattr(model, name) for name in names if name in columns)
+
+
+def schema_row_fields(
+        schema: type[BaseModel],
+        keys: Iterable[str],
+        prefix: str = "",
+) -> Callable[[Row], dict[str, Any]]:
+    """
+    Обратное к schema_columns соответствие: функция, собирающая из строки запроса словарь полей schema.
+    Колонка `name` попадает в поле `<prefix>name` или `name`, остальные колонки (ключ keyset и т.п.) отбрасываются
+    :param schema: класс схемы ответа
+    :param keys: имена колонок запроса (Select.selected_columns.keys())
+    :param prefix: префикс полей схемы
+    :return: функция Row -> dict
+    """
+    fields = schema.model_fields
+    pairs = []
+    for index, key in enumerate(keys):
+        if prefix + key in fields:
+            pairs.append((index, prefix + key))
+        elif key in fields:
+            pairs.append((index, key))
+    return lambda row: {name: row[index] for index, name in pairs}
@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+_DEPTH_KEY = "unit_of_work_depth"
+
+
+class UnitOfWork:
+    """
+    Одна транзакция на всю бизнес-операцию.
+    Внутри `async with unit_of_work:` репозитории на этой сессии делают flush вместо commit
+    (см. BaseCRUDRepository._commit), а commit выполняется один раз при выходе из внешнего блока.
+    При исключении транзакция откатывается. Вложенные блоки допускаются
+    """
+
+    def __init__(self, async_session: AsyncSession):
+        self.async_session = async_session
+
+    @staticmethod
+    def is_active(async_session: AsyncSession) -> bool:
+        """
+        Открыт ли на сессии блок UnitOfWork
+        :param async_session: сессия
+        :return: True если репозитории должны делать только flush
+        """
+        return async_session.info.get(_DEPTH_KEY, 0) > 0
+
+    async def __aenter__(self) -> "UnitOfWork":
+        info = self.async_session.info
+        info[_DEPTH_KEY] = info.get(_DEPTH_KEY, 0) + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        info = self.async_session.info
+        info[_DEPTH_KEY] -= 1
+        if info[_DEPTH_KEY] > 0:
+            return
+
+        if exc_type is None:
+            await self.async_session.commit()
+        else:
+            await self.async_session.rollback()
@@ -0,0 +1,43 @@
+import datetime
+from dataclasses import dataclass
+
+from core.models.permissions import PermissionType, ResourceType
+
+
+# Легкие read-only представления строк для горячих путей чтения (методы *_view репозиториев).
+# Загружаются через select() нужных колонок, без гидрации ORM-объектов: нет identity map,
+# отслеживания изменений и лишних колонок. Порядок полей совпадает с порядком колонок в select()
+
+
+@dataclass(frozen=True, slots=True)
+class UserView:
+    """
+    Пользователь без hashed_password и created_at
+    """
+    id: int
+    username: str
+
+
+@dataclass(frozen=True, slots=True)
+class EffectivePermissionView:
+    """
+    Строка effective_permission для PermissionSnapshot
+    """
+    resource_type: ResourceType
+    resource_id: int | None
+    permission_type: PermissionType
+
+
+@dataclass(frozen=True, slots=True)
+class OrganizationShortView:
+    """
+    Organization в общем списке организаций вместе с признаком членства пользователя.
+    Порядок полей: колонки schema_columns(OrganizationShortInfoResponse), затем created_at и is_user_member
+    """
+    id: int
+    name: str
+    short_description: str
+    creator_id: int
+    join_policy: str
+    created_at: datetime.datetime
+    is_user_member: bool
@@ -10,3 +10,12 @@ class AdminPermissionSignature(BaseSchemaModel):
     sign: bool = Field(default=False)
 
 
+class PermissionCacheStats(BaseSchemaModel):
+    enabled: bool
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
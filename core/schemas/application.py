@@ -1,5 +1,8 @@
 from enum import Enum
 
+from pydantic import Field, model_validator
+
+from core.config.manager import settings
 from core.schemas.base import BaseSchemaModel
 
 
@@ -16,6 +19,9 @@ class ApplicationId(BaseSchemaModel):
 class ApplicationCancelByUserRequest(BaseSchemaModel):
     application_id: int
 
+class ApplicationRejectByManagerRequest(BaseSchemaModel):
+    application_id: int
+
 class ApplicationActivityStatusType(str, Enum):
     ACTIVE = "ACTIVE"
     REJECTED = "REJECTED"
@@ -42,4 +48,58 @@ class ApplicationMainInfo(BaseSchemaModel):
     project_id: int
     project_name: str
     activity_status: ApplicationActivityStatusType
-    created_at: str
\ No newline at end of file
+    created_at: str
+
+class ManagerApplicationInfo(BaseSchemaModel):
+    application_id: int
+    description: str | None = None
+    user_id: int
+    user_name: str
+    vacancy_id: int
+    vacancy_name: str
+    project_id: int
+    project_name: str
+    created_at: str
+    is_viewed: bool
+
+
+class ManagerApplicationCounts(BaseSchemaModel):
+    number_of_active: int
+    number_of_unviewed: int
+
+
+class ApplicationIds(BaseSchemaModel):
+    application_ids: list[int]
+
+
+class ApplicationBulkAction(str, Enum):
+    ACCEPT = "ACCEPT"  # принять application_ids
+    REJECT = "REJECT"  # отклонить application_ids
+    REJECT_ALL_EXCEPT = "REJECT_ALL_EXCEPT"  # отклонить все активные отклики vacancy_id, кроме application_id
+    CLOSE_VACANCY = "CLOSE_VACANCY"  # закрыть vacancy_id и отклонить все ее активные отклики
+
+
+class ApplicationBulkDecisionRequest(BaseSchemaModel):
+    action: ApplicationBulkAction
+    application_ids: list[int] = Field(default_factory=list, max_length=settings.BULK_MAX_ITEMS)
+    vacancy_id: int | None = None
+    application_id: int | None = None
+
+    @model_validator(mode="after")
+    def check_action_params(self) -> "ApplicationBulkDecisionRequest":
+        if self.action in (ApplicationBulkAction.ACCEPT, ApplicationBulkAction.REJECT):
+            if not self.application_ids:
+                raise ValueError(f"{self.action.value}: нужен applicationIds")
+        elif self.vacancy_id is None:
+            raise ValueError(f"{self.action.value}: нужен vacancyId")
+        elif self.action == ApplicationBulkAction.REJECT_ALL_EXCEPT and self.application_id is None:
+            raise ValueError(f"{self.action.value}: нужен applicationId")
+        return self
+
+
+class ApplicationBulkDecisionResult(BaseSchemaModel):
+    activity_status: ApplicationActivityStatusType
+    # отклики, статус которых изменен
+    application_ids: list[int]
+    # запрошенные, но не измененные: не активные, не существуют или на чужих вакансиях
+    skipped_application_ids: list[int] = Field(default_factory=list)
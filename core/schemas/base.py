@@ -1,6 +1,8 @@
 import datetime
+import functools
+from typing import Any, Iterable, Self
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model, field_validator
 
 from core.utilities.formatters.datetime_formatter import format_datetime_into_isoformat
 from core.utilities.formatters.field_formatter import format_dict_key_to_camel_case
@@ -16,3 +18,46 @@ class BaseSchemaModel(BaseModel):
         },
         alias_generator=format_dict_key_to_camel_case,
     )
+
+    @classmethod
+    def validate_many(cls, items: Iterable[dict[str, Any]]) -> list[Self]:
+        """
+        Собрать список объектов схемы из словарей одним вызовом pydantic-core (без __init__ на каждый объект).
+        Для списков, собранных из строк БД
+        :param items: словари значений полей (по именам полей, Enum можно передавать строками)
+        :return: список объектов схемы
+        """
+        return _list_adapter(cls).validate_python(list(items))
+
+    @classmethod
+    def sparse(cls, fields: frozenset[str] | None) -> type[Self]:
+        """
+        Схема только с полями fields (sparse fieldset, ?fields=): валидирует и сериализует только их.
+        Класс создается один раз на набор полей
+        :param fields: имена полей схемы; None - схема целиком
+        :return: класс схемы
+        """
+        if fields is None:
+            return cls
+        return _sparse_schema(cls, fields)
+
+
+@functools.cache
+def _list_adapter(cls: type[BaseSchemaModel]) -> TypeAdapter:
+    return TypeAdapter(list[cls])
+
+
+@functools.cache
+def _sparse_schema(cls: type[BaseSchemaModel], fields: frozenset[str]) -> type[BaseSchemaModel]:
+    validators = {}
+    for name, decorator in cls.__pydantic_decorators__.field_validators.items():
+        validated = [field for field in decorator.info.fields if field in fields]
+        if validated:
+            validators[name] = field_validator(*validated, mode=decorator.info.mode)(decorator.func.__func__)
+    return create_model(
+        f"{cls.__name__}Sparse",
+        __base__=BaseSchemaModel,
+        __module__=cls.__module__,
+        __validators__=validators,
+        **{name: (info.annotation, info) for name, info in cls.model_fields.items() if name in fields},
+    )
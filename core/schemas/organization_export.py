@@ -0,0 +1,70 @@
+import datetime
+from enum import Enum
+from typing import Optional
+
+from core.schemas.base import BaseSchemaModel
+
+
+class OrganizationExportEntity(str, Enum):
+    MEMBERS = "members"
+    PROJECTS = "projects"
+    VACANCIES = "vacancies"
+    APPLICATIONS = "applications"
+
+
+class OrganizationExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+# Строки выгрузки: порядок полей - порядок колонок CSV и запроса OrganizationExportCRUDRepository
+
+class OrganizationMemberExportRow(BaseSchemaModel):
+    user_id: int
+    username: str
+    joined_at: datetime.datetime
+
+
+class ProjectExportRow(BaseSchemaModel):
+    project_id: int
+    name: str
+    short_description: Optional[str] = None
+    activity_status: str
+    visibility: str
+    creator_id: int
+    created_at: datetime.datetime
+    open_vacancies: int
+    team_current_size: int
+    team_full_size: int
+
+
+class VacancyExportRow(BaseSchemaModel):
+    vacancy_id: int
+    project_id: int
+    name: str
+    short_description: Optional[str] = None
+    activity_status: str
+    visibility: str
+    creator_id: int
+    created_at: datetime.datetime
+    number_of_active_applications: int
+
+
+class ApplicationExportRow(BaseSchemaModel):
+    application_id: int
+    vacancy_id: int
+    project_id: int
+    user_id: int
+    username: str
+    description: Optional[str] = None
+    activity_status: str
+    created_at: datetime.datetime
+    viewed_at: Optional[datetime.datetime] = None
+
+
+ORGANIZATION_EXPORT_ROWS: dict[OrganizationExportEntity, type[BaseSchemaModel]] = {
+    OrganizationExportEntity.MEMBERS: OrganizationMemberExportRow,
+    OrganizationExportEntity.PROJECTS: ProjectExportRow,
+    OrganizationExportEntity.VACANCIES: VacancyExportRow,
+    OrganizationExportEntity.APPLICATIONS: ApplicationExportRow,
+}
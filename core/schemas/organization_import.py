@@ -0,0 +1,30 @@
+from typing import Optional
+
+from pydantic import Field, model_validator
+
+from core.schemas.base import BaseSchemaModel
+from core.schemas.vacancy import VacancyCreateRequest
+
+
+class OrganizationMemberImportRow(BaseSchemaModel):
+    # пользователь задается id или username
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_user(self) -> "OrganizationMemberImportRow":
+        if self.user_id is None and not self.username:
+            raise ValueError("нужен userId или username")
+        return self
+
+
+class VacancyImportRow(VacancyCreateRequest):
+    # длины колонок Vacancy: строка длиннее иначе роняет весь пакет COPY
+    name: str = Field(max_length=64)
+    short_description: str = Field(max_length=1024)
+
+
+class ImportResult(BaseSchemaModel):
+    number_of_rows: int
+    number_of_imported: int
+    number_of_failed: int
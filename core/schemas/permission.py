@@ -1,7 +1,15 @@
+from enum import Enum
 from typing import Optional
 
+from pydantic import Field
+
+from core.config.manager import settings
+from core.models.permissions import ResourceType, PermissionType
 from core.schemas.base import BaseSchemaModel
 
+# Максимальное число проверок в одном POST /permissions/batch
+MAX_PERMISSION_CHECKS_IN_BATCH = 5000
+
 
 class PermissionsResponse(BaseSchemaModel):
     can_create_global_organizations: Optional[bool] = None
@@ -9,3 +17,40 @@ class PermissionsResponse(BaseSchemaModel):
 
 class PermissionsShortResponse(BaseSchemaModel):
     permission_id: int
+
+
+class PermissionCheck(BaseSchemaModel):
+    resource_type: ResourceType
+    resource_id: Optional[int] = None
+    permission_type: PermissionType
+
+
+class PermissionBatchRequest(BaseSchemaModel):
+    checks: list[PermissionCheck] = Field(max_length=MAX_PERMISSION_CHECKS_IN_BATCH)
+
+
+class PermissionChangeOutcome(str, Enum):
+    GRANTED = "GRANTED"  # Permission выдан
+    ALREADY_GRANTED = "ALREADY_GRANTED"  # такой Permission уже был
+    REVOKED = "REVOKED"  # Permission отозван
+    NOT_GRANTED = "NOT_GRANTED"  # отзывать нечего
+    USER_NOT_FOUND = "USER_NOT_FOUND"
+    RESOURCE_NOT_FOUND = "RESOURCE_NOT_FOUND"  # нет ресурса; для DOMAIN - resource_id не равен user_id
+
+
+class PermissionChange(BaseSchemaModel):
+    user_id: int
+    resource_type: ResourceType
+    resource_id: Optional[int] = None
+    permission_type: PermissionType
+
+
+class PermissionBulkRequest(BaseSchemaModel):
+    permissions: list[PermissionChange] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+
+class PermissionBulkResult(BaseSchemaModel):
+    # исход для каждой строки в порядке params.permissions
+    outcomes: list[PermissionChangeOutcome]
+    # сколько Permission выдано / отозвано
+    number_of_changed: int
@@ -1,4 +1,4 @@
-from typing import Sequence, Any
+from typing import Sequence, Any, AsyncIterator
 
 from core.models import Project, Organization
 from core.models.application import Application
@@ -7,8 +7,12 @@ from core.repository.crud.application import ApplicationCRUDRepository
 from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.project import ProjectCRUDRepository
 from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.repository.pagination import PageParams, Page
+from core.repository.unit_of_work import UnitOfWork
 from core.schemas.application import ApplicationShortInfo, ApplicationActivityStatusType, ApplicationMainInfo, \
-    ApplicationId, ApplicationLimits
+    ApplicationId, ApplicationLimits, ManagerApplicationInfo, ManagerApplicationCounts, ApplicationBulkAction, \
+    ApplicationBulkDecisionRequest, ApplicationBulkDecisionResult
+from core.schemas.vacancy import VacancyActivityStatusType
 from core.services.interfaces.application import IApplicationService
 from core.services.interfaces.permission import IPermissionService
 from core.utilities.exceptions.database import EntityDoesNotExist, EntityAlreadyExists
@@ -34,12 +38,14 @@ class ApplicationService(IApplicationService):
             permission_service: IPermissionService,
             application_repo: ApplicationCRUDRepository,
             org_repo: OrganizationCRUDRepository,
+            unit_of_work: UnitOfWork,
     ):
         self.project_repo = project_repo
         self.vacancy_repo = vacancy_repo
         self.permission_service = permission_service
         self.application_repo = application_repo
         self.org_repo = org_repo
+        self.unit_of_work = unit_of_work
 
     @log_calls
     async def get_user_application_limits_in_organization(
@@ -65,14 +71,15 @@ class ApplicationService(IApplicationService):
             user_id: int,
             org_id: int,
     ) -> int:
-        res: Sequence[ApplicationMainInfo] = (
-            await self.get_user_applications_main_info_in_organization(
+        res: int | None = (
+            await self.application_repo.get_number_of_active_applications_in_organization(
                 user_id=user_id,
                 org_id=org_id,
-                activity_status=ApplicationActivityStatusType.ACTIVE.value,
             )
         )
-        return len(res)
+        if res is None:
+            raise EntityDoesNotExist('Указанная организация не существует')
+        return res
 
     @log_calls
     async def get_user_applications_main_info_in_organization(
@@ -80,7 +87,8 @@ class ApplicationService(IApplicationService):
             user_id: int,
             org_id: int,
             activity_status: str | None = None,
-    ) -> Sequence[ApplicationMainInfo]:
+            page: PageParams | None = None,
+    ) -> Page[ApplicationMainInfo]:
         org: Organization | None = (
             await self.org_repo.get_organization_by_id(
                 org_id=org_id,
@@ -89,14 +97,37 @@ class ApplicationService(IApplicationService):
         if not org:
             raise EntityDoesNotExist('Указанная организация не существует')
 
-        res: Sequence[ApplicationMainInfo] = (
+        res: Page[ApplicationMainInfo] = (
             await self.application_repo.get_user_applications_main_info_in_organization(
                 user_id=user_id,
+                org_id=org_id,
                 activity_status=activity_status,
+                page=page,
             )
         )
         return res
 
+    @log_calls
+    async def stream_user_applications_main_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            activity_status: str | None = None,
+    ) -> AsyncIterator[ApplicationMainInfo]:
+        org: Organization | None = (
+            await self.org_repo.get_organization_by_id(
+                org_id=org_id,
+            )
+        )
+        if not org:
+            raise EntityDoesNotExist('Указанная организация не существует')
+
+        return self.application_repo.stream_user_applications_main_info_in_organization(
+            user_id=user_id,
+            org_id=org_id,
+            activity_status=activity_status,
+        )
+
     @log_calls
     async def get_all_active_applications_by_user_and_project(
             self,
@@ -120,12 +151,12 @@ class ApplicationService(IApplicationService):
                 project_id=project.id,
             )
         )
-        res = [
-            ApplicationShortInfo(
-                application_id=app.id,
-                vacancy_id=app.vacancy_id,
-            ) for app in applications
-        ]
+        res = ApplicationShortInfo.validate_many(
+            {
+                "application_id": app.id,
+                "vacancy_id": app.vacancy_id,
+            } for app in applications
+        )
         return res
 
     @log_calls
@@ -136,8 +167,33 @@ class ApplicationService(IApplicationService):
             description: str,
     ) -> ApplicationId:
         """
-        Создать отклик на вакансию
+        Создать отклик на вакансию.
+        Проверки и вставка - в одной транзакции (см. create_active_application_within_quota),
+        причина отказа выясняется дополнительными запросами только при отказе
         """
+        async with self.unit_of_work:
+            application: Application | None = (
+                await self.application_repo.create_active_application_within_quota(
+                    user_id=user_id,
+                    vacancy_id=vacancy_id,
+                    description=description,
+                    max_active_applications=MAX_ACTIVE_APPLICATION_FOR_USER_IN_ORGANIZATION,
+                )
+            )
+            if not application:
+                await self._raise_application_rejected(
+                    user_id=user_id,
+                    vacancy_id=vacancy_id,
+                )
+
+        res = ApplicationId(application_id=application.id)
+        return res
+
+    async def _raise_application_rejected(
+            self,
+            user_id: int,
+            vacancy_id: int,
+    ) -> None:
         vacancy: Vacancy | None = (
             await self.vacancy_repo.get_vacancy_by_id(
                 vacancy_id=vacancy_id,
@@ -155,32 +211,76 @@ class ApplicationService(IApplicationService):
         if application:
             raise EntityAlreadyExists('Активный отклик с этим пользователем и вакансией уже существует')
 
-        org: Organization | None = (
-            await self.org_repo.get_organization_by_vacancy_id(
+        raise ActiveEntityLimit('Пользователь уже имеет максимальное число откликов в этой организации')
+
+    @log_calls
+    async def get_manager_applications(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+            page: PageParams | None = None,
+    ) -> Page[ManagerApplicationInfo]:
+        """
+        Входящие отклики менеджера: активные отклики на вакансии, которые он может редактировать
+        """
+        res: Page[ManagerApplicationInfo] = (
+            await self.application_repo.get_manager_applications(
+                manager_id=manager_id,
+                project_id=project_id,
                 vacancy_id=vacancy_id,
+                page=page,
             )
         )
-        if not org:
-            raise EntityDoesNotExist('Организация не существует')
+        return res
 
-        number_of_active_user_applications_in_organization: int = (
-            await self.get_number_of_active_user_applications_in_organization(
-                user_id=user_id,
-                org_id=org.id,
-            )
+    @log_calls
+    async def stream_manager_applications(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> AsyncIterator[ManagerApplicationInfo]:
+        return self.application_repo.stream_manager_applications(
+            manager_id=manager_id,
+            project_id=project_id,
+            vacancy_id=vacancy_id,
         )
-        if number_of_active_user_applications_in_organization >= MAX_ACTIVE_APPLICATION_FOR_USER_IN_ORGANIZATION:
-            raise ActiveEntityLimit('Пользователь уже имеет максимальное число откликов в этой организации')
 
-        application: Application = (
-            await self.application_repo.create_application(
-                user_id=user_id,
+    @log_calls
+    async def get_manager_application_counts(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> ManagerApplicationCounts:
+        """
+        Число входящих откликов менеджера и непросмотренных среди них
+        """
+        res: ManagerApplicationCounts = (
+            await self.application_repo.get_manager_application_counts(
+                manager_id=manager_id,
+                project_id=project_id,
                 vacancy_id=vacancy_id,
-                description=description,
-                activity_status=ApplicationActivityStatusType.ACTIVE.value,
             )
         )
-        res = ApplicationId(application_id=application.id)
+        return res
+
+    @log_calls
+    async def mark_applications_viewed(
+            self,
+            manager_id: int,
+            application_ids: Sequence[int],
+    ) -> Sequence[int]:
+        """
+        Отметить входящие отклики менеджера просмотренными
+        """
+        res: Sequence[int] = (
+            await self.application_repo.mark_applications_viewed(
+                manager_id=manager_id,
+                application_ids=application_ids,
+            )
+        )
         return res
 
     @log_calls
@@ -192,18 +292,9 @@ class ApplicationService(IApplicationService):
         """
         Поменять статус вакансии
         """
-        application: Application | None = (
-            await self.application_repo.get_application_by_id(
-                application_id=application_id,
-            )
-        )
-        if not application:
-            raise EntityDoesNotExist('Отклика не существует')
-
         patched_application: Application | None = (
-            await self.application_repo.patch_application(
-                application_id=application.id,
-                description=application.description,
+            await self.application_repo.change_application_status(
+                application_id=application_id,
                 activity_status=status,
             )
         )
@@ -226,33 +317,160 @@ class ApplicationService(IApplicationService):
     @log_calls
     async def reject_application(
             self,
+            manager_id: int,
             application_id: int,
-    ) -> ...:
+    ) -> ApplicationId:
         """
         Отменить отклик от лица менеджера
         """
-        ...
+        res: ApplicationBulkDecisionResult = (
+            await self.decide_applications(
+                manager_id=manager_id,
+                application_ids=[application_id],
+                status=ApplicationActivityStatusType.REJECTED.value,
+            )
+        )
+        if not res.application_ids:
+            raise EntityDoesNotExist('Активного отклика на вакансию менеджера не существует')
+
+        return ApplicationId(application_id=application_id)
+
+    @log_calls
+    async def decide_applications(
+            self,
+            manager_id: int,
+            application_ids: Sequence[int],
+            status: str,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Принять / отклонить отклики от лица менеджера (только активные отклики на его вакансии)
+        """
+        changed: Sequence[int] = (
+            await self.application_repo.change_active_applications_status(
+                activity_status=status,
+                application_ids=application_ids,
+                manager_id=manager_id,
+            )
+        )
+        changed_ids = set(changed)
+        res = ApplicationBulkDecisionResult(
+            activity_status=status,
+            application_ids=sorted(changed_ids),
+            skipped_application_ids=sorted(set(application_ids) - changed_ids),
+        )
+        return res
 
     @log_calls
     async def reject_all_application_in_vacancy(
             self,
             vacancy_id: int,
-    ) -> ...:
+    ) -> ApplicationBulkDecisionResult:
         """
         Отменить все отклики в вакансии от лица менеджера
         """
-        ...
+        changed: Sequence[int] = (
+            await self.application_repo.change_active_applications_status(
+                activity_status=ApplicationActivityStatusType.REJECTED.value,
+                vacancy_id=vacancy_id,
+            )
+        )
+        res = ApplicationBulkDecisionResult(
+            activity_status=ApplicationActivityStatusType.REJECTED,
+            application_ids=sorted(changed),
+        )
+        return res
 
     @log_calls
     async def reject_all_application_in_vacancy_except(
             self,
             vacancy_id: int,
             application_id: int,
-    ) -> ...:
+    ) -> ApplicationBulkDecisionResult:
         """
-        Отменить все отклики в вакансии от лица менеджера кроме указанного
+        Отменить все отклики в вакансии от лица менеджера кроме указанного.
+        Указанный отклик должен быть активным откликом на эту вакансию, иначе ничего не отклоняется
         """
-        ...
+        changed: Sequence[int] = (
+            await self.application_repo.change_active_applications_status(
+                activity_status=ApplicationActivityStatusType.REJECTED.value,
+                vacancy_id=vacancy_id,
+                except_application_id=application_id,
+            )
+        )
+        if not changed:
+            # Пустой результат - либо отклонять было нечего, либо оставляемый отклик не подходит
+            kept: Application | None = (
+                await self.application_repo.get_application_by_id(
+                    application_id=application_id,
+                )
+            )
+            if (
+                    not kept
+                    or kept.vacancy_id != vacancy_id
+                    or kept.activity_status != ApplicationActivityStatusType.ACTIVE.value
+            ):
+                raise EntityDoesNotExist('Активного отклика на эту вакансию не существует')
+        res = ApplicationBulkDecisionResult(
+            activity_status=ApplicationActivityStatusType.REJECTED,
+            application_ids=sorted(changed),
+        )
+        return res
+
+    @log_calls
+    async def close_vacancy_and_reject_applications(
+            self,
+            vacancy_id: int,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Закрыть вакансию и отклонить все ее активные отклики - одна транзакция
+        """
+        async with self.unit_of_work:
+            vacancy: Vacancy | None = (
+                await self.vacancy_repo.change_vacancy_status(
+                    vacancy_id=vacancy_id,
+                    activity_status=VacancyActivityStatusType.INACTIVE.value,
+                )
+            )
+            if not vacancy:
+                raise EntityDoesNotExist('Вакансия не существует')
+
+            res: ApplicationBulkDecisionResult = (
+                await self.reject_all_application_in_vacancy(
+                    vacancy_id=vacancy_id,
+                )
+            )
+        return res
+
+    @log_calls
+    async def apply_bulk_decision(
+            self,
+            manager_id: int,
+            params: ApplicationBulkDecisionRequest,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Выполнить массовое решение по откликам (см. ApplicationBulkAction).
+        Права на vacancy_id проверяются до вызова, application_ids ограничиваются вакансиями менеджера в запросе
+        """
+        if params.action == ApplicationBulkAction.ACCEPT:
+            return await self.decide_applications(
+                manager_id=manager_id,
+                application_ids=params.application_ids,
+                status=ApplicationActivityStatusType.ACCEPTED.value,
+            )
+        if params.action == ApplicationBulkAction.REJECT:
+            return await self.decide_applications(
+                manager_id=manager_id,
+                application_ids=params.application_ids,
+                status=ApplicationActivityStatusType.REJECTED.value,
+            )
+        if params.action == ApplicationBulkAction.REJECT_ALL_EXCEPT:
+            return await self.reject_all_application_in_vacancy_except(
+                vacancy_id=params.vacancy_id,
+                application_id=params.application_id,
+            )
+        return await self.close_vacancy_and_reject_applications(
+            vacancy_id=params.vacancy_id,
+        )
 
     @log_calls
     async def delete_application(
@@ -1,5 +1,6 @@
 from core.models import User
 from core.repository.crud.user import UserCRUDRepository
+from core.repository.views import UserView
 from core.schemas.user import UserCreate
 from core.services.security import decode_token
 from core.utilities.exceptions.auth import TokenException
@@ -73,3 +74,18 @@ async def get_user_by_username(
         raise EntityDoesNotExist
 
     return user
+
+
+async def get_user_by_username_view(
+        username: str,
+        user_repo: UserCRUDRepository,
+) -> UserView:
+    user: UserView | None = (
+        await user_repo.get_user_by_username_view(
+            username=username,
+        )
+    )
+    if not user:
+        raise EntityDoesNotExist
+
+    return user
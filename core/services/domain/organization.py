@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator, Any
 
 # from core.dependencies.repository import get_repository, get_repository_manual
 from core.models import Organization
@@ -6,6 +6,9 @@ from core.models.organizationMember import OrganizationMember
 from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
 from core.repository.crud.permission import PermissionCRUDRepository
+from core.repository.pagination import PageParams, Page
+from core.repository.unit_of_work import UnitOfWork
+from core.repository.views import OrganizationShortView
 from core.schemas.organization import OrganizationShortInfoResponse, \
     OrganizationJoinPolicyType, OrganizationVisibilityType, OrganizationActivityStatusType, \
     OrganizationInfoForEditResponse, OrganizationDetailInfoResponse, OrganizationId
@@ -16,6 +19,20 @@ from core.utilities.exceptions.database import EntityDoesNotExist
 from core.utilities.loggers.log_decorator import log_calls
 
 
+def _short_info_fields(org: OrganizationShortView) -> dict[str, Any]:
+    """
+    Поля OrganizationShortInfoResponse из OrganizationShortView
+    """
+    return {
+        "org_id": org.id,
+        "org_name": org.name,
+        "org_short_description": org.short_description,
+        "org_creator_id": org.creator_id,
+        "is_user_member": bool(org.is_user_member),
+        "org_join_policy": org.join_policy,
+    }
+
+
 class OrganizationService(IOrganizationService):
     def __init__(
             self,
@@ -24,12 +41,14 @@ class OrganizationService(IOrganizationService):
             permission_repo: PermissionCRUDRepository,
             user_service: IUserService,
             org_mapper: OrganizationMapper,
+            unit_of_work: UnitOfWork,
     ):
         self.org_repo = org_repo
         self.member_repo = member_repo
         self.permission_repo = permission_repo
         self.user_service = user_service
         self.org_mapper = org_mapper
+        self.unit_of_work = unit_of_work
 
     def is_org_open_to_view(
             self,
@@ -48,29 +67,13 @@ class OrganizationService(IOrganizationService):
             self,
             org_id: int,
     ) -> OrganizationDetailInfoResponse:
-        org: Organization = (
-            await self.get_organization_by_id(
+        res: OrganizationDetailInfoResponse | None = (
+            await self.org_repo.get_organization_detail_info_by_id(
                 org_id=org_id,
             )
         )
-        if not org:
+        if not res:
             raise EntityDoesNotExist('Организация не существует')
-
-        org_members: Sequence[OrganizationMember] = (
-            await self.get_organization_members_by_org_id(
-                org_id=org_id,
-            )
-        )
-
-        res = OrganizationDetailInfoResponse(
-            org_id=org.id,
-            org_name=org.name,
-            org_short_description=org.short_description,
-            org_long_description=org.long_description,
-            org_creator_id=org.creator_id,
-            org_created_at=org.created_at.isoformat(),
-            org_number_of_members=len(org_members),
-        )
         return res
 
     @log_calls
@@ -82,6 +85,7 @@ class OrganizationService(IOrganizationService):
         org: Organization = (
             await self.get_organization_by_id(
                 org_id=org_id,
+                with_long_description=True,
             )
         )
         if not org:
@@ -103,38 +107,52 @@ class OrganizationService(IOrganizationService):
     async def get_all_organizations_with_short_info(
             self,
             user_id: int,
-    ) -> Sequence[OrganizationShortInfoResponse]:
-        all_orgs: Sequence[Organization] = (
-            await self.org_repo.get_all_organizations()
-        )
-        user_orgs: Sequence[OrganizationMember] = (
-            await self.member_repo.get_all_user_organization_memberships(
+            page: PageParams | None = None,
+            fields: frozenset[str] | None = None,
+    ) -> Page[OrganizationShortInfoResponse]:
+        if fields is not None:
+            return await self.org_repo.get_organizations_visible_to_user_sparse(
+                user_id=user_id,
+                fields=fields,
+                page=page,
+            )
+        orgs = (
+            await self.org_repo.get_all_organizations_visible_to_user_view(
                 user_id=user_id,
+                page=page,
             )
         )
-        user_orgs_id_set = set([member.organization_id for member in user_orgs])
-        result = (
-            [
-                OrganizationShortInfoResponse(
-                    org_id=org.id,
-                    org_name=org.name,
-                    org_short_description=org.short_description,
-                    org_creator_id=org.creator_id,
-                    is_user_member=(org.id in user_orgs_id_set),
-                    org_join_policy=OrganizationJoinPolicyType(org.join_policy),
-                ) for org in all_orgs
-            ]
+        result: Page[OrganizationShortInfoResponse] = (
+            orgs.map(_short_info_fields).map_all(OrganizationShortInfoResponse.validate_many)
         )
         return result
 
+    @log_calls
+    async def stream_all_organizations_with_short_info(
+            self,
+            user_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> AsyncIterator[OrganizationShortInfoResponse]:
+        if fields is not None:
+            return self.org_repo.stream_organizations_visible_to_user_sparse(
+                user_id=user_id,
+                fields=fields,
+            )
+        orgs = self.org_repo.stream_organizations_visible_to_user_view(
+            user_id=user_id,
+        )
+        return (OrganizationShortInfoResponse.model_validate(_short_info_fields(org)) async for org in orgs)
+
     @log_calls
     async def get_organization_by_id(
             self,
             org_id: int,
+            with_long_description: bool = False,
     ) -> Organization | None:
         org: Organization | None = (
             await self.org_repo.get_organization_by_id(
                 org_id=org_id,
+                with_long_description=with_long_description,
             )
         )
         return org
@@ -147,22 +165,24 @@ class OrganizationService(IOrganizationService):
             short_description: str,
             long_description: str,
     ) -> OrganizationId:
-        new_org = (
-            await self.org_repo.create_organization(
-                name=name,
-                short_description=short_description,
-                long_description=long_description,
-                creator_id=user_id,
+        # Organization, членство создателя и его право на редактирование - одна транзакция
+        async with self.unit_of_work:
+            new_org = (
+                await self.org_repo.create_organization(
+                    name=name,
+                    short_description=short_description,
+                    long_description=long_description,
+                    creator_id=user_id,
+                )
+            )
+            await self.member_repo.create_organization_member(
+                user_id=user_id,
+                org_id=new_org.id,
+            )
+            await self.permission_repo.allow_user_edit_organization(
+                user_id=user_id,
+                org_id=new_org.id
             )
-        )
-        await self.member_repo.create_organization_member(
-            user_id=user_id,
-            org_id=new_org.id,
-        )
-        await self.permission_repo.allow_user_edit_organization(
-            user_id=user_id,
-            org_id=new_org.id
-        )
         res = OrganizationId(org_id=new_org.id)
         return res
 
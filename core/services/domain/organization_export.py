@@ -0,0 +1,64 @@
+from typing import AsyncIterator
+
+from sqlalchemy import Row
+
+from core.models import Organization
+from core.repository.crud.organization import OrganizationCRUDRepository
+from core.repository.crud.organization_export import OrganizationExportCRUDRepository
+from core.schemas.base import BaseSchemaModel
+from core.schemas.organization_export import OrganizationExportEntity, ORGANIZATION_EXPORT_ROWS
+from core.services.interfaces.organization_export import IOrganizationExportService
+from core.utilities.exceptions.database import EntityDoesNotExist
+from core.utilities.loggers.log_decorator import log_calls
+
+
+class OrganizationExportService(IOrganizationExportService):
+    def __init__(
+            self,
+            org_repo: OrganizationCRUDRepository,
+            export_repo: OrganizationExportCRUDRepository,
+    ):
+        self.org_repo = org_repo
+        self.export_repo = export_repo
+
+    @log_calls
+    async def stream_organization_export_rows(
+            self,
+            org_id: int,
+            entity: OrganizationExportEntity,
+    ) -> AsyncIterator[Row]:
+        org: Organization | None = (
+            await self.org_repo.get_organization_by_id(
+                org_id=org_id,
+            )
+        )
+        if not org:
+            raise EntityDoesNotExist("Организация с указанным id не существует")
+
+        return self.export_repo.stream_organization_export(
+            org_id=org_id,
+            entity=entity,
+        )
+
+    @log_calls
+    async def stream_organization_export_items(
+            self,
+            org_id: int,
+            entity: OrganizationExportEntity,
+    ) -> AsyncIterator[BaseSchemaModel]:
+        rows: AsyncIterator[Row] = (
+            await self.stream_organization_export_rows(
+                org_id=org_id,
+                entity=entity,
+            )
+        )
+        return self._export_items(rows=rows, schema=ORGANIZATION_EXPORT_ROWS[entity])
+
+    @staticmethod
+    async def _export_items(
+            rows: AsyncIterator[Row],
+            schema: type[BaseSchemaModel],
+    ) -> AsyncIterator[BaseSchemaModel]:
+        # model_validate (pydantic-core) быстрее model_construct, который собирает объект в Python
+        async for row in rows:
+            yield schema.model_validate(row._asdict())
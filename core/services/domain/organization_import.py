@@ -0,0 +1,226 @@
+import asyncio
+import csv
+import io
+from functools import partial
+from typing import BinaryIO, TextIO, Any, Awaitable, Callable, Collection, Sequence
+
+from pydantic import ValidationError
+
+from core.config.manager import settings
+from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
+from core.repository.crud.project import ProjectCRUDRepository
+from core.repository.crud.user import UserCRUDRepository
+from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.schemas.base import BaseSchemaModel
+from core.schemas.organization_import import ImportResult, OrganizationMemberImportRow, VacancyImportRow
+from core.services.interfaces.organization_import import IOrganizationImportService
+from core.utilities.exceptions.domain import InvalidImportFile
+from core.utilities.loggers.log_decorator import log_calls
+
+# (номер строки файла, текст ошибки)
+RowError = tuple[int, str]
+
+
+def _read_batch(
+        reader: csv.DictReader,
+        size: int,
+) -> list[tuple[int, dict[str | None, Any]]]:
+    """
+    Следующие size строк файла с номерами строк. Выполняется в пуле потоков: чтение и разбор CSV блокирующие
+    """
+    batch = []
+    for row in reader:
+        batch.append((reader.line_num, row))
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def _clean_row(
+        row: dict[str | None, Any],
+) -> dict[str, str]:
+    # DictReader складывает лишние значения под ключ None, а недостающие заполняет None
+    if None in row:
+        raise ValueError("лишние значения в строке")
+    return {key: value.strip() for key, value in row.items() if value is not None and value.strip()}
+
+
+def _error_message(
+        error: ValueError,
+) -> str:
+    if not isinstance(error, ValidationError):
+        return str(error)
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    )
+
+
+def _schema_columns(
+        schema: type[BaseSchemaModel],
+) -> list[set[str]]:
+    """
+    Обязательные колонки schema: каждую можно назвать по имени поля или по alias
+    """
+    return [
+        {name, info.alias or name}
+        for name, info in schema.model_fields.items()
+        if info.is_required()
+    ]
+
+
+class OrganizationImportService(IOrganizationImportService):
+    def __init__(
+            self,
+            member_repo: OrganizationMemberCRUDRepository,
+            vacancy_repo: VacancyCRUDRepository,
+            project_repo: ProjectCRUDRepository,
+            user_repo: UserCRUDRepository,
+    ):
+        self.member_repo = member_repo
+        self.vacancy_repo = vacancy_repo
+        self.project_repo = project_repo
+        self.user_repo = user_repo
+
+    @log_calls
+    async def import_members(
+            self,
+            org_id: int,
+            source: BinaryIO,
+            errors: TextIO,
+    ) -> ImportResult:
+        return await self._import(
+            source=source,
+            errors=errors,
+            schema=OrganizationMemberImportRow,
+            required_columns=[{"user_id", "userId", "username"}],
+            import_batch=partial(self._import_members_batch, org_id),
+        )
+
+    @log_calls
+    async def import_vacancies(
+            self,
+            org_id: int,
+            user_id: int,
+            source: BinaryIO,
+            errors: TextIO,
+    ) -> ImportResult:
+        return await self._import(
+            source=source,
+            errors=errors,
+            schema=VacancyImportRow,
+            required_columns=_schema_columns(VacancyImportRow),
+            import_batch=partial(self._import_vacancies_batch, org_id, user_id),
+        )
+
+    async def _import(
+            self,
+            source: BinaryIO,
+            errors: TextIO,
+            schema: type[BaseSchemaModel],
+            required_columns: Sequence[Collection[str]],
+            import_batch: Callable[[list[tuple[int, Any]]], Awaitable[list[RowError]]],
+    ) -> ImportResult:
+        """
+        Общий цикл импорта: пакет строк читается в пуле потоков, проверяется схемой и передается в import_batch.
+        В памяти одновременно находится один пакет, ошибки сразу пишутся в errors
+        """
+        text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+        try:
+            reader = csv.DictReader(text)
+            fieldnames: list[str] | None = await asyncio.to_thread(lambda: reader.fieldnames)
+            if not fieldnames:
+                raise InvalidImportFile("Пустой файл: нет строки заголовка")
+            missing = [" / ".join(sorted(names)) for names in required_columns if not set(names) & set(fieldnames)]
+            if missing:
+                raise InvalidImportFile(f"Нет обязательных колонок: {', '.join(missing)}")
+
+            writer = csv.writer(errors)
+            writer.writerow(("line", "error"))
+            number_of_rows = number_of_failed = 0
+            while batch := await asyncio.to_thread(_read_batch, reader, settings.IMPORT_BATCH_SIZE):
+                rows: list[tuple[int, Any]] = []
+                failed: list[RowError] = []
+                for line, row in batch:
+                    try:
+                        rows.append((line, schema.model_validate(_clean_row(row))))
+                    except ValueError as e:
+                        failed.append((line, _error_message(e)))
+                if rows:
+                    failed.extend(await import_batch(rows))
+
+                failed.sort()
+                writer.writerows(failed)
+                number_of_rows += len(batch)
+                number_of_failed += len(failed)
+        except UnicodeDecodeError:
+            raise InvalidImportFile("Файл должен быть в кодировке UTF-8")
+        finally:
+            # source закрывает тот, кто его открыл
+            text.detach()
+
+        return ImportResult(
+            number_of_rows=number_of_rows,
+            number_of_imported=number_of_rows - number_of_failed,
+            number_of_failed=number_of_failed,
+        )
+
+    async def _import_members_batch(
+            self,
+            org_id: int,
+            rows: list[tuple[int, OrganizationMemberImportRow]],
+    ) -> list[RowError]:
+        users = await self.user_repo.get_users_by_ids_or_usernames(
+            user_ids={row.user_id for _, row in rows if row.user_id is not None},
+            usernames={row.username for _, row in rows if row.user_id is None},
+        )
+        user_ids = {user.id for user in users}
+        user_ids_by_username = {user.username: user.id for user in users}
+
+        failed: list[RowError] = []
+        resolved: list[tuple[int, int]] = []
+        for line, row in rows:
+            user_id = row.user_id if row.user_id is not None else user_ids_by_username.get(row.username)
+            if user_id not in user_ids:
+                failed.append((line, "Пользователь не найден"))
+            else:
+                resolved.append((line, user_id))
+
+        joined_user_ids: set[int] = (
+            await self.member_repo.create_organization_members(
+                org_id=org_id,
+                user_ids=[user_id for _, user_id in resolved],
+            )
+        )
+        for line, user_id in resolved:
+            if user_id in joined_user_ids:
+                # повтор того же пользователя ниже в пакете - уже участник
+                joined_user_ids.discard(user_id)
+            else:
+                failed.append((line, "Пользователь уже в организации"))
+        return failed
+
+    async def _import_vacancies_batch(
+            self,
+            org_id: int,
+            user_id: int,
+            rows: list[tuple[int, VacancyImportRow]],
+    ) -> list[RowError]:
+        project_ids: set[int] = (
+            await self.project_repo.get_project_ids_in_organization(
+                org_id=org_id,
+                project_ids={row.project_id for _, row in rows},
+            )
+        )
+        failed: list[RowError] = [
+            (line, "Проект не найден в организации")
+            for line, row in rows if row.project_id not in project_ids
+        ]
+        await self.vacancy_repo.create_vacancies(
+            user_id=user_id,
+            vacancies=[
+                row.model_dump(mode="json")
+                for _, row in rows if row.project_id in project_ids
+            ],
+        )
+        return failed
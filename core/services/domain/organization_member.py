@@ -1,10 +1,11 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 from core.models import Organization
 from core.models.organizationMember import OrganizationMember
 from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
 from core.repository.crud.permission import PermissionCRUDRepository
+from core.repository.pagination import PageParams, Page
 from core.schemas.organization import OrganizationJoinResponse, OrganizationJoinPolicyType, OrganizationMemberId
 from core.schemas.organization_member import OrganizationMemberDetailInfo, \
     OrganizationMemberDeleteResponse
@@ -54,7 +55,8 @@ class OrganizationMemberService(IOrganizationMemberService):
             self,
             user_id: int,
             org_id: int,
-    ) -> Sequence[OrganizationMemberDetailInfo]:
+            page: PageParams | None = None,
+    ) -> Page[OrganizationMemberDetailInfo]:
         org: Organization | None = (
             await self.org_repo.get_organization_by_id(
                 org_id=org_id,
@@ -63,13 +65,32 @@ class OrganizationMemberService(IOrganizationMemberService):
         if not org:
             raise EntityDoesNotExist("Организация с указанным id не существует")
 
-        res: Sequence[OrganizationMemberDetailInfo] = (
+        res: Page[OrganizationMemberDetailInfo] = (
             await self.member_repo.get_organization_members_detail_info_by_org_id(
                 org_id=org_id,
+                page=page,
             )
         )
         return res
 
+    @log_calls
+    async def stream_organization_members_for_admin(
+            self,
+            user_id: int,
+            org_id: int,
+    ) -> AsyncIterator[OrganizationMemberDetailInfo]:
+        org: Organization | None = (
+            await self.org_repo.get_organization_by_id(
+                org_id=org_id,
+            )
+        )
+        if not org:
+            raise EntityDoesNotExist("Организация с указанным id не существует")
+
+        return self.member_repo.stream_organization_members_detail_info_by_org_id(
+            org_id=org_id,
+        )
+
     @log_calls
     async def get_organization_members_by_org_id(
             self,
@@ -103,28 +124,26 @@ class OrganizationMemberService(IOrganizationMemberService):
         if not org:
             raise EntityDoesNotExist("Организация с указанным id не существует")
 
-        try:
-            org_member: OrganizationMember | None = (
-                await self.get_organization_member_by_user_and_org(user_id=user_id, org_id=org_id)
-            )
-            if org_member:
+        if org.join_policy == OrganizationJoinPolicyType.CLOSED.value or (
+                org.join_policy == OrganizationJoinPolicyType.CODE.value and code is None  # заглушка
+        ):
+            # Участнику закрытой организации по-прежнему сообщаем, что он уже в ней
+            if await self.member_repo.get_organization_member_by_user_and_org(user_id=user_id, org_id=org_id):
                 raise EntityAlreadyExists('Пользователь уже в организации')
-        except EntityDoesNotExist:
-            pass  # Если OrganizationMember не нашелся, то все ок
-
-        if org.join_policy == OrganizationJoinPolicyType.CLOSED.value:
-            raise PermissionDenied('Организация закрыта')
-        elif org.join_policy == OrganizationJoinPolicyType.CODE.value:
-            # заглушка
-            if code is None:
-                raise PermissionDenied('Код вступления неверный')
+            if org.join_policy == OrganizationJoinPolicyType.CLOSED.value:
+                raise PermissionDenied('Организация закрыта')
+            raise PermissionDenied('Код вступления неверный')
 
-        org_member: OrganizationMember = (
+        # Проверка членства и вставка - один INSERT ... ON CONFLICT DO NOTHING
+        org_member: OrganizationMember | None = (
             await self.member_repo.create_organization_member(
                 user_id=user_id,
                 org_id=org_id,
             )
         )
+        if org_member is None:
+            raise EntityAlreadyExists('Пользователь уже в организации')
+
         res = OrganizationMemberId(
             member_id=org_member.id,
         )
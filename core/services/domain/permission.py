@@ -1,4 +1,12 @@
-from typing import cast, Callable, Awaitable
+import asyncio
+from typing import Callable, Awaitable, Sequence, Iterator
+
+from sqlalchemy import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config.manager import settings
+from core.database import connection
 
 from core.models import Permission, User, Vacancy, Organization, OrganizationMember, Application, Project
 from core.models.permissions import ResourceType, PermissionType
@@ -9,12 +17,13 @@ from core.repository.crud.permission import PermissionCRUDRepository
 from core.repository.crud.project import ProjectCRUDRepository
 from core.repository.crud.user import UserCRUDRepository
 from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.repository.views import EffectivePermissionView
 from core.schemas.admin import AdminPermissionSignature
-from core.schemas.organization import OrganizationVisibilityType
-from core.schemas.permission import PermissionsShortResponse
-from core.schemas.project import ProjectVisibilityType
+from core.schemas.permission import PermissionsShortResponse, PermissionChangeOutcome
 from core.services.interfaces.organization import IOrganizationService
 from core.services.interfaces.permission import IPermissionService
+from core.services.domain.permission_cache import permission_cache
+from core.services.domain.permission_snapshot import PermissionSnapshot
 from core.services.mappers.permission import PermissionMapper
 from core.utilities.exceptions.database import EntityDoesNotExist
 from core.utilities.exceptions.permission import PermissionDenied
@@ -22,6 +31,21 @@ from core.utilities.loggers.log_decorator import log_calls
 from core.utilities.methods.trusted_method import trusted_method
 
 
+# Соединения, которые параллельные проверки разрешений всех запросов процесса заняли сверх сессий запросов
+_check_connections = asyncio.Semaphore(settings.PERMISSION_CHECK_POOL_CONNECTIONS)
+
+
+def _idle_connections() -> int:
+    """
+    Сколько простаивающих соединений пула можно занять, не открывая новых и не отнимая у запросов.
+    Пока пул работает сверх pool_size (на overflow), запросы ждут соединений - тогда ни одного
+    """
+    pool = connection.engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+    return max(0, min(pool.checkedin(), pool.size() - pool.checkedout()))
+
+
 class PermissionService(IPermissionService):
     def __init__(
             self,
@@ -44,24 +68,66 @@ class PermissionService(IPermissionService):
         self.project_repo = project_repo
         self.org_service = org_service
         self.application_repo = application_repo
+        # Снимки разрешений живут столько же, сколько сервис - один запрос
+        self._snapshots: dict[int, PermissionSnapshot] = {}
+        # Параллельные проверки одного пользователя загружают его снимок один раз
+        self._snapshot_locks: dict[int, asyncio.Lock] = {}
 
-    @trusted_method
     @log_calls
-    async def is_user_admin(
+    async def get_permission_snapshot(
             self,
             user_id: int,
-    ) -> bool:
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
+    ) -> PermissionSnapshot:
+        snapshot: PermissionSnapshot | None = self._peek_permission_snapshot(user_id=user_id)
+        if snapshot is None:
+            async with self._snapshot_locks.setdefault(user_id, asyncio.Lock()):
+                snapshot = self._peek_permission_snapshot(user_id=user_id)
+                if snapshot is None:
+                    snapshot = await self._load_permission_snapshot(user_id=user_id)
+        self._snapshots[user_id] = snapshot
+        return snapshot
+
+    async def _load_permission_snapshot(
+            self,
+            user_id: int,
+    ) -> PermissionSnapshot:
+        generation: int = permission_cache.generation
+        permissions: list[EffectivePermissionView] = (
+            await self.permission_repo.get_user_effective_permissions_view(
                 user_id=user_id,
-                resource_type=ResourceType.DOMAIN.value,
-                resource_id=user_id,
-                permission_type=PermissionType.ADMIN.value,
             )
         )
-        if not permission:
-            return False
-        return True
+        snapshot = PermissionSnapshot(
+            user_id=user_id,
+            permissions=permissions,
+        )
+        permission_cache.put(
+            user_id=user_id,
+            snapshot=snapshot,
+            generation=generation,
+        )
+        return snapshot
+
+    def _peek_permission_snapshot(
+            self,
+            user_id: int,
+    ) -> PermissionSnapshot | None:
+        """
+        Снимок пользователя, если он уже загружен в этом запросе или лежит в кэше. В БД не ходит
+        """
+        snapshot: PermissionSnapshot | None = self._snapshots.get(user_id)
+        if snapshot is None:
+            snapshot = permission_cache.get(user_id=user_id)
+        return snapshot
+
+    @trusted_method
+    @log_calls
+    async def is_user_admin(
+            self,
+            user_id: int,
+    ) -> bool:
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.is_admin
 
     # @log_calls
     # async def check_all(
@@ -84,6 +150,95 @@ class PermissionService(IPermissionService):
             if not result:
                 raise PermissionDenied('Permission denied')
 
+    @log_calls
+    async def raise_if_not_all_concurrently(
+            self,
+            permissions: list[Callable[[IPermissionService], Awaitable[bool]]],
+    ) -> None:
+        """
+        Как raise_if_not_all, но независимые проверки выполняются параллельно. Проверки разбирают из общей
+        очереди сессия запроса и отдельные сессии - не больше settings.PERMISSION_CHECK_MAX_CONNECTIONS,
+        свободных мест в общем на процесс лимите _check_connections и простаивающих соединений пула.
+        Ни места, ни соединения не ждут: сессия запроса разбирает очередь в любом случае, и запрос,
+        уже держащий соединение, не ждет второго. Первая неудачная проверка отменяет остальные
+        :param permissions: проверки, получающие PermissionService, например
+            lambda service: service.can_user_edit_vacancy(user_id=user.id, vacancy_id=vacancy_id)
+        """
+        queue: Iterator[Callable[[IPermissionService], Awaitable[bool]]] = iter(permissions)
+
+        async def run(service: IPermissionService) -> None:
+            for permission in queue:
+                if not await permission(service):
+                    raise PermissionDenied('Permission denied')
+
+        async def run_borrowed(connected: asyncio.Event) -> None:
+            async with connection.async_session() as session:
+                # Соединение берется до первой проверки: пока его нет, проверки достаются сессии запроса
+                try:
+                    await session.connection()
+                except PoolTimeoutError:
+                    return
+                connected.set()
+                await run(self._fork(async_session=session))
+
+        borrowed: list[tuple[asyncio.Task, asyncio.Event]] = []
+        inline: asyncio.Task | None = None
+        try:
+            number_to_borrow: int = min(
+                len(permissions) - 1,
+                settings.PERMISSION_CHECK_MAX_CONNECTIONS,
+                _idle_connections(),
+            )
+            while len(borrowed) < number_to_borrow and not _check_connections.locked():
+                # Место свободно - acquire не ждет
+                await _check_connections.acquire()
+                connected = asyncio.Event()
+                borrowed.append((asyncio.create_task(run_borrowed(connected)), connected))
+
+            inline = asyncio.create_task(run(self))
+            pending: set[asyncio.Task] = {inline, *(task for task, _ in borrowed)}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+                if inline.done():
+                    # Очередь разобрана: сессии, так и не получившие соединение, больше не нужны
+                    for task, connected in borrowed:
+                        if not connected.is_set():
+                            task.cancel()
+        finally:
+            tasks: list[asyncio.Task] = [task for task, _ in borrowed]
+            if inline is not None:
+                tasks.append(inline)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            for _ in borrowed:
+                _check_connections.release()
+
+    def _fork(
+            self,
+            async_session: AsyncSession,
+    ) -> "PermissionService":
+        """
+        Копия сервиса с репозиториями на другой сессии. Снимки разрешений общие с исходным сервисом
+        """
+        service = PermissionService(
+            org_repo=type(self.org_repo)(async_session=async_session),
+            member_repo=type(self.member_repo)(async_session=async_session),
+            permission_repo=type(self.permission_repo)(async_session=async_session),
+            permission_mapper=self.permission_mapper,
+            user_repo=type(self.user_repo)(async_session=async_session),
+            vacancy_repo=type(self.vacancy_repo)(async_session=async_session),
+            project_repo=type(self.project_repo)(async_session=async_session),
+            org_service=self.org_service,
+            application_repo=type(self.application_repo)(async_session=async_session),
+        )
+        service._snapshots = self._snapshots
+        service._snapshot_locks = self._snapshot_locks
+        return service
 
     @log_calls
     async def can_user_see_project(
@@ -91,60 +246,29 @@ class PermissionService(IPermissionService):
             user_id: int,
             project_id: int,
     ) -> bool:
-        if await self.is_user_admin(user_id=user_id):
-            return True
-        if await self.can_user_edit_project(project_id=project_id):
-            return True
+        # Если снимок уже в памяти - ADMIN и EDIT_PROJECT проверяются без БД
+        snapshot: PermissionSnapshot | None = self._peek_permission_snapshot(user_id=user_id)
+        if snapshot is not None:
+            if snapshot.is_admin:
+                return True
+            if snapshot.has(ResourceType.PROJECT, project_id, PermissionType.EDIT_PROJECT):
+                return True
 
-        project: Project | None = (
-            await self.project_repo.get_project_by_id(
+        res: bool = (
+            await self.permission_repo.is_project_visible_to_user(
+                user_id=user_id,
                 project_id=project_id,
             )
         )
-        if not project or project.visibility != ProjectVisibilityType.OPEN.value:
-            return False
-
-        org: Organization | None = (
-            await self.org_repo.get_organization_by_id(
-                org_id=cast(int, project.organization_id),
-            )
-        )
-        if not org:
-            return False
-
-        if org.visibility == OrganizationVisibilityType.OPEN.value:
-            return True
-        else:
-            org_member: OrganizationMember | None = (
-                await self.member_repo.get_organization_member_by_user_and_org(
-                    user_id=user_id,
-                    org_id=org.id,
-                )
-            )
-            if org_member:
-                return True
-
-        return False
+        return res
 
     @log_calls
     async def can_user_create_organizations(
             self,
             user_id: int,
     ) -> bool:
-        if await self.is_user_admin(user_id=user_id):
-            return True
-
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
-                user_id=user_id,
-                resource_type=ResourceType.DOMAIN.value,
-                resource_id=user_id,
-                permission_type=PermissionType.CREATE_ORGANIZATION.value,
-            )
-        )
-        if permission:
-            return True
-        return False
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.can_create_organizations
 
     @log_calls
     async def can_user_edit_yourself_application(
@@ -172,36 +296,21 @@ class PermissionService(IPermissionService):
             user_id: int,
             org_id: int,
     ) -> bool:
-        res: Organization | None = (
-            await self.org_service.get_organization_by_id(
-                org_id=org_id,
-            )
-        )
-        if self.org_service.is_org_open_to_view(org=res):
-            return True
-
-        if await self.is_user_admin(user_id=user_id):
-            return True
-
-        res: OrganizationMember | None = (
-            await self.member_repo.get_organization_member_by_user_and_org(
-                user_id=user_id,
-                org_id=org_id,
-            )
-        )
-        if res: return True
+        # Если снимок уже в памяти - ADMIN и EDIT_ORGANIZATION проверяются без БД
+        snapshot: PermissionSnapshot | None = self._peek_permission_snapshot(user_id=user_id)
+        if snapshot is not None:
+            if snapshot.is_admin:
+                return True
+            if snapshot.has(ResourceType.ORGANIZATION, org_id, PermissionType.EDIT_ORGANIZATION):
+                return True
 
         res: bool = (
-            await self.check_permission(
+            await self.permission_repo.is_organization_visible_to_user(
                 user_id=user_id,
-                resource_id=org_id,
-                resource_type=ResourceType.ORGANIZATION.value,
-                permission_type=PermissionType.EDIT_ORGANIZATION.value,
+                org_id=org_id,
             )
         )
-        if res: return True
-
-        return False
+        return res
 
     @log_calls
     async def can_user_edit_organization(
@@ -209,20 +318,8 @@ class PermissionService(IPermissionService):
             org_id: int,
             user_id: int,
     ) -> bool:
-        if await self.is_user_admin(user_id=user_id):
-            return True
-
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
-                user_id=user_id,
-                resource_type=ResourceType.ORGANIZATION.value,
-                resource_id=org_id,
-                permission_type=PermissionType.EDIT_ORGANIZATION.value,
-            )
-        )
-        if not permission:
-            return False
-        return True
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.allows(ResourceType.ORGANIZATION, org_id, PermissionType.EDIT_ORGANIZATION)
 
     @log_calls
     async def check_permission(
@@ -232,15 +329,29 @@ class PermissionService(IPermissionService):
             permission_type: str,
             resource_id: int,
     ) -> bool:
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.has(resource_type, resource_id, permission_type)
+
+    @log_calls
+    async def check_many(
+            self,
+            user_id: int,
+            checks: Sequence[tuple[ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[bool]:
+        # Снимок уже в памяти - весь пакет решается без БД
+        snapshot: PermissionSnapshot | None = self._peek_permission_snapshot(user_id=user_id)
+        if snapshot is not None:
+            return [
+                snapshot.allows(resource_type, resource_id, permission_type)
+                for resource_type, resource_id, permission_type in checks
+            ]
+
+        res: list[bool] = (
+            await self.permission_repo.check_many(
                 user_id=user_id,
-                resource_type=resource_type,
-                permission_type=permission_type,
-                resource_id=resource_id,
+                checks=checks,
             )
         )
-        res = permission is not None
         return res
 
     @log_calls
@@ -249,17 +360,8 @@ class PermissionService(IPermissionService):
             user_id: int,
             vacancy_id: int,
     ) -> bool:
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
-                user_id=user_id,
-                resource_type=ResourceType.VACANCY.value,
-                resource_id=vacancy_id,
-                permission_type=PermissionType.EDIT_VACANCY.value,
-            )
-        )
-        if not permission:
-            return False
-        return True
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.has(ResourceType.VACANCY, vacancy_id, PermissionType.EDIT_VACANCY)
 
     @log_calls
     async def can_user_edit_project(
@@ -267,17 +369,8 @@ class PermissionService(IPermissionService):
             user_id: int,
             project_id: int,
     ) -> bool:
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
-                user_id=user_id,
-                resource_type=ResourceType.PROJECT.value,
-                resource_id=project_id,
-                permission_type=PermissionType.EDIT_PROJECT.value,
-            )
-        )
-        if not permission:
-            return False
-        return True
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.has(ResourceType.PROJECT, project_id, PermissionType.EDIT_PROJECT)
 
     @log_calls
     async def can_user_create_projects_inside_organization(
@@ -285,17 +378,8 @@ class PermissionService(IPermissionService):
             user_id: int,
             org_id: int,
     ) -> bool:
-        permission: Permission | None = (
-            await self.permission_repo.search_exist_permission(
-                user_id=user_id,
-                resource_type=ResourceType.ORGANIZATION.value,
-                resource_id=org_id,
-                permission_type=PermissionType.CREATE_PROJECTS_INSIDE_ORGANIZATION.value,
-            )
-        )
-        if not permission:
-            return False
-        return True
+        snapshot: PermissionSnapshot = await self.get_permission_snapshot(user_id=user_id)
+        return snapshot.has(ResourceType.ORGANIZATION, org_id, PermissionType.CREATE_PROJECTS_INSIDE_ORGANIZATION)
 
     @log_calls
     async def allow_user_edit_vacancy(
@@ -318,9 +402,47 @@ class PermissionService(IPermissionService):
                 vacancy_id=vacancy_id,
             )
         )
+        snapshot: PermissionSnapshot | None = self._snapshots.get(user_id)
+        if snapshot is not None:
+            snapshot.add(permission=permission)
+
         res: PermissionsShortResponse = (
             self.permission_mapper.get_short_permission_response(
                 permission=permission,
             )
         )
         return res
+
+    @log_calls
+    async def grant_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        res: list[PermissionChangeOutcome] = (
+            await self.permission_repo.grant_permissions(
+                rows=rows,
+            )
+        )
+        self._forget_snapshots(user_ids=[user_id for user_id, *_ in rows])
+        return res
+
+    @log_calls
+    async def revoke_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        res: list[PermissionChangeOutcome] = (
+            await self.permission_repo.revoke_permissions(
+                rows=rows,
+            )
+        )
+        self._forget_snapshots(user_ids=[user_id for user_id, *_ in rows])
+        return res
+
+    def _forget_snapshots(
+            self,
+            user_ids: Sequence[int],
+    ) -> None:
+        # Снимки пользователей из пакета устарели - следующая проверка загрузит их заново
+        for user_id in user_ids:
+            self._snapshots.pop(user_id, None)
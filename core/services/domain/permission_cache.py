@@ -0,0 +1,139 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config.manager import settings
+from core.services.domain.permission_snapshot import PermissionSnapshot
+
+_PENDING_INVALIDATIONS_KEY = "permission_cache_pending_invalidations"
+
+
+class PermissionSnapshotCache:
+    """
+    Процессный LRU+TTL кэш объектов PermissionSnapshot по user_id.
+    Сбрасывается записями в таблицы permission / organization_member (см. invalidate_on_commit)
+    """
+
+    def __init__(
+            self,
+            max_size: int,
+            ttl_seconds: float,
+            enabled: bool = True,
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[int, tuple[float, PermissionSnapshot]] = OrderedDict()
+        # Увеличивается при каждой инвалидации. Снимок, загруженный до инвалидации, в кэш не попадет
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(
+            self,
+            user_id: int,
+    ) -> PermissionSnapshot | None:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return snapshot
+
+    def put(
+            self,
+            user_id: int,
+            snapshot: PermissionSnapshot,
+            generation: int,
+    ) -> None:
+        """
+        Положить снимок в кэш
+        :param user_id: id объекта User
+        :param snapshot: загруженный снимок
+        :param generation: значение generation на момент начала загрузки снимка
+        """
+        if not self.enabled or generation != self._generation:
+            return
+
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(
+            self,
+            user_id: int,
+    ) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.pop(user_id, None)
+
+    def invalidate_on_commit(
+            self,
+            async_session: AsyncSession,
+            user_id: int,
+    ) -> None:
+        """
+        Сбросить снимок пользователя сейчас и еще раз после коммита транзакции session,
+        чтобы параллельный запрос не успел закэшировать данные до коммита
+        :param async_session: сессия, в которой произошла запись
+        :param user_id: id объекта User, чьи разрешения изменились
+        """
+        self.invalidate(user_id=user_id)
+        async_session.info.setdefault(_PENDING_INVALIDATIONS_KEY, set()).add(user_id)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+permission_cache = PermissionSnapshotCache(
+    max_size=settings.PERMISSION_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PERMISSION_CACHE_TTL_SECONDS,
+    enabled=settings.PERMISSION_CACHE_ENABLED,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_INVALIDATIONS_KEY, ()):
+        permission_cache.invalidate(user_id=user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_INVALIDATIONS_KEY, None)
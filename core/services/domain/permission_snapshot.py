@@ -0,0 +1,73 @@
+from typing import Iterable
+
+from core.models.effective_permission import EffectivePermission
+from core.models.permissions import Permission, PermissionType, ResourceType, ADMIN_IMPLIED_PERMISSIONS
+from core.repository.views import EffectivePermissionView
+
+
+class PermissionSnapshot:
+    """
+    Снимок всех разрешений пользователя (EffectivePermission, т.е. с учетом наследования
+    Organization -> Project -> Vacancy), загруженный одним запросом.
+    Разрешения проиндексированы по (resource_type, resource_id) -> set[PermissionType],
+    флаги домена (ADMIN, CREATE_ORGANIZATION) посчитаны заранее
+    """
+    __slots__ = ("user_id", "is_admin", "can_create_organizations", "_index")
+
+    def __init__(
+            self,
+            user_id: int,
+            permissions: Iterable[Permission | EffectivePermission | EffectivePermissionView],
+    ):
+        self.user_id = user_id
+        self.is_admin = False
+        self.can_create_organizations = False
+        self._index: dict[tuple[ResourceType, int | None], set[PermissionType]] = {}
+        for permission in permissions:
+            self.add(permission=permission)
+
+    def add(
+            self,
+            permission: Permission | EffectivePermission | EffectivePermissionView,
+    ) -> None:
+        """
+        Добавить Permission в снимок (например, только что выданный в этом же запросе)
+        :param permission: объект Permission, EffectivePermission или EffectivePermissionView
+        """
+        key = (ResourceType(permission.resource_type), permission.resource_id)
+        self._index.setdefault(key, set()).add(PermissionType(permission.permission_type))
+
+        domain = self._index.get((ResourceType.DOMAIN, self.user_id), set())
+        self.is_admin = PermissionType.ADMIN in domain
+        self.can_create_organizations = self.is_admin or PermissionType.CREATE_ORGANIZATION in domain
+
+    def has(
+            self,
+            resource_type: ResourceType | str,
+            resource_id: int | None,
+            permission_type: PermissionType | str,
+    ) -> bool:
+        """
+        Есть ли у пользователя разрешение с указанными параметрами (без учета ADMIN)
+        :param resource_type: тип ресурса (str, Enum)
+        :param resource_id: id ресурса
+        :param permission_type: тип разрешения (str, Enum)
+        :return: True если разрешение есть
+        """
+        types = self._index.get((ResourceType(resource_type), resource_id))
+        if not types:
+            return False
+        return PermissionType(permission_type) in types
+
+    def allows(
+            self,
+            resource_type: ResourceType | str,
+            resource_id: int | None,
+            permission_type: PermissionType | str,
+    ) -> bool:
+        """
+        Как has, но с учетом разрешений, которые дает ADMIN (ADMIN_IMPLIED_PERMISSIONS)
+        """
+        if self.is_admin and PermissionType(permission_type) in ADMIN_IMPLIED_PERMISSIONS:
+            return True
+        return self.has(resource_type, resource_id, permission_type)
@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 from fastapi import HTTPException
 
@@ -9,6 +9,7 @@ from core.repository.crud.organizationMember import OrganizationMemberCRUDReposi
 from core.repository.crud.permission import PermissionCRUDRepository
 from core.repository.crud.project import ProjectCRUDRepository
 from core.repository.crud.user import UserCRUDRepository
+from core.repository.pagination import PageParams, Page
 from core.schemas.project import ProjectFullInfoResponse, CreatedProjectResponse, PatchedProjectResponse, \
     ProjectsInOrganizationShortInfoResponse
 from core.services.interfaces.project import IProjectService
@@ -42,7 +43,9 @@ class ProjectService(IProjectService):
             self,
             user_id: int,
             org_id:int,
-    ) -> Sequence[ProjectsInOrganizationShortInfoResponse]:
+            page: PageParams | None = None,
+            fields: frozenset[str] | None = None,
+    ) -> Page[ProjectsInOrganizationShortInfoResponse]:
         org: Organization = (
             await self.org_repo.get_organization_by_id(
                 org_id=org_id,
@@ -51,14 +54,37 @@ class ProjectService(IProjectService):
         if not org:
             raise EntityDoesNotExist('Организация не существует')
 
-        res: Sequence[ProjectsInOrganizationShortInfoResponse] = (
+        res: Page[ProjectsInOrganizationShortInfoResponse] = (
             await self.project_repo.get_projects_short_info_in_organization(
                 user_id=user_id,
                 org_id=org_id,
+                page=page,
+                fields=fields,
             )
         )
         return res
 
+    @log_calls
+    async def stream_projects_short_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> AsyncIterator[ProjectsInOrganizationShortInfoResponse]:
+        org: Organization = (
+            await self.org_repo.get_organization_by_id(
+                org_id=org_id,
+            )
+        )
+        if not org:
+            raise EntityDoesNotExist('Организация не существует')
+
+        return self.project_repo.stream_projects_short_info_in_organization(
+            user_id=user_id,
+            org_id=org_id,
+            fields=fields,
+        )
+
     @log_calls
     async def get_all_projects_in_organization_by_org_id(
             self,
@@ -76,13 +102,18 @@ class ProjectService(IProjectService):
     async def get_project_by_id(
             self,
             project_id: int,
+            with_long_description: bool = False,
     ) -> Project:
         """
         Получить объект Project по его id
         :param project_id: id объекта Project
+        :param with_long_description: загрузить отложенное поле long_description
         :return: объект Project с указанным id
         """
-        project: Project | None = await self.project_repo.get_project_by_id(project_id=project_id)
+        project: Project | None = await self.project_repo.get_project_by_id(
+            project_id=project_id,
+            with_long_description=with_long_description,
+        )
         if not project:
             raise EntityDoesNotExist('Project not found')
         return project
@@ -93,7 +124,7 @@ class ProjectService(IProjectService):
             user_id: int,
             project_id: int,
     ) -> ProjectFullInfoResponse:
-        project: Project = await self.get_project_by_id(project_id=project_id)
+        project: Project = await self.get_project_by_id(project_id=project_id, with_long_description=True)
         user: User = await self.user_service.get_user_by_id(user_id=user_id)
 
         res: ProjectFullInfoResponse = (
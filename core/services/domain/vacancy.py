@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 from fastapi import HTTPException
 
@@ -8,13 +8,13 @@ from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
 from core.repository.crud.project import ProjectCRUDRepository
 from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.repository.pagination import PageParams, Page
 from core.schemas.project import ProjectVacanciesFullInfoResponse
 from core.schemas.vacancy import VacancyShortInfoResponse, VacancyCreateResponse, VacancyPatchResponse
 from core.services.interfaces.permission import IPermissionService
 from core.services.interfaces.vacancy import IVacancyService
 from core.services.mappers.vacancy import VacancyMapper
 from core.utilities.exceptions.database import EntityDoesNotExist
-from core.utilities.exceptions.permission import PermissionDenied
 
 
 class VacancyService(IVacancyService):
@@ -48,8 +48,9 @@ class VacancyService(IVacancyService):
     async def get_all_vacancies_in_project_detailed_info(
             self,
             project_id: int,
-            user_id: int
-    ) -> Sequence[ProjectVacanciesFullInfoResponse]:
+            user_id: int,
+            page: PageParams | None = None,
+    ) -> Page[ProjectVacanciesFullInfoResponse]:
         project: Project = (
             await self.project_repo.get_project_by_id(
                 project_id=project_id,
@@ -58,14 +59,33 @@ class VacancyService(IVacancyService):
         if not project:
             raise EntityDoesNotExist('Указанного проекта не существует')
 
-        res: Sequence[ProjectVacanciesFullInfoResponse] = (
+        res: Page[ProjectVacanciesFullInfoResponse] = (
             await self.vacancy_repo.get_all_vacancies_in_project_detailed_info(
                 project_id=project.id,
                 user_id=user_id,
+                page=page,
             )
         )
         return res
 
+    async def stream_all_vacancies_in_project_detailed_info(
+            self,
+            project_id: int,
+            user_id: int,
+    ) -> AsyncIterator[ProjectVacanciesFullInfoResponse]:
+        project: Project = (
+            await self.project_repo.get_project_by_id(
+                project_id=project_id,
+            )
+        )
+        if not project:
+            raise EntityDoesNotExist('Указанного проекта не существует')
+
+        return self.vacancy_repo.stream_all_vacancies_in_project_detailed_info(
+            project_id=project.id,
+            user_id=user_id,
+        )
+
     async def get_vacancy_by_id(
             self,
             vacancy_id: int,
@@ -81,20 +101,16 @@ class VacancyService(IVacancyService):
             self,
             vacancy_id: int,
             user_id: int,
+            fields: frozenset[str] | None = None,
     ) -> VacancyShortInfoResponse:
-        vacancy: Vacancy = (
-            await self.vacancy_repo.get_vacancy_by_id(
+        res: VacancyShortInfoResponse | None = (
+            await self.vacancy_repo.get_vacancy_short_info_by_id(
                 vacancy_id=vacancy_id,
+                fields=fields,
             )
         )
-        if not vacancy:
+        if not res:
             raise EntityDoesNotExist('Вакансия не существует')
-
-        res: VacancyShortInfoResponse = (
-            self.vacancy_mapper.vacancy_to_short_info_response(
-                vacancy=vacancy,
-            )
-        )
         return res
 
     async def create_vacancy(
@@ -147,14 +163,12 @@ class VacancyService(IVacancyService):
             visibility: str,
             activity_status: str,
     ) -> VacancyPatchResponse:
-        if not all([  # Здесь эта проверка не нужна!!! переместить в другой слой
-            await self.permission_service.can_user_edit_vacancy(
-                user_id=user_id,
-                vacancy_id=vacancy_id,
-            ),
-
-        ]):
-            raise PermissionDenied("Permission denied")
+        # Здесь эта проверка не нужна!!! переместить в другой слой
+        # Vacancy может переезжать в другой Project - он должен быть виден пользователю
+        await self.permission_service.raise_if_not_all_concurrently([
+            lambda service: service.can_user_edit_vacancy(user_id=user_id, vacancy_id=vacancy_id),
+            lambda service: service.can_user_see_project(user_id=user_id, project_id=project_id),
+        ])
 
         project: Project = (
             await self.project_repo.get_project_by_id(
@@ -1,6 +1,8 @@
-from typing import Sequence, Protocol
+from typing import Sequence, Protocol, AsyncIterator
 
-from core.schemas.application import ApplicationShortInfo, ApplicationMainInfo, ApplicationId, ApplicationLimits
+from core.repository.pagination import PageParams, Page
+from core.schemas.application import ApplicationShortInfo, ApplicationMainInfo, ApplicationId, ApplicationLimits, \
+    ManagerApplicationInfo, ManagerApplicationCounts, ApplicationBulkDecisionRequest, ApplicationBulkDecisionResult
 
 
 class IApplicationService(Protocol):
@@ -35,7 +37,17 @@ class IApplicationService(Protocol):
             self,
             user_id: int,
             org_id: int,
-    ) -> Sequence[ApplicationMainInfo]:
+            activity_status: str | None = None,
+            page: PageParams | None = None,
+    ) -> Page[ApplicationMainInfo]:
+        ...
+
+    async def stream_user_applications_main_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            activity_status: str | None = None,
+    ) -> AsyncIterator[ApplicationMainInfo]:
         ...
 
     async def get_all_active_applications_by_user_and_project(
@@ -48,6 +60,47 @@ class IApplicationService(Protocol):
         """
         ...
 
+    async def get_manager_applications(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+            page: PageParams | None = None,
+    ) -> Page[ManagerApplicationInfo]:
+        """
+        Входящие отклики менеджера: активные отклики на вакансии, которые он может редактировать
+        """
+        ...
+
+    async def stream_manager_applications(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> AsyncIterator[ManagerApplicationInfo]:
+        ...
+
+    async def get_manager_application_counts(
+            self,
+            manager_id: int,
+            project_id: int | None = None,
+            vacancy_id: int | None = None,
+    ) -> ManagerApplicationCounts:
+        """
+        Число входящих откликов менеджера и непросмотренных среди них
+        """
+        ...
+
+    async def mark_applications_viewed(
+            self,
+            manager_id: int,
+            application_ids: Sequence[int],
+    ) -> Sequence[int]:
+        """
+        Отметить входящие отклики менеджера просмотренными
+        """
+        ...
+
     async def change_application_status(
             self,
             application_id: int,
@@ -69,17 +122,29 @@ class IApplicationService(Protocol):
 
     async def reject_application(
             self,
+            manager_id: int,
             application_id: int,
-    ) -> ...:
+    ) -> ApplicationId:
         """
         Отменить отклик от лица менеджера
         """
         ...
 
+    async def decide_applications(
+            self,
+            manager_id: int,
+            application_ids: Sequence[int],
+            status: str,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Принять / отклонить отклики от лица менеджера (только активные отклики на его вакансии)
+        """
+        ...
+
     async def reject_all_application_in_vacancy(
             self,
             vacancy_id: int,
-    ) -> ...:
+    ) -> ApplicationBulkDecisionResult:
         """
         Отменить все отклики в вакансии от лица менеджера
         """
@@ -89,12 +154,31 @@ class IApplicationService(Protocol):
             self,
             vacancy_id: int,
             application_id: int,
-    ) -> ...:
+    ) -> ApplicationBulkDecisionResult:
         """
         Отменить все отклики в вакансии от лица менеджера кроме указанного
         """
         ...
 
+    async def close_vacancy_and_reject_applications(
+            self,
+            vacancy_id: int,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Закрыть вакансию и отклонить все ее активные отклики
+        """
+        ...
+
+    async def apply_bulk_decision(
+            self,
+            manager_id: int,
+            params: ApplicationBulkDecisionRequest,
+    ) -> ApplicationBulkDecisionResult:
+        """
+        Выполнить массовое решение по откликам (см. ApplicationBulkAction)
+        """
+        ...
+
     async def delete_application(
             self,
             application_id: int,
@@ -1,8 +1,9 @@
 from typing import Protocol
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 from core.models import Organization
 from core.models.organizationMember import OrganizationMember
+from core.repository.pagination import PageParams, Page
 from core.schemas.organization import OrganizationShortInfoResponse, \
     OrganizationJoinPolicyType, OrganizationVisibilityType, OrganizationActivityStatusType, \
     OrganizationInfoForEditResponse, OrganizationDetailInfoResponse, OrganizationId
@@ -42,28 +43,52 @@ class IOrganizationService(Protocol):
     async def get_all_organizations_with_short_info(
             self,
             user_id: int,
-    ) -> Sequence[OrganizationShortInfoResponse]:
+            page: PageParams | None = None,
+            fields: frozenset[str] | None = None,
+    ) -> Page[OrganizationShortInfoResponse]:
         """
-        Возвращает список объектов с краткой информацией о каждой организации, видимой для пользователя
+        Возвращает страницу объектов с краткой информацией о каждой организации, видимой для пользователя
 
         Args:
             user_id: id пользователя совершающего запрос
+            page: параметры страницы (None - все организации)
+            fields: только эти поля схемы (?fields=), None - все поля
 
         Returns:
-            Sequence[OrganizationShortInfoResponse]: Список с объектами с краткой информацией о каждой организации,
-            видимой для пользователя
+            Page[OrganizationShortInfoResponse]: Страница с объектами с краткой информацией о каждой организации,
+            видимой для пользователя, и курсором следующей страницы
+        """
+        ...
+
+    async def stream_all_organizations_with_short_info(
+            self,
+            user_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> AsyncIterator[OrganizationShortInfoResponse]:
+        """
+        Как get_all_organizations_with_short_info, но все организации потоком (для ответа application/x-ndjson)
+
+        Args:
+            user_id: id пользователя совершающего запрос
+            fields: только эти поля схемы (?fields=), None - все поля
+
+        Returns:
+            AsyncIterator[OrganizationShortInfoResponse]: Итератор объектов с краткой информацией об организациях,
+            читаемых из БД по мере отправки
         """
         ...
 
     async def get_organization_by_id(
             self,
             org_id: int,
+            with_long_description: bool = False,
     ) -> Organization | None:
         """
         Получает объект организации по ее id
 
         Args:
             org_id: id организации для получения ее объекта
+            with_long_description: загрузить отложенное поле long_description
 
         Returns:
             Organization: Объект Organization
@@ -0,0 +1,40 @@
+from typing import Protocol, AsyncIterator
+
+from sqlalchemy import Row
+
+from core.schemas.base import BaseSchemaModel
+from core.schemas.organization_export import OrganizationExportEntity
+
+
+class IOrganizationExportService(Protocol):
+
+    async def stream_organization_export_rows(
+            self,
+            org_id: int,
+            entity: OrganizationExportEntity,
+    ) -> AsyncIterator[Row]:
+        """
+        Все строки выгрузки организации потоком (для CSV). Права проверяет вызывающий
+
+        Args:
+            org_id: id организации
+            entity: что выгружать
+
+        Returns:
+            AsyncIterator[Row]: строки, колонки - поля ORGANIZATION_EXPORT_ROWS[entity] в том же порядке
+
+        Raises:
+            EntityDoesNotExist: организации нет
+        """
+        ...
+
+    async def stream_organization_export_items(
+            self,
+            org_id: int,
+            entity: OrganizationExportEntity,
+    ) -> AsyncIterator[BaseSchemaModel]:
+        """
+        То же, что stream_organization_export_rows, но строки - объекты ORGANIZATION_EXPORT_ROWS[entity]
+        (для ответа application/x-ndjson)
+        """
+        ...
@@ -0,0 +1,54 @@
+from typing import Protocol, BinaryIO, TextIO
+
+from core.schemas.organization_import import ImportResult
+
+
+class IOrganizationImportService(Protocol):
+
+    async def import_members(
+            self,
+            org_id: int,
+            source: BinaryIO,
+            errors: TextIO,
+    ) -> ImportResult:
+        """
+        Добавить в организацию пользователей из CSV (колонка user_id или username).
+        Файл читается пакетами по settings.IMPORT_BATCH_SIZE строк, каждый пакет - одна транзакция
+
+        Args:
+            org_id: id организации
+            source: CSV файл (UTF-8, первая строка - заголовок)
+            errors: куда записать CSV с ошибками (line, error)
+
+        Returns:
+            ImportResult: число строк, добавленных и ошибочных
+
+        Raises:
+            InvalidImportFile: нет заголовка или обязательных колонок
+        """
+        ...
+
+    async def import_vacancies(
+            self,
+            org_id: int,
+            user_id: int,
+            source: BinaryIO,
+            errors: TextIO,
+    ) -> ImportResult:
+        """
+        Создать вакансии в проектах организации из CSV (колонки VacancyCreateRequest).
+        Файл читается пакетами по settings.IMPORT_BATCH_SIZE строк, каждый пакет - одна транзакция
+
+        Args:
+            org_id: id организации - вакансии создаются только в ее проектах
+            user_id: id создателя вакансий
+            source: CSV файл (UTF-8, первая строка - заголовок)
+            errors: куда записать CSV с ошибками (line, error)
+
+        Returns:
+            ImportResult: число строк, созданных вакансий и ошибочных строк
+
+        Raises:
+            InvalidImportFile: нет заголовка или обязательных колонок
+        """
+        ...
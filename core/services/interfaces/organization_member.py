@@ -1,6 +1,7 @@
-from typing import Protocol, Sequence
+from typing import Protocol, Sequence, AsyncIterator
 
 from core.models.organizationMember import OrganizationMember
+from core.repository.pagination import PageParams, Page
 from core.schemas.organization import OrganizationJoinResponse, OrganizationMemberId
 from core.schemas.organization_member import OrganizationMemberDetailInfo, \
     OrganizationMemberDeleteResponse
@@ -19,7 +20,15 @@ class IOrganizationMemberService(Protocol):
             self,
             user_id: int,
             org_id: int,
-    ) -> Sequence[OrganizationMemberDetailInfo]:
+            page: PageParams | None = None,
+    ) -> Page[OrganizationMemberDetailInfo]:
+        ...
+
+    async def stream_organization_members_for_admin(
+            self,
+            user_id: int,
+            org_id: int,
+    ) -> AsyncIterator[OrganizationMemberDetailInfo]:
         ...
 
     async def join_organization(
@@ -1,13 +1,31 @@
-from typing import Protocol, Callable, Coroutine, Awaitable
+from typing import Protocol, Callable, Coroutine, Awaitable, Sequence
 
 from starlette.responses import JSONResponse
 
+from core.models.permissions import ResourceType, PermissionType
 from core.schemas.admin import AdminPermissionSignature
-from core.schemas.permission import PermissionsShortResponse
+from core.schemas.permission import PermissionsShortResponse, PermissionChangeOutcome
+from core.services.domain.permission_snapshot import PermissionSnapshot
 
 
 class IPermissionService(Protocol):
 
+    async def get_permission_snapshot(
+            self,
+            user_id: int,
+    ) -> PermissionSnapshot:
+        """
+        Снимок всех разрешений пользователя. Загружается одним запросом и переиспользуется
+        всеми проверками can_* в рамках одного запроса
+
+        Args:
+            user_id: id пользователя
+
+        Returns:
+            PermissionSnapshot: индекс разрешений пользователя
+        """
+        ...
+
     async def check_all(
             self,
             permissions: list[Callable[[], Awaitable[bool]]],
@@ -27,6 +45,23 @@ class IPermissionService(Protocol):
     ) -> None:
         ...
 
+    async def raise_if_not_all_concurrently(
+            self,
+            permissions: list[Callable[["IPermissionService"], Awaitable[bool]]],
+    ) -> None:
+        """
+        Выполняет независимые проверки параллельно: на сессии запроса и на соединениях, свободных
+        в общем лимите (settings.PERMISSION_CHECK_POOL_CONNECTIONS, не больше
+        settings.PERMISSION_CHECK_MAX_CONNECTIONS на запрос). Первая неудачная проверка отменяет остальные
+
+        Args:
+            permissions: проверки, получающие PermissionService, на котором их выполнять
+
+        Raises:
+            PermissionDenied: если хотя бы одна проверка вернула False
+        """
+        ...
+
     async def can_user_create_organizations(
             self,
             user_id: int,
@@ -69,6 +104,23 @@ class IPermissionService(Protocol):
     ) -> bool:
         ...
 
+    async def check_many(
+            self,
+            user_id: int,
+            checks: Sequence[tuple[ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[bool]:
+        """
+        Проверить пакет разрешений за один запрос к БД (или без БД, если снимок уже загружен)
+
+        Args:
+            user_id: id пользователя
+            checks: последовательность (resource_type, resource_id, permission_type)
+
+        Returns:
+            list[bool]: результаты в порядке checks
+        """
+        ...
+
     async def can_user_edit_vacancy(
             self,
             user_id: int,
@@ -96,3 +148,33 @@ class IPermissionService(Protocol):
             vacancy_id: int
     ) -> PermissionsShortResponse:
         ...
+
+    async def grant_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        """
+        Выдать пакет разрешений в одной транзакции
+
+        Args:
+            rows: последовательность (user_id, resource_type, resource_id, permission_type)
+
+        Returns:
+            list[PermissionChangeOutcome]: исходы в порядке rows
+        """
+        ...
+
+    async def revoke_permissions(
+            self,
+            rows: Sequence[tuple[int, ResourceType | str, int | None, PermissionType | str]],
+    ) -> list[PermissionChangeOutcome]:
+        """
+        Отозвать пакет разрешений в одной транзакции
+
+        Args:
+            rows: последовательность (user_id, resource_type, resource_id, permission_type)
+
+        Returns:
+            list[PermissionChangeOutcome]: исходы в порядке rows
+        """
+        ...
@@ -1,7 +1,8 @@
-from typing import Sequence, Protocol
+from typing import Sequence, Protocol, AsyncIterator
 
 from core.models import Project
 from core.models.user import User
+from core.repository.pagination import PageParams, Page
 from core.schemas.project import ProjectFullInfoResponse, CreatedProjectResponse, PatchedProjectResponse, \
     ProjectsInOrganizationShortInfoResponse
 
@@ -12,7 +13,17 @@ class IProjectService(Protocol):
             self,
             user_id: int,
             org_id:int,
-    ) -> Sequence[ProjectsInOrganizationShortInfoResponse]:
+            page: PageParams | None = None,
+            fields: frozenset[str] | None = None,
+    ) -> Page[ProjectsInOrganizationShortInfoResponse]:
+        ...
+
+    async def stream_projects_short_info_in_organization(
+            self,
+            user_id: int,
+            org_id: int,
+            fields: frozenset[str] | None = None,
+    ) -> AsyncIterator[ProjectsInOrganizationShortInfoResponse]:
         ...
 
     async def get_all_projects_in_organization_by_org_id(
@@ -35,12 +46,14 @@ class IProjectService(Protocol):
     async def get_project_by_id(
             self,
             project_id: int,
+            with_long_description: bool = False,
     ) -> Project:
         """
         ???
 
         Args:
             project_id:
+            with_long_description: загрузить отложенное поле long_description
 
         Returns:
             Project
@@ -1,6 +1,7 @@
-from typing import Sequence, Protocol
+from typing import Sequence, Protocol, AsyncIterator
 
 from core.models.vacancy import Vacancy
+from core.repository.pagination import PageParams, Page
 from core.schemas.project import ProjectVacanciesFullInfoResponse
 from core.schemas.vacancy import VacancyShortInfoResponse, VacancyCreateResponse, VacancyPatchResponse
 
@@ -17,8 +18,16 @@ class IVacancyService(Protocol):
     async def get_all_vacancies_in_project_detailed_info(
             self,
             project_id: int,
-            user_id: int
-    ) -> Sequence[ProjectVacanciesFullInfoResponse]:
+            user_id: int,
+            page: PageParams | None = None,
+    ) -> Page[ProjectVacanciesFullInfoResponse]:
+        ...
+
+    async def stream_all_vacancies_in_project_detailed_info(
+            self,
+            project_id: int,
+            user_id: int,
+    ) -> AsyncIterator[ProjectVacanciesFullInfoResponse]:
         ...
 
     async def get_vacancy_by_id(
@@ -31,6 +40,7 @@ class IVacancyService(Protocol):
             self,
             vacancy_id: int,
             user_id: int,
+            fields: frozenset[str] | None = None,
     ) -> VacancyShortInfoResponse:
         ...
 
@@ -31,9 +31,9 @@ class ProjectMapper:
             ),
             visibility=ProjectVisibilityType(project.visibility),
             activity_status=ProjectActivityStatusType(project.activity_status),
-            team_current_size=0,
-            team_full_size=0,
-            open_vacancies=0
+            team_current_size=project.team_current_size,
+            team_full_size=project.team_full_size,
+            open_vacancies=project.open_vacancies
         )
         return res
 
@@ -1,10 +1,9 @@
-from typing import Sequence
+from typing import Sequence, AsyncIterator
 
 from core.models import Vacancy
 from core.schemas.application import ApplicationShortInfo
 from core.schemas.project import ProjectVacanciesFullInfoResponse
-from core.schemas.vacancy import VacancyShortInfoResponse, VacancyActivityStatusType, VacancyVisibilityType, \
-    VacancyCreateResponse, VacancyPatchResponse
+from core.schemas.vacancy import VacancyCreateResponse, VacancyPatchResponse
 from core.utilities.loggers.log_decorator import log_calls
 
 
@@ -23,29 +22,32 @@ class VacancyMapper:
         ids = set(app.vacancy_id for app in active_applications)
 
         for app in base:
-            if app.can_user_edit:
-                continue
-            if app.vacancy_id in ids:
-                app.has_user_active_applications = True
-                app.can_user_make_applications = False
-
+            self._mark_active_application(vacancy=app, vacancy_ids_with_applications=ids)
 
         return base
 
     @log_calls
-    def vacancy_to_short_info_response(
+    def stream_vacancies_full_info_response_by_active_applications(
             self,
-            vacancy: Vacancy,
-    ) -> VacancyShortInfoResponse:
-        res = VacancyShortInfoResponse(
-            vacancy_id=vacancy.id,
-            project_id=vacancy.project_id,
-            name=vacancy.name,
-            short_description=vacancy.short_description,
-            activity_status=VacancyActivityStatusType(vacancy.activity_status),
-            visibility=VacancyVisibilityType(vacancy.visibility),
+            base: AsyncIterator[ProjectVacanciesFullInfoResponse],
+            active_applications: Sequence[ApplicationShortInfo],
+    ) -> AsyncIterator[ProjectVacanciesFullInfoResponse]:
+        ids = set(app.vacancy_id for app in active_applications)
+
+        return (
+            self._mark_active_application(vacancy=app, vacancy_ids_with_applications=ids)
+            async for app in base
         )
-        return res
+
+    @staticmethod
+    def _mark_active_application(
+            vacancy: ProjectVacanciesFullInfoResponse,
+            vacancy_ids_with_applications: set[int],
+    ) -> ProjectVacanciesFullInfoResponse:
+        if not vacancy.can_user_edit and vacancy.vacancy_id in vacancy_ids_with_applications:
+            vacancy.has_user_active_applications = True
+            vacancy.can_user_make_applications = False
+        return vacancy
 
     @log_calls
     def vacancy_to_create_response(
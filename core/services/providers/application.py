@@ -1,10 +1,12 @@
 from fastapi import Depends
 
 from core.dependencies.repository import get_repository
+from core.dependencies.unit_of_work import get_unit_of_work
 from core.repository.crud.application import ApplicationCRUDRepository
 from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.project import ProjectCRUDRepository
 from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.repository.unit_of_work import UnitOfWork
 from core.services.domain.application import ApplicationService
 from core.services.interfaces.application import IApplicationService
 from core.services.interfaces.permission import IPermissionService
@@ -17,6 +19,7 @@ def get_application_service(
         permission_service: IPermissionService = Depends(get_permission_service),
         application_repo: ApplicationCRUDRepository = Depends(get_repository(ApplicationCRUDRepository)),
         org_repo: OrganizationCRUDRepository = Depends(get_repository(OrganizationCRUDRepository)),
+        unit_of_work: UnitOfWork = Depends(get_unit_of_work),
 ) -> IApplicationService:
     return ApplicationService(
         project_repo=project_repo,
@@ -24,4 +27,5 @@ def get_application_service(
         permission_service=permission_service,
         application_repo=application_repo,
         org_repo=org_repo,
+        unit_of_work=unit_of_work,
     )
@@ -1,10 +1,12 @@
 from fastapi import Depends
 
 from core.dependencies.repository import get_repository
+from core.dependencies.unit_of_work import get_unit_of_work
 from core.models import OrganizationMember
 from core.repository.crud.organization import OrganizationCRUDRepository
 from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
 from core.repository.crud.permission import PermissionCRUDRepository
+from core.repository.unit_of_work import UnitOfWork
 from core.services.domain.organization import OrganizationService
 from core.services.domain.user import UserService
 from core.services.interfaces.organization import IOrganizationService
@@ -17,7 +19,8 @@ def get_organization_service(
         member_repo: OrganizationMemberCRUDRepository = Depends(get_repository(OrganizationMemberCRUDRepository)),
         permission_repo: PermissionCRUDRepository = Depends(get_repository(PermissionCRUDRepository)),
         user_service: UserService = Depends(get_user_service),
-        org_mapper: OrganizationMember = Depends(get_org_mapper)
+        org_mapper: OrganizationMember = Depends(get_org_mapper),
+        unit_of_work: UnitOfWork = Depends(get_unit_of_work),
 ) -> IOrganizationService:
     return OrganizationService(
         org_repo=org_repo,
@@ -25,4 +28,5 @@ def get_organization_service(
         permission_repo=permission_repo,
         user_service=user_service,
         org_mapper=org_mapper,
+        unit_of_work=unit_of_work,
     )
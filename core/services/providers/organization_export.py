@@ -0,0 +1,17 @@
+from fastapi import Depends
+
+from core.dependencies.repository import get_repository
+from core.repository.crud.organization import OrganizationCRUDRepository
+from core.repository.crud.organization_export import OrganizationExportCRUDRepository
+from core.services.domain.organization_export import OrganizationExportService
+from core.services.interfaces.organization_export import IOrganizationExportService
+
+
+def get_organization_export_service(
+        org_repo: OrganizationCRUDRepository = Depends(get_repository(OrganizationCRUDRepository)),
+        export_repo: OrganizationExportCRUDRepository = Depends(get_repository(OrganizationExportCRUDRepository)),
+) -> IOrganizationExportService:
+    return OrganizationExportService(
+        org_repo=org_repo,
+        export_repo=export_repo,
+    )
@@ -0,0 +1,23 @@
+from fastapi import Depends
+
+from core.dependencies.repository import get_repository
+from core.repository.crud.organizationMember import OrganizationMemberCRUDRepository
+from core.repository.crud.project import ProjectCRUDRepository
+from core.repository.crud.user import UserCRUDRepository
+from core.repository.crud.vacancy import VacancyCRUDRepository
+from core.services.domain.organization_import import OrganizationImportService
+from core.services.interfaces.organization_import import IOrganizationImportService
+
+
+def get_organization_import_service(
+        member_repo: OrganizationMemberCRUDRepository = Depends(get_repository(OrganizationMemberCRUDRepository)),
+        vacancy_repo: VacancyCRUDRepository = Depends(get_repository(VacancyCRUDRepository)),
+        project_repo: ProjectCRUDRepository = Depends(get_repository(ProjectCRUDRepository)),
+        user_repo: UserCRUDRepository = Depends(get_repository(UserCRUDRepository)),
+) -> IOrganizationImportService:
+    return OrganizationImportService(
+        member_repo=member_repo,
+        vacancy_repo=vacancy_repo,
+        project_repo=project_repo,
+        user_repo=user_repo,
+    )
@@ -6,3 +6,7 @@ class ActiveEntityLimit(Exception):
     """
 
 
+class InvalidImportFile(Exception):
+    """
+    Файл импорта нельзя разобрать: нет заголовка или обязательных колонок
+    """
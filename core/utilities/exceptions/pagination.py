@@ -0,0 +1,4 @@
+class InvalidCursor(ValueError):
+    """
+    Курсор пагинации поврежден или получен не от этого API
+    """
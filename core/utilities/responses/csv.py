@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import datetime
+import io
+from typing import AsyncIterable, AsyncIterator, Iterable, Mapping, Sequence, Any
+
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from core.utilities.formatters.datetime_formatter import format_datetime_into_isoformat
+
+CSV_MEDIA_TYPE = "text/csv"
+
+
+class CSVResponse(StreamingResponse):
+    """
+    Потоковый ответ text/csv (вложение filename). Содержимое отдается клиенту частями по мере чтения,
+    синхронный итератор (например, по файлу) обходится в пуле потоков
+    """
+    media_type = CSV_MEDIA_TYPE
+
+    def __init__(
+            self,
+            content: AsyncIterable[str | bytes] | Iterable[str | bytes],
+            filename: str,
+            status_code: int = 200,
+            headers: Mapping[str, str] | None = None,
+            background: BackgroundTask | None = None,
+    ):
+        super().__init__(
+            content=content,
+            status_code=status_code,
+            headers={**(headers or {}), "Content-Disposition": f'attachment; filename="{filename}"'},
+            media_type=f"{CSV_MEDIA_TYPE}; charset=utf-8",
+            background=background,
+        )
+
+
+async def encode_csv_rows(
+        header: Sequence[str],
+        rows: AsyncIterable[Sequence[Any]],
+        batch_size: int,
+) -> AsyncIterator[str]:
+    """
+    CSV текст из потока строк: строки собираются в пачки по batch_size и форматируются в пуле потоков,
+    чтобы csv.writer не занимал event loop. В памяти одновременно находится одна пачка
+    :param header: названия колонок
+    :param rows: асинхронный итератор строк (значения в порядке header)
+    :param batch_size: сколько строк форматировать за раз
+    :return: асинхронный итератор кусков CSV текста
+    """
+    yield _format_csv_rows([header])
+    batch: list[Sequence[Any]] = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield await asyncio.to_thread(_format_csv_rows, batch)
+            batch = []
+    if batch:
+        yield await asyncio.to_thread(_format_csv_rows, batch)
+
+
+def _format_csv_rows(
+        rows: Sequence[Sequence[Any]],
+) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [format_datetime_into_isoformat(value) if isinstance(value, datetime.datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
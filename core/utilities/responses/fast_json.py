@@ -0,0 +1,15 @@
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse, сериализующий содержимое через pydantic-core (Rust) сразу в bytes.
+    Pydantic модели можно класть в ответ как есть, без model_dump(): {'body': model} или {'body': [model, ...]}.
+    Формат совпадает с JSONResponse({'body': model.model_dump()}): имена полей без alias, UTF-8, без пробелов
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content, by_alias=False)
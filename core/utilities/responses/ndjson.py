@@ -0,0 +1,35 @@
+from typing import AsyncIterable, AsyncIterator, Mapping
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Потоковый ответ application/x-ndjson: по одному JSON объекту на строку.
+    Каждый элемент сериализуется и отправляется клиенту, как только его отдал итератор,
+    поэтому в памяти одновременно находится один элемент, а не весь список
+    """
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(
+            self,
+            content: AsyncIterable[BaseModel],
+            status_code: int = 200,
+            headers: Mapping[str, str] | None = None,
+    ):
+        super().__init__(
+            content=self._encode(content),
+            status_code=status_code,
+            headers=headers,
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    @staticmethod
+    async def _encode(
+            content: AsyncIterable[BaseModel],
+    ) -> AsyncIterator[bytes]:
+        async for item in content:
+            yield item.model_dump_json().encode() + b"\n"
@@ -6,12 +6,13 @@ from starlette.responses import JSONResponse
 
 from core.api.v1.routers import routers as routers_v1
 from core.database.connection import engine, Base
+from core.utilities.responses.fast_json import FastJSONResponse
 from templates import templates
 from fastapi import FastAPI
 from fastapi.openapi.models import OAuthFlows as OAuthFlowsModel, SecurityScheme as SecuritySchemeModel
 from fastapi.openapi.utils import get_openapi
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Разрешённые источники (в разработке можно '*')
 origins = [